@@ -2,115 +2,684 @@
 
 This script processes all audio files placed in the `audio` directory and
 writes summarized Markdown, transcript text, and PDF files to the `output`
-directory. After a file is processed its name is stored in `processed.log`
-to avoid duplicate work.
+directory. Processed files are recorded by content hash in the SQLite job
+store ``jobs.sqlite3`` to avoid duplicate work; an existing ``processed.log``
+is imported on first use.
 
 The output filename follows the pattern ``YYYYMMDD_NameOfTheFile.md`` with
 matching ``.txt`` and ``.pdf`` files.
+
+Files flow through a staged pipeline (probe → transcribe → summarize → render)
+with separately sized worker pools, so file N+1 can upload while file N is
+being summarized or rendered. With ``--watch`` the script keeps running and
+feeds newly dropped files into the same pipeline.
 """
 
 from __future__ import annotations
 
 import argparse
+import os
+import queue
+import signal
 import sys
+import threading
 import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from pathlib import Path
-from typing import Set
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
 import logging
 
+import dist_queue
+import folder_watch
+import instrumentation
+import job_server
+import pdf_render
+import scheduler
 import transcribe_summary
+from endpoints import EndpointPool
+from job_store import JobStore
 
 BASE_DIR = Path(__file__).resolve().parent
 AUDIO_DIR = BASE_DIR / "audio"
 OUTPUT_DIR = BASE_DIR / "output"
 LOG_FILE = BASE_DIR / "processed.log"
+STORE_FILE = BASE_DIR / "jobs.sqlite3"
+# Whisper API list price in USD per audio minute; override with [whisper_api] price_per_minute
+DEFAULT_PRICE_PER_MINUTE = 0.006
+DEFAULT_MAX_WORKERS = 3
+# Stand-in duration for sizing --max-workers auto before any job is known
+NOMINAL_JOB_SEC = 3600
 AUDIO_EXTS = {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg", ".wma"}
 
 logger = logging.getLogger(__name__)
 
 
-def _load_processed() -> Set[str]:
-    if not LOG_FILE.exists():
-        return set()
-    filenames: Set[str] = set()
-    with LOG_FILE.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+@dataclass
+class BatchSettings:
+    """Run-wide parameters shared by every job of a batch."""
+
+    method: str
+    language: str
+    whisper_model: str
+    api_key: str
+    summary_model: str
+    prompt: str = ""
+    local_options: Optional[dict[str, Any]] = None
+    api_options: Optional[dict[str, Any]] = None
+    store: Optional[JobStore] = None
+    # When set, transcription and summaries run on a job_server.py instance
+    server_url: str = ""
+    server_token: str = ""
+    # Worker mode: jobs are leased from a shared queue and reported back to it
+    queue: Optional[dist_queue.DirectoryQueue] = None
+    leases: Optional[dist_queue.LeaseKeeper] = None
+    # Admission control: transcriptions start only while their memory estimate fits
+    memory: Optional[scheduler.MemoryBudget] = None
+    # Request timeouts and job deadline, see transcribe_summary.get_timeouts()
+    timeouts: Optional[dict[str, float]] = None
+    # Several API endpoints to balance over, see transcribe_summary.get_endpoint_pool()
+    transcribe_endpoints: Optional[EndpointPool] = None
+    summary_endpoints: Optional[EndpointPool] = None
+    # PDFs are built in worker processes when set, so they never hold the GIL here
+    pdf_renderer: Optional[pdf_render.PdfRenderService] = None
+    # Also write the full transcript as PDF
+    transcript_pdf: bool = False
+    # Instrumentation: one JSON lines trace per job and/or an aggregated Prometheus textfile
+    trace_dir: Optional[Path] = None
+    metrics: Optional[instrumentation.Metrics] = None
+    metrics_file: Optional[Path] = None
+    # Where results are written; workers of a shared queue point this at the share
+    output_dir: Path = OUTPUT_DIR
+    # Where leased jobs are read from in worker mode
+    audio_dir: Path = AUDIO_DIR
+    # Content of jobs still in the pipeline; a hash is dropped once its job ends,
+    # so a failed file can be retried and finished ones are caught by the store
+    seen_hashes: set[str] = field(default_factory=set)
+
+
+@dataclass
+class BatchJob:
+    """State of one audio file as it moves through the pipeline stages."""
+
+    path: Path
+    job_id: Optional[int] = None
+    content_hash: Optional[str] = None
+    audio_info: Optional[transcribe_summary.AudioInfo] = None
+    transcript: Optional[str] = None
+    elapsed: float = 0.0
+    summary: Optional[str] = None
+    outputs: list[Path] = field(default_factory=list)
+    lease: Optional[dist_queue.Lease] = None
+    deadline: Optional[transcribe_summary.Deadline] = None
+    trace: Optional[instrumentation.Trace] = None
+
+
+_STOP = object()
+
+
+class StagedPipeline:
+    """Move items through consecutive stages, each with its own worker pool.
+
+    ``stages`` is a list of ``(name, fn, workers)``. ``fn`` processes one item
+    and returns it (or a replacement) for the next stage. Stages are connected
+    by bounded queues, so a slow stage applies back-pressure instead of letting
+    work pile up in memory, and a busy summarizer never blocks a transcription
+    slot. Items whose stage raises are recorded in ``failed`` (and passed to
+    ``on_error``) and dropped. Long-running pipelines pass
+    ``keep_results=False`` so finished and failed items are only counted;
+    ``on_error`` is then the only record of a failure.
+    """
+
+    def __init__(
+        self,
+        stages: list[Tuple[str, Callable[[Any], Any], int]],
+        queue_size: int = 4,
+        on_error: Optional[Callable[[Any, str, BaseException], None]] = None,
+        keep_results: bool = True,
+    ) -> None:
+        self.stages = stages
+        self.on_error = on_error
+        self.keep_results = keep_results
+        self.completed_count = 0
+        self.failed_count = 0
+        self.queues: list[queue.Queue] = [
+            queue.Queue(maxsize=max(queue_size, workers)) for _, _, workers in stages
+        ]
+        self.completed: list[Any] = []
+        self.failed: list[Tuple[Any, str, BaseException]] = []
+        self._lock = threading.Lock()
+        self._remaining = [workers for _, _, workers in stages]
+        self._threads: list[threading.Thread] = []
+        for index, (name, _, workers) in enumerate(stages):
+            for n in range(workers):
+                t = threading.Thread(
+                    target=self._worker, args=(index,), name=f"{name}-{n}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, item: Any) -> None:
+        """Queue ``item`` for the first stage; blocks while that queue is full."""
+        self.queues[0].put(item)
+
+    def close(self) -> None:
+        """Signal that no more items will be submitted."""
+        for _ in range(self.stages[0][2]):
+            self.queues[0].put(_STOP)
+
+    def join(self) -> None:
+        """Wait until every submitted item has left the last stage."""
+        for t in self._threads:
+            t.join()
+
+    def _worker(self, index: int) -> None:
+        name, fn, _ = self.stages[index]
+        inbox = self.queues[index]
+        is_last = index == len(self.stages) - 1
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+            try:
+                result = fn(item)
+            except Exception as e:
+                logger.error(f"{name} failed for {item}: {e}")
+                with self._lock:
+                    self.failed_count += 1
+                    if self.keep_results:
+                        self.failed.append((item, name, e))
+                if self.on_error:
+                    self.on_error(item, name, e)
                 continue
-            filenames.add(line.split(",", 1)[0])
-    return filenames
+            if is_last:
+                with self._lock:
+                    self.completed_count += 1
+                    if self.keep_results:
+                        self.completed.append(result)
+            else:
+                self.queues[index + 1].put(result)
+        # The last worker of a stage to stop tells the next stage to stop
+        with self._lock:
+            self._remaining[index] -= 1
+            last_out = self._remaining[index] == 0
+        if last_out and not is_last:
+            for _ in range(self.stages[index + 1][2]):
+                self.queues[index + 1].put(_STOP)
 
 
-def _append_processed(
-    filename: str,
-    size_bytes: int,
-    duration_sec: float,
-    method: str,
-    elapsed: float,
-) -> None:
-    timestamp = datetime.now().isoformat(timespec="seconds")
-    with LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(
-            f"{filename},{size_bytes},{duration_sec:.2f},{method},{elapsed:.2f},{timestamp}\n"
-        )
+def _release_lease(job: BatchJob, settings: BatchSettings, error: Optional[str] = None) -> None:
+    """Report a leased job back to the shared queue and stop renewing its lease."""
+    if settings.leases is not None:
+        settings.leases.remove(job.lease)
+    if error is None:
+        ok = settings.queue.complete(job.lease, worker=job.lease.job.get("worker"))
+    else:
+        ok = settings.queue.fail(job.lease, error)
+    if not ok:
+        logger.warning(f"Lease on {job.path.name} expired before the job finished")
 
 
-def _process_file(
-    path: Path,
-    method: str,
-    language: str,
-    whisper_model: str,
-    api_key: str,
-    summary_model: str,
-) -> None:
-    """Transcribe a single audio file and write its transcript and summary."""
-    logger.info(
-        f"Transcribing {path.name} using {whisper_model} via {method}..."
-    )
+def _probe_stage(job: BatchJob) -> BatchJob:
+    # Container headers are enough for the log; transcribe() reuses the probe
+    if job.audio_info is None:
+        job.audio_info = transcribe_summary.probe_audio(str(job.path))
+    return job
+
+
+def _probe_jobs(jobs: list[BatchJob], workers: int) -> None:
+    """Probe ``jobs`` up front so they can be ordered by duration.
+
+    Files that cannot be probed keep ``audio_info=None``; the pipeline's probe
+    stage tries again and reports the error for that file.
+    """
+
+    def probe(job: BatchJob) -> None:
+        try:
+            _probe_stage(job)
+        except Exception as e:
+            logger.warning(f"Could not probe {job.path.name}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        list(ex.map(probe, jobs))
+
+
+def _is_short_clip(job: BatchJob) -> bool:
+    info = job.audio_info
+    return bool(info and 0 < info.duration_sec <= transcribe_summary.BATCH_CLIP_SEC)
+
+
+def _job_cost(job: BatchJob) -> float:
+    if job.transcript is not None:
+        # Already transcribed by the batched local pass
+        return 0.0
+    info = job.audio_info
+    if info is None:
+        return scheduler.job_cost(0.0, job.path.stat().st_size)
+    return scheduler.job_cost(info.duration_sec, info.size_bytes)
+
 
-    from pydub import AudioSegment
+def _start_deadline(job: BatchJob, settings: BatchSettings) -> None:
+    # The clock starts when the job is first worked on, not while it waits in a queue
+    if job.deadline is None and settings.timeouts:
+        job.deadline = transcribe_summary.Deadline.after(settings.timeouts["job"])
 
-    size_bytes = path.stat().st_size
-    audio = AudioSegment.from_file(path)
-    duration_sec = len(audio) / 1000
+
+def _transcribe_stage(job: BatchJob, settings: BatchSettings) -> BatchJob:
+    if job.transcript is not None:
+        return job
+    _start_deadline(job, settings)
+    logger.info(
+        f"Transcribing {job.path.name} using {settings.whisper_model} via {settings.method}..."
+    )
     start = time.time()
-    transcript = transcribe_summary.transcribe(
-        str(path),
-        model_name=whisper_model,
-        method=method,
-        api_key=api_key if method == "api" else None,
+    if settings.server_url:
+        job.transcript = job_server.remote_transcribe(
+            settings.server_url,
+            str(job.path.resolve()),
+            settings.whisper_model,
+            settings.method,
+            token=settings.server_token,
+            timeouts=settings.timeouts,
+            deadline=job.deadline,
+        )
+        job.elapsed = time.time() - start
+        return job
+    job.transcript = transcribe_summary.transcribe(
+        str(job.path),
+        model_name=settings.whisper_model,
+        method=settings.method,
+        api_key=settings.api_key if settings.method == "api" else None,
+        local_options=settings.local_options,
+        api_options=settings.api_options,
+        audio_info=job.audio_info,
+        timeouts=settings.timeouts,
+        deadline=job.deadline,
+        trace=job.trace,
+        endpoints=settings.transcribe_endpoints,
     )
-    elapsed = time.time() - start
+    job.elapsed = time.time() - start
+    return job
 
-    logger.info("Creating summary...")
-    prompt = transcribe_summary._load_text(
-        transcribe_summary.BASE_DIR / transcribe_summary.PROMPT_FILE
-    )
+
+def _summarize_stage(job: BatchJob, settings: BatchSettings) -> BatchJob:
+    logger.info(f"Creating summary for {job.path.name}...")
+    _start_deadline(job, settings)
+    if settings.server_url:
+        job.summary = job_server.remote_summarize(
+            settings.server_url,
+            settings.prompt,
+            job.transcript,
+            settings.summary_model,
+            settings.language,
+            token=settings.server_token,
+            timeouts=settings.timeouts,
+            deadline=job.deadline,
+        )
+        return job
     summary = transcribe_summary.summarize(
-        prompt, transcript, summary_model, api_key, language
+        settings.prompt,
+        job.transcript,
+        settings.summary_model,
+        settings.api_key,
+        settings.language,
+        settings.timeouts,
+        job.deadline,
+        job.trace,
+        settings.summary_endpoints,
     )
-    summary = transcribe_summary.strip_code_fences(summary)
+    job.summary = transcribe_summary.strip_code_fences(summary)
+    return job
+
 
+def _render_stage(job: BatchJob, settings: BatchSettings) -> BatchJob:
     now = datetime.now()
-    output_name = f"{now:%Y%m%d}_{path.stem}.md"
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    output_path = OUTPUT_DIR / output_name
-    heading = "Summary" if language == "en" else "Zusammenfassung"
-    markdown_content = f"# {heading}\n\n" + summary + "\n"
-    with output_path.open("w", encoding="utf-8") as f:
-        f.write(markdown_content)
-    transcript_path = OUTPUT_DIR / f"{now:%Y%m%d}_{path.stem}.txt"
-    with transcript_path.open("w", encoding="utf-8") as f:
-        f.write(transcript)
-    pdf_path = OUTPUT_DIR / f"{now:%Y%m%d}_{path.stem}.pdf"
-    transcribe_summary.markdown_to_pdf(markdown_content, str(pdf_path))
-    _append_processed(path.name, size_bytes, duration_sec, method, elapsed)
+    output_dir = settings.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{now:%Y%m%d}_{job.path.stem}.md"
+    heading = "Summary" if settings.language == "en" else "Zusammenfassung"
+    markdown_content = f"# {heading}\n\n" + job.summary + "\n"
+    with instrumentation.span(job.trace, "write_md"):
+        with output_path.open("w", encoding="utf-8") as f:
+            f.write(markdown_content)
+    transcript_path = output_dir / f"{now:%Y%m%d}_{job.path.stem}.txt"
+    with instrumentation.span(job.trace, "write_txt"):
+        with transcript_path.open("w", encoding="utf-8") as f:
+            f.write(job.transcript)
+    pdf_path = output_dir / f"{now:%Y%m%d}_{job.path.stem}.pdf"
+    if settings.pdf_renderer is not None:
+        settings.pdf_renderer.render(markdown_content, pdf_path, trace=job.trace)
+    else:
+        transcribe_summary.markdown_to_pdf(markdown_content, str(pdf_path), trace=job.trace)
+    job.outputs = [output_path, transcript_path, pdf_path]
+    if settings.transcript_pdf:
+        transcript_pdf = output_dir / f"{now:%Y%m%d}_{job.path.stem}_transcript.pdf"
+        if settings.pdf_renderer is not None:
+            settings.pdf_renderer.render_transcript(
+                job.transcript, transcript_pdf, job.path.name, trace=job.trace
+            )
+        else:
+            transcribe_summary.transcript_to_pdf(
+                job.transcript, str(transcript_pdf), job.path.name, trace=job.trace
+            )
+        job.outputs.append(transcript_pdf)
+    if settings.store and job.job_id is not None:
+        settings.store.finish(
+            job.job_id,
+            job.audio_info.duration_sec if job.audio_info else 0.0,
+            settings.method,
+            settings.whisper_model,
+        )
+    if job.lease is not None and settings.queue is not None:
+        _release_lease(job, settings)
+    settings.seen_hashes.discard(job.content_hash)
     logger.info(f"Finished: {output_path}")
     logger.info(f"PDF saved to {pdf_path}")
     logger.info(f"Transcript saved to {transcript_path}")
+    return job
+
+
+def _memory_need(
+    settings: BatchSettings,
+    duration_sec: float,
+    size_bytes: int,
+    sample_rate: int = 0,
+    channels: int = 0,
+) -> int:
+    options = settings.local_options or {}
+    return scheduler.estimate_job_memory(
+        duration_sec,
+        size_bytes,
+        sample_rate=sample_rate,
+        channels=channels,
+        method=settings.method,
+        compact=bool((settings.api_options or {}).get("compact")),
+        vad=bool(options.get("vad")),
+        chunk_bytes=transcribe_summary.MAX_CHUNK_BYTES,
+        ffmpeg=transcribe_summary.check_ffmpeg(),
+    )
+
+
+def _job_memory(job: BatchJob, settings: BatchSettings) -> int:
+    """Estimate the peak memory of transcribing ``job`` in this process."""
+    if settings.server_url or job.transcript is not None:
+        return 0
+    info = job.audio_info
+    if info is None:
+        return _memory_need(settings, 0.0, job.path.stat().st_size)
+    return _memory_need(
+        settings, info.duration_sec, info.size_bytes, info.sample_rate, info.channels
+    )
+
+
+def _auto_workers(jobs: list[BatchJob], settings: BatchSettings) -> int:
+    """Size the transcribe stage for ``--max-workers auto`` from the memory budget.
+
+    Without pending jobs (watch and worker mode) a nominal recording stands
+    in. Local decoding is CPU bound, so it never gets more workers than CPUs.
+    """
+    if settings.memory is None:
+        return DEFAULT_MAX_WORKERS
+    needs = [_job_memory(j, settings) for j in jobs if j.transcript is None]
+    if not needs:
+        needs = [_memory_need(settings, NOMINAL_JOB_SEC, 0)]
+    cap = scheduler.AUTO_MAX_WORKERS
+    if settings.method == "local":
+        cap = min(cap, os.cpu_count() or 1)
+    return scheduler.workers_for_budget(
+        settings.memory.limit, settings.memory.reserved, needs, cap=cap
+    )
+
+
+def _worker_count(value: str) -> Union[int, str]:
+    if value.strip().lower() == "auto":
+        return "auto"
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+    if count < 1:
+        raise argparse.ArgumentTypeError("needs at least one worker")
+    return count
+
+
+def _memory_gated(
+    fn: Callable[[BatchJob], BatchJob], settings: BatchSettings
+) -> Callable[[BatchJob], BatchJob]:
+    """Wrap the transcribe stage so it waits until the job fits the memory budget."""
+
+    def run(job: BatchJob) -> BatchJob:
+        with settings.memory.reserve(_job_memory(job, settings), job.path.name):
+            return fn(job)
+
+    return run
+
+
+def _finish_trace(job: BatchJob, settings: BatchSettings, status: str) -> None:
+    """Write the job's trace and fold it into the metrics file."""
+    if job.trace is None:
+        return
+    if settings.trace_dir is not None:
+        job.trace.write_jsonl(settings.trace_dir / f"{job.path.stem}.trace.jsonl")
+    if settings.metrics is not None:
+        settings.metrics.observe(job.trace, status)
+        if settings.metrics_file is not None:
+            settings.metrics.write_textfile(settings.metrics_file)
+
+
+def _traced_stage(
+    name: str, fn: Callable[[BatchJob], BatchJob], settings: BatchSettings, is_last: bool
+) -> Callable[[BatchJob], BatchJob]:
+    """Wrap a stage in a span of the job's trace; the last stage also exports the trace."""
+
+    def run(job: BatchJob) -> BatchJob:
+        if job.trace is None:
+            job.trace = instrumentation.Trace(job.path.name)
+        with job.trace.span(name):
+            result = fn(job)
+        if is_last:
+            _finish_trace(job, settings, "done")
+        return result
+
+    return run
+
+
+def _timed_stage(
+    name: str, fn: Callable[[BatchJob], BatchJob], store: JobStore
+) -> Callable[[BatchJob], BatchJob]:
+    """Wrap a stage so its duration is stored with the job."""
+
+    def run(job: BatchJob) -> BatchJob:
+        if name == "transcribe" and job.job_id is not None:
+            store.start(job.job_id)
+        start = time.time()
+        result = fn(job)
+        if job.job_id is not None:
+            # Batched local decoding happens before the pipeline; keep its share
+            seconds = job.elapsed if name == "transcribe" else time.time() - start
+            store.record_stage(job.job_id, name, seconds)
+        return result
+
+    return run
+
+
+def build_pipeline(
+    settings: BatchSettings,
+    transcribe_workers: int = 3,
+    summary_workers: int = 2,
+    render_workers: int = 1,
+    probe_workers: int = 2,
+    queue_size: int = 4,
+    keep_results: bool = True,
+) -> StagedPipeline:
+    """Create the probe → transcribe → summarize → render pipeline for a batch.
+
+    With ``settings.store`` set, stage timings and job states are recorded.
+    """
+    stages: list[Tuple[str, Callable[[Any], Any], int]] = [
+        ("probe", _probe_stage, probe_workers),
+        ("transcribe", partial(_transcribe_stage, settings=settings), transcribe_workers),
+        ("summarize", partial(_summarize_stage, settings=settings), summary_workers),
+        ("render", partial(_render_stage, settings=settings), render_workers),
+    ]
+    store = settings.store
+    if settings.trace_dir is not None or settings.metrics is not None:
+        stages = [
+            (name, _traced_stage(name, fn, settings, i == len(stages) - 1), n)
+            for i, (name, fn, n) in enumerate(stages)
+        ]
+    if store is not None:
+        stages = [(name, _timed_stage(name, fn, store), n) for name, fn, n in stages]
+    if settings.memory is not None:
+        # Outside the timing wrapper so waiting for memory is not counted as transcription
+        stages = [
+            (name, _memory_gated(fn, settings) if name == "transcribe" else fn, n)
+            for name, fn, n in stages
+        ]
+
+    def on_error(job: BatchJob, stage: str, error: BaseException) -> None:
+        _finish_trace(job, settings, "failed")
+        if store is not None and job.job_id is not None:
+            store.fail(job.job_id, f"{stage}: {error}")
+        if job.lease is not None and settings.queue is not None:
+            _release_lease(job, settings, f"{stage}: {error}")
+        settings.seen_hashes.discard(job.content_hash)
+
+    return StagedPipeline(stages, queue_size=queue_size, on_error=on_error, keep_results=keep_results)
+
+
+def _new_candidates(
+    store: JobStore, paths: list[Path], seen_hashes: set[str]
+) -> list[Tuple[Path, str, int]]:
+    """Return ``(path, content_hash, size)`` for audio files that still need processing.
+
+    ``seen_hashes`` collects the content currently being processed so
+    duplicates within a run (or a long-running watch) are only done once.
+    """
+    candidates = []
+    for audio_file in paths:
+        if not audio_file.is_file():
+            continue
+        if audio_file.suffix.lower() not in AUDIO_EXTS:
+            continue
+        content_hash = store.file_hash(audio_file)
+        size_bytes = audio_file.stat().st_size
+        if store.is_done(content_hash, audio_file.name, size_bytes):
+            logger.info(f"{audio_file.name} has already been processed.")
+            continue
+        if content_hash in seen_hashes:
+            logger.info(f"{audio_file.name} duplicates another file in this batch.")
+            continue
+        seen_hashes.add(content_hash)
+        candidates.append((audio_file, content_hash, size_bytes))
+    return candidates
+
+
+def _watch(
+    pipeline: StagedPipeline,
+    store: JobStore,
+    seen_hashes: set[str],
+    settle_sec: float,
+    poll_interval: float,
+    stop: threading.Event,
+    audio_dir: Path,
+) -> None:
+    """Feed files dropped into ``audio_dir`` to ``pipeline`` until ``stop`` is set."""
+    logger.info(f"Watching {audio_dir} for new audio files (Ctrl+C to stop)...")
+    for path in folder_watch.watch(
+        audio_dir, AUDIO_EXTS, settle_sec=settle_sec, poll_interval=poll_interval, stop=stop
+    ):
+        for audio_file, content_hash, size_bytes in _new_candidates(store, [path], seen_hashes):
+            logger.info(f"New file: {audio_file.name}")
+            job_id = store.enqueue(content_hash, audio_file.name, size_bytes)
+            pipeline.submit(BatchJob(path=audio_file, job_id=job_id, content_hash=content_hash))
+
+
+def _enqueue_shared(
+    dq: dist_queue.DirectoryQueue,
+    candidates: list[Tuple[Path, str, int]],
+    probe_workers: int,
+) -> int:
+    """Add ``candidates`` to the shared queue, ranked by duration; returns how many were new."""
+    jobs = [BatchJob(path=p) for p, _, _ in candidates]
+    _probe_jobs(jobs, probe_workers)
+    added = 0
+    for job, (path, content_hash, size_bytes) in zip(jobs, candidates):
+        duration = job.audio_info.duration_sec if job.audio_info else 0.0
+        if dq.enqueue(content_hash, path.name, size_bytes, duration):
+            added += 1
+        else:
+            logger.info(f"{path.name} is already in the shared queue.")
+    return added
+
+
+def _work_shared_queue(
+    pipeline: StagedPipeline,
+    settings: BatchSettings,
+    worker_id: str,
+    capacity: int,
+    poll_interval: float,
+    stop: threading.Event,
+    keep_running: bool = False,
+) -> None:
+    """Lease jobs from ``settings.queue`` into ``pipeline``.
+
+    At most ``capacity`` jobs are held at once so other hosts get their share.
+    Without ``keep_running`` the loop ends once the queue is empty and all
+    leased jobs have finished.
+    """
+    dq, leases, store = settings.queue, settings.leases, settings.store
+    while not stop.is_set():
+        dq.requeue_expired()
+        if len(leases) >= capacity:
+            stop.wait(0.2)
+            continue
+        lease = dq.claim(worker_id)
+        if lease is None:
+            if not keep_running and len(leases) == 0:
+                break
+            stop.wait(poll_interval if len(leases) == 0 else 0.2)
+            continue
+        path = settings.audio_dir / lease.job["filename"]
+        logger.info(f"Leased {path.name} (attempt {lease.job.get('attempts', 0) + 1})")
+        leases.add(lease)
+        job_id = None
+        if store is not None:
+            job_id = store.enqueue(lease.job["content_hash"], path.name, lease.job["size_bytes"])
+        pipeline.submit(BatchJob(path=path, job_id=job_id, lease=lease))
+
+
+def _print_estimate(
+    store: JobStore,
+    jobs: list[BatchJob],
+    method: str,
+    whisper_model: str,
+    workers: int,
+    price_per_minute: float,
+    probe_workers: int = 2,
+) -> dict[str, Any]:
+    """Print the predicted wall time and API cost of transcribing ``jobs``."""
+    _probe_jobs(jobs, probe_workers)
+    pending = [
+        (j.audio_info.duration_sec if j.audio_info else 0.0, j.path.stat().st_size) for j in jobs
+    ]
+    fit = scheduler.fit_throughput(store.history())
+    est = scheduler.estimate_batch(pending, method, whisper_model, workers, fit, price_per_minute)
+    basis = (
+        f"{est['history_samples']} past jobs"
+        if est["history_samples"]
+        else "no history yet, using a default"
+    )
+    print(f"Pending files:        {est['files']}")
+    print(f"Audio:                {est['audio_minutes']:.1f} min")
+    print(f"Real-time factor:     {est['rtf']:.3f} ({method}/{whisper_model}, {basis})")
+    print(f"Predicted wall time:  {est['wall_seconds'] / 60:.1f} min with {workers} workers")
+    if method == "api":
+        print(f"API minutes:          {est['api_minutes']:.1f}")
+        print(f"Transcription cost:   ~{est['cost']:.2f} (at {price_per_minute} per minute)")
+    return est
 
 
 def main() -> None:
@@ -132,13 +701,154 @@ def main() -> None:
     )
     parser.add_argument(
         "--max-workers",
+        type=_worker_count,
+        default=DEFAULT_MAX_WORKERS,
+        help="Parallel transcription workers (files uploaded or decoded at once); 'auto' "
+        "sizes them from the memory budget",
+    )
+    parser.add_argument(
+        "--summary-workers",
+        type=int,
+        default=2,
+        help="Parallel summarization requests",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="Parallel workers writing Markdown, transcript and PDF files",
+    )
+    parser.add_argument(
+        "--pdf-processes",
+        type=int,
+        default=1,
+        help="Worker processes building PDFs, off the transcription threads (0 = build in "
+        "the render workers)",
+    )
+    parser.add_argument(
+        "--transcript-pdf",
+        action="store_true",
+        default=None,
+        help="Also write each transcript as PDF (overrides transcript_pdf in config)",
+    )
+    parser.add_argument(
+        "--probe-workers",
+        type=int,
+        default=2,
+        help="Parallel workers reading audio metadata",
+    )
+    parser.add_argument(
+        "--queue-size",
         type=int,
-        default=3,
-        help="Maximum parallel workers for processing files",
+        default=4,
+        help="Maximum jobs waiting in front of each stage",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["longest-first", "fifo"],
+        default="longest-first",
+        help="Job order: longest recordings first (shortest batch time) or directory order",
+    )
+    parser.add_argument(
+        "--interleave-short",
+        type=int,
+        default=0,
+        metavar="N",
+        help="With longest-first, slot in one short job after every N long ones for early results",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and process audio files as soon as they appear in the audio directory",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="With --watch, seconds a file must stay unchanged before it is picked up",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="With --watch, seconds between directory scans when inotify is unavailable",
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Only predict wall time, API minutes and cost for the pending files, then exit",
+    )
+    parser.add_argument(
+        "--local-batch-size",
+        type=int,
+        default=None,
+        help="Decode up to N short clips together with --method local (overrides config)",
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="URL",
+        help="Send transcription and summary work to a running job_server.py "
+        "(default URL: [server] url or http://127.0.0.1:8765)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        default=None,
+        metavar="MB",
+        help="Only start transcriptions whose estimated memory fits this many MB "
+        "('auto' = 80%% of RAM; overrides memory_budget_mb in config)",
+    )
+    parser.add_argument(
+        "--trace-dir",
+        default=None,
+        help="Write a JSON lines trace of every stage per job into this directory",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Keep per-stage timings in this Prometheus textfile (e.g. for node_exporter)",
+    )
+    parser.add_argument(
+        "--enqueue",
+        metavar="QUEUE_DIR",
+        help="Add the pending files to a shared queue directory for --worker hosts, then exit",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="QUEUE_DIR",
+        help="Process jobs leased from a shared queue directory instead of scanning the audio "
+        "directory (with --watch, keep waiting for new jobs)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=300.0,
+        help="With --worker, seconds without a heartbeat after which a job is handed to "
+        "another worker",
+    )
+    parser.add_argument(
+        "--audio-dir",
+        default=None,
+        help="Directory with the audio files (default: audio/ next to this script); point "
+        "--enqueue and --worker hosts at the same shared directory",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Directory for the results (default: output/ next to this script)",
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Name of this worker in the shared queue (default: hostname-pid)",
     )
     args = parser.parse_args()
+    if args.worker and (args.estimate or args.enqueue):
+        parser.error("--worker cannot be combined with --estimate or --enqueue")
 
-    if not transcribe_summary.check_ffmpeg():
+    if args.server is None and not transcribe_summary.check_ffmpeg():
         logger.warning("ffmpeg is not installed or not found in PATH.")
 
     config = transcribe_summary.load_config()
@@ -149,40 +859,210 @@ def main() -> None:
     summary_model = config["openai"]["summary_model"]
     whisper_section = "whisper_api" if method == "api" else "whisper_local"
     whisper_model = config[whisper_section]["model"]
+    local_options = transcribe_summary.get_local_options(config)
+    api_options = transcribe_summary.get_api_options(config)
+    if args.local_batch_size is not None:
+        local_options["batch_size"] = args.local_batch_size
+    server_url, server_token = "", ""
+    if args.server is not None:
+        server_url, server_token = job_server.get_server_settings(config)
+        server_url = args.server or server_url or job_server.DEFAULT_URL
+        logger.info(f"Submitting jobs to {server_url}")
     logger.info(
         f"Using model {whisper_model} via {'API' if method == 'api' else 'local'}"
     )
 
 
-    AUDIO_DIR.mkdir(exist_ok=True)
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    processed = _load_processed()
-    to_process = []
-    for audio_file in AUDIO_DIR.iterdir():
-        if not audio_file.is_file():
-            continue
-        if audio_file.suffix.lower() not in AUDIO_EXTS:
-            continue
-        if audio_file.name in processed:
-            logger.info(f"{audio_file.name} has already been processed.")
-            continue
-        to_process.append(audio_file)
-
-    with ThreadPoolExecutor(max_workers=args.max_workers) as ex:
-        futures = [
-            ex.submit(
-                _process_file,
-                audio_file,
-                method,
-                language,
-                whisper_model,
-                api_key,
-                summary_model,
+    audio_dir = Path(args.audio_dir) if args.audio_dir else AUDIO_DIR
+    output_dir = Path(args.output_dir) if args.output_dir else OUTPUT_DIR
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Workers record their jobs in the shared queue only: a local SQLite store
+    # could end up on the share, where its locking is not reliable
+    store = None if args.worker else JobStore(STORE_FILE)
+    seen_hashes: set[str] = set()
+    candidates = []
+    if store is not None:
+        store.import_legacy_log(LOG_FILE)
+        candidates = _new_candidates(store, sorted(audio_dir.iterdir()), seen_hashes)
+
+    if args.enqueue:
+        dq = dist_queue.DirectoryQueue(Path(args.enqueue), lease_sec=args.lease)
+        added = _enqueue_shared(dq, candidates, args.probe_workers)
+        counts = dq.counts()
+        logger.info(
+            f"Queued {added} files in {args.enqueue} ({counts['pending']} pending, "
+            f"{counts['leased']} running, {counts['done']} done, {counts['failed']} failed)."
+        )
+        store.close()
+        return
+
+    settings = BatchSettings(
+        method=method,
+        language=language,
+        whisper_model=whisper_model,
+        api_key=api_key,
+        summary_model=summary_model,
+        prompt=transcribe_summary._load_text(transcribe_summary.ensure_prompt()),
+        local_options=local_options,
+        api_options=api_options,
+        store=store,
+        server_url=server_url,
+        server_token=server_token,
+        timeouts=transcribe_summary.get_timeouts(config),
+        transcribe_endpoints=(
+            transcribe_summary.get_endpoint_pool(config, "whisper_api") if method == "api" else None
+        ),
+        summary_endpoints=transcribe_summary.get_endpoint_pool(config, "openai"),
+        trace_dir=Path(args.trace_dir) if args.trace_dir else None,
+        metrics=instrumentation.Metrics() if args.metrics_file else None,
+        metrics_file=Path(args.metrics_file) if args.metrics_file else None,
+        output_dir=output_dir,
+        audio_dir=audio_dir,
+        seen_hashes=seen_hashes,
+        transcript_pdf=(
+            args.transcript_pdf
+            if args.transcript_pdf is not None
+            else config.getboolean("general", "transcript_pdf", fallback=False)
+        ),
+    )
+    budget_value = (
+        args.memory_budget
+        if args.memory_budget is not None
+        else config.get("general", "memory_budget_mb", fallback="")
+    )
+    if args.max_workers == "auto" and not budget_value.strip():
+        budget_value = "auto"
+    budget = scheduler.parse_memory_budget(budget_value)
+    if budget is not None and not server_url:
+        reserved = (
+            scheduler.model_memory(whisper_model, local_options) if method == "local" else 0
+        )
+        if reserved >= budget:
+            logger.warning(
+                f"Memory budget of {budget / scheduler.MB:.0f} MB does not even fit the "
+                f"{whisper_model} model (~{reserved / scheduler.MB:.0f} MB); jobs run one at a time"
             )
-            for audio_file in to_process
-        ]
-        for f in futures:
-            f.result()
+        settings.memory = scheduler.MemoryBudget(budget, reserved_bytes=reserved)
+        logger.info(
+            f"Memory budget: {budget / scheduler.MB:.0f} MB "
+            f"({reserved / scheduler.MB:.0f} MB reserved for the model)"
+        )
+    jobs = [BatchJob(path=audio_file, content_hash=h) for audio_file, h, _ in candidates]
+    workers = args.max_workers
+    if workers == "auto":
+        _probe_jobs(jobs, args.probe_workers)
+        workers = _auto_workers(jobs, settings)
+        logger.info(f"Using {workers} transcription workers for the memory budget")
+
+    if args.estimate:
+        _print_estimate(
+            store,
+            jobs,
+            method,
+            whisper_model,
+            workers,
+            config.getfloat("whisper_api", "price_per_minute", fallback=DEFAULT_PRICE_PER_MINUTE),
+            args.probe_workers,
+        )
+        store.close()
+        return
+
+    for job, (_, content_hash, size_bytes) in zip(jobs, candidates):
+        job.job_id = store.enqueue(content_hash, job.path.name, size_bytes)
+
+    # Short clips are decoded together up front; their transcripts are then
+    # handed to the regular per-file workers for summarizing and writing.
+    pre_transcribed: dict[str, Tuple[str, float]] = {}
+    if method == "local" and local_options["batch_size"] > 1 and jobs and not server_url:
+        # Only probed short clips: decoding a long file just to skip it would
+        # cost its full waveform in memory, outside the memory budget
+        _probe_jobs(jobs, args.probe_workers)
+        clips = [j for j in jobs if _is_short_clip(j)]
+    else:
+        clips = []
+    if clips:
+        start = time.time()
+        texts = transcribe_summary.transcribe_batch(
+            [str(j.path) for j in clips],
+            whisper_model,
+            local_options=local_options,
+            batch_size=local_options["batch_size"],
+        )
+        if texts:
+            per_file = (time.time() - start) / len(texts)
+            pre_transcribed = {p: (t, per_file) for p, t in texts.items()}
+            logger.info(f"Batch-decoded {len(texts)} short clips locally.")
+
+    for job in jobs:
+        if str(job.path) in pre_transcribed:
+            job.transcript, job.elapsed = pre_transcribed[str(job.path)]
+
+    if args.pdf_processes > 0:
+        settings.pdf_renderer = pdf_render.PdfRenderService(
+            processes=args.pdf_processes, max_pending=args.pdf_processes + args.render_workers
+        )
+    if args.worker:
+        settings.queue = dist_queue.DirectoryQueue(Path(args.worker), lease_sec=args.lease)
+        settings.leases = dist_queue.LeaseKeeper(settings.queue)
+    pipeline = build_pipeline(
+        settings,
+        transcribe_workers=workers,
+        summary_workers=args.summary_workers,
+        render_workers=args.render_workers,
+        probe_workers=args.probe_workers,
+        queue_size=args.queue_size,
+        keep_results=not args.watch,
+    )
+    if args.order == "longest-first" and len(jobs) > 1:
+        _probe_jobs(jobs, args.probe_workers)
+        jobs = scheduler.order_jobs(jobs, _job_cost, interleave_short=args.interleave_short)
+        costs = [_job_cost(j) for j in jobs]
+        makespan = scheduler.predict_makespan(costs, workers)
+        ideal = sum(costs) / max(1, min(workers, len(jobs)))
+        logger.info(
+            f"Predicted makespan: {makespan / 60:.1f} audio-minutes on the busiest of "
+            f"{workers} workers (ideal {ideal / 60:.1f})."
+        )
+    for job in jobs:
+        pipeline.submit(job)
+    if args.watch or args.worker:
+        stop = threading.Event()
+        # Let service managers stop the daemon the same way as Ctrl+C
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            if args.worker:
+                worker_id = args.worker_id or dist_queue.default_worker_id()
+                logger.info(f"Worker {worker_id} taking jobs from {args.worker}...")
+                _work_shared_queue(
+                    pipeline,
+                    settings,
+                    worker_id,
+                    capacity=workers + args.queue_size,
+                    poll_interval=args.poll_interval,
+                    stop=stop,
+                    keep_running=args.watch,
+                )
+            else:
+                _watch(
+                    pipeline, store, seen_hashes, args.settle, args.poll_interval, stop, audio_dir
+                )
+        except KeyboardInterrupt:
+            logger.info("Stopping; finishing jobs already in the pipeline...")
+    pipeline.close()
+    pipeline.join()
+    if settings.leases is not None:
+        settings.leases.stop()
+    if settings.pdf_renderer is not None:
+        settings.pdf_renderer.close()
+    if store is not None:
+        store.close()
+
+    logger.info(f"Processed {pipeline.completed_count} files.")
+    for job, stage, error in pipeline.failed:
+        logger.error(f"{job.path.name}: {stage} failed: {error}")
+    if pipeline.failed_count:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
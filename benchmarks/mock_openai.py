@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Local stand-in for the OpenAI transcription, chat and model-list endpoints.
+
+Point the SDK at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``. Latency,
+server errors and rate limiting (429) can be injected so benchmarks exercise
+the retry and timeout paths without calling, or paying for, the real API::
+
+    python benchmarks/mock_openai.py --port 8900 --latency-ms 300 --rate-limit-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+MODELS = ("whisper-1", "gpt-4o-mini", "gpt-4o", "gpt-4.1-mini", "gpt-5-mini")
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock server; may be changed while it runs."""
+
+    latency_ms: float = 50.0
+    # Extra delay per MB of uploaded audio, roughly the server-side transcription time
+    latency_per_mb_ms: float = 20.0
+    jitter: float = 0.2
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class MockStats:
+    requests: dict[str, int] = field(default_factory=dict)
+    statuses: dict[int, int] = field(default_factory=dict)
+    bytes_received: int = 0
+
+
+class MockOpenAIServer:
+    """Threaded HTTP server answering like the OpenAI API; use ``start``/``stop``."""
+
+    def __init__(self, settings: Optional[MockSettings] = None, port: int = 0) -> None:
+        self.settings = settings or MockSettings()
+        self.stats = MockStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.settings.seed)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def start(self) -> MockOpenAIServer:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            return self._random.random(), self._random.uniform(-1.0, 1.0)
+
+    def _record(self, path: str, status: int, size: int) -> None:
+        with self._lock:
+            self.stats.requests[path] = self.stats.requests.get(path, 0) + 1
+            self.stats.statuses[status] = self.stats.statuses.get(status, 0) + 1
+            self.stats.bytes_received += size
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: dict[str, Any], headers: Optional[dict] = None) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _fault(self, size: int) -> bool:
+                """Sleep for the configured latency; reply with an injected error if drawn."""
+                s = server.settings
+                roll, jitter = server._draw()
+                delay = (s.latency_ms + s.latency_per_mb_ms * size / 1_000_000) / 1000
+                time.sleep(max(0.0, delay * (1 + s.jitter * jitter)))
+                if roll < s.rate_limit_rate:
+                    server._record(self.path, 429, size)
+                    self._reply(
+                        429,
+                        {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit"}},
+                        {"Retry-After": "0"},
+                    )
+                    return True
+                if roll < s.rate_limit_rate + s.error_rate:
+                    server._record(self.path, 500, size)
+                    self._reply(500, {"error": {"message": "Injected failure (mock)", "type": "server_error"}})
+                    return True
+                server._record(self.path, 200, size)
+                return False
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") != "/v1/models":
+                    self._reply(404, {"error": {"message": "not found"}})
+                    return
+                server._record(self.path, 200, 0)
+                self._reply(
+                    200,
+                    {
+                        "object": "list",
+                        "data": [
+                            {"id": m, "object": "model", "created": 0, "owned_by": "mock"} for m in MODELS
+                        ],
+                    },
+                )
+
+            def do_POST(self) -> None:
+                size = int(self.headers.get("Content-Length", "0"))
+                body = self.rfile.read(size)
+                if self.path == "/v1/audio/transcriptions":
+                    if not self._fault(size):
+                        words = max(1, size // 4000)
+                        self._reply(200, {"text": " ".join(["lorem"] * words)})
+                elif self.path == "/v1/chat/completions":
+                    if self._fault(size):
+                        return
+                    request = json.loads(body or b"{}")
+                    self._reply(
+                        200,
+                        {
+                            "id": "chatcmpl-mock",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": request.get("model", "mock"),
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": "# Title\n\n## Summary\n\n- Point one\n- Point two\n",
+                                    },
+                                    "finish_reason": "stop",
+                                }
+                            ],
+                            "usage": {"prompt_tokens": size // 4, "completion_tokens": 20, "total_tokens": size // 4 + 20},
+                        },
+                    )
+                else:
+                    self._reply(404, {"error": {"message": "not found"}})
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI-compatible API server.")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-per-mb-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args()
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        latency_per_mb_ms=args.latency_per_mb_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    server = MockOpenAIServer(settings, port=args.port)
+    print(f"Mock OpenAI API at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""Benchmark transcription, summaries, batch runs, Markdown parsing and PDF rendering.
+
+All API traffic goes to a local mock (``mock_openai.py``) so runs are free,
+repeatable and can inject latency, server errors and 429 responses. Every
+scenario runs in its own child process so its peak RSS is measured in
+isolation. Results are written to ``benchmarks/results/<time>-<commit>.json``;
+pass an earlier file to ``--compare`` to see regressions::
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<baseline>.json
+
+Synthetic audio is generated as WAV with the standard library; MP3, FLAC and
+M4A variants are added when ffmpeg is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+DEFAULT_LENGTHS = (10, 120, 900)
+SAMPLE_RATE = 16000
+# Metrics where a higher value is better; all others regress when they grow
+HIGHER_IS_BETTER = {"throughput_per_sec", "audio_sec_per_sec", "chars_per_sec"}
+
+
+def make_wav(path: Path, seconds: float, sample_rate: int = SAMPLE_RATE) -> Path:
+    """Write a mono 16-bit tone with short pauses, so silence detection has work to do."""
+    frames_per_block = sample_rate // 10
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        silent = b"\x00\x00" * frames_per_block
+        tone = b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate)))
+            for i in range(frames_per_block)
+        )
+        for block in range(int(seconds * 10)):
+            # 0.7 s of tone followed by 0.3 s of silence
+            w.writeframes(tone if block % 10 < 7 else silent)
+    return path
+
+
+def make_audio(work_dir: Path, lengths: list[int], formats: list[str]) -> list[tuple[str, Path, int]]:
+    """Return ``(format, path, seconds)`` for every requested length and format."""
+    have_ffmpeg = shutil.which("ffmpeg") is not None
+    files = []
+    for seconds in lengths:
+        wav = make_wav(work_dir / f"tone_{seconds}s.wav", seconds)
+        for fmt in formats:
+            if fmt == "wav":
+                files.append((fmt, wav, seconds))
+            elif have_ffmpeg:
+                out = work_dir / f"tone_{seconds}s.{fmt}"
+                subprocess.run(
+                    ["ffmpeg", "-y", "-loglevel", "error", "-i", str(wav), str(out)], check=True
+                )
+                files.append((fmt, out, seconds))
+    return files
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, or None where ``resource`` is missing."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Time one cold call (imports, client set-up) and then ``repeat`` warm calls."""
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception:
+        pass
+    first = time.perf_counter() - t0
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    return {
+        "runs": repeat,
+        "first_sec": round(first, 4),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "wall_sec": round(wall, 4),
+        "throughput_per_sec": round(len(latencies) / wall, 4) if wall else 0.0,
+        "p50_sec": round(percentile(latencies, 50), 4),
+        "p90_sec": round(percentile(latencies, 90), 4),
+        "p99_sec": round(percentile(latencies, 99), 4),
+    }
+
+
+SAMPLE_MARKDOWN = """# Weekly planning
+
+## Summary
+
+The team reviewed the **release schedule** and agreed on *three* priorities.
+
+## Action items
+
+- Finish the importer refactoring
+- Update the documentation
+  - Screenshots for the settings dialog
+- Prepare the demo
+
+---
+
+## Details
+
+"""
+
+
+def _sample_markdown(sections: int) -> str:
+    body = "".join(
+        f"### Topic {i}\n\nDiscussion of item {i} with **decisions** and *follow-ups*. " * 3 + "\n\n"
+        f"Costs < budget & on track, see [the notes](https://example.com/{i}) and `ticket-{i}`.\n\n"
+        f"- Owner: person {i}\n- Due: week {i % 52 + 1}\n  - Review by *the lead*\n\n"
+        f"1. Draft\n2. Review\n3. Publish\n\n"
+        for i in range(sections)
+    )
+    return SAMPLE_MARKDOWN + body
+
+
+def run_child(scenario: dict[str, Any]) -> dict[str, Any]:
+    """Run one scenario in this (fresh) process and return its measurements."""
+    sys.path.insert(0, str(REPO_DIR))
+    import transcribe_summary
+
+    kind = scenario["kind"]
+    repeat = scenario["repeat"]
+    timeouts = dict(transcribe_summary.DEFAULT_TIMEOUTS)
+    api_key = os.environ["OPENAI_API_KEY"]
+    result: dict[str, Any]
+
+    if kind == "transcribe":
+        result = _measure(
+            lambda: transcribe_summary.transcribe(
+                scenario["audio"],
+                model_name="whisper-1",
+                method="api",
+                api_key=api_key,
+                api_options={"compact": scenario.get("compact", False)},
+                timeouts=timeouts,
+            ),
+            repeat,
+        )
+        if result["wall_sec"]:
+            ok = result["runs"] - result["errors"]
+            result["audio_sec_per_sec"] = round(ok * scenario["seconds"] / result["wall_sec"], 2)
+    elif kind == "summarize":
+        transcript = " ".join(["lorem ipsum dolor sit amet"] * scenario["words"])
+        result = _measure(
+            lambda: transcribe_summary.summarize(
+                "Summarize the transcript.", transcript, "gpt-4o-mini", api_key, "en", timeouts
+            ),
+            repeat,
+        )
+    elif kind == "pdf":
+        markdown = _sample_markdown(scenario["sections"])
+        out = Path(scenario["work_dir"]) / "bench.pdf"
+        result = _measure(lambda: transcribe_summary.markdown_to_pdf(markdown, str(out)), repeat)
+    elif kind == "markdown":
+        import markdown_render
+
+        markdown = _sample_markdown(scenario["sections"])
+        styles = transcribe_summary._pdf_styles()
+        result = _measure(lambda: markdown_render.to_flowables(markdown, styles), repeat)
+        if result["p50_sec"]:
+            result["chars_per_sec"] = round(len(markdown) / result["p50_sec"])
+    elif kind == "batch":
+        import batch_transcribe
+
+        work = Path(scenario["work_dir"])
+        audio_dir = work / "audio"
+        audio_dir.mkdir(exist_ok=True)
+        for i, src in enumerate(scenario["audio_files"]):
+            shutil.copy(src, audio_dir / f"{i:03d}_{Path(src).name}")
+        batch_transcribe.AUDIO_DIR = audio_dir
+
+        def run_batch() -> None:
+            # Fresh output and job store each run so every file is processed again
+            run_dir = Path(tempfile.mkdtemp(dir=work))
+            batch_transcribe.OUTPUT_DIR = run_dir / "output"
+            batch_transcribe.LOG_FILE = run_dir / "processed.log"
+            batch_transcribe.STORE_FILE = run_dir / "jobs.sqlite3"
+            sys.argv = ["batch_transcribe.py", "--method", "api", *scenario.get("args", [])]
+            batch_transcribe.main()
+
+        result = _measure(run_batch, repeat)
+        result["files"] = len(scenario["audio_files"])
+    else:
+        raise ValueError(f"Unknown scenario kind: {kind}")
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def build_scenarios(args: argparse.Namespace, work_dir: Path) -> list[tuple[str, dict[str, Any]]]:
+    kinds = args.scenarios.split(",")
+    lengths = [int(x) for x in args.lengths.split(",")]
+    scenarios = []
+    audio = make_audio(work_dir, lengths, args.formats.split(",")) if {"transcribe", "batch"} & set(kinds) else []
+    if "transcribe" in kinds:
+        for fmt, path, seconds in audio:
+            scenarios.append(
+                (
+                    f"transcribe/{fmt}/{seconds}s",
+                    {"kind": "transcribe", "audio": str(path), "seconds": seconds, "repeat": args.repeat},
+                )
+            )
+    if "summarize" in kinds:
+        for words in (500, 5000):
+            scenarios.append(
+                (f"summarize/{words}w", {"kind": "summarize", "words": words, "repeat": args.repeat})
+            )
+    if "pdf" in kinds:
+        for sections in (10, 200):
+            scenarios.append(
+                (
+                    f"pdf/{sections}sections",
+                    {"kind": "pdf", "sections": sections, "repeat": args.repeat, "work_dir": str(work_dir)},
+                )
+            )
+    if "markdown" in kinds:
+        for sections in (200, 2000):
+            scenarios.append(
+                (f"markdown/{sections}sections", {"kind": "markdown", "sections": sections, "repeat": args.repeat})
+            )
+    if "batch" in kinds:
+        files = [str(path) for fmt, path, seconds in audio if fmt == "wav"]
+        scenarios.append(
+            (
+                f"batch/{len(files)}files",
+                {
+                    "kind": "batch",
+                    "audio_files": files,
+                    "repeat": max(1, args.repeat // 3),
+                    "work_dir": str(work_dir),
+                },
+            )
+        )
+    return scenarios
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold_pct: float) -> list[str]:
+    """Return a line per metric that got worse by more than ``threshold_pct`` percent."""
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_sec", "p90_sec", "p99_sec", "peak_rss_mb", "throughput_per_sec", "audio_sec_per_sec", "chars_per_sec"):
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold_pct:
+                regressions.append(f"{name} {metric}: {old} -> {new} ({change:+.1f}% worse)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark gpt_transcribe against a mock OpenAI API.")
+    parser.add_argument("--scenarios", default="transcribe,summarize,markdown,pdf,batch", help="Comma-separated kinds")
+    parser.add_argument("--lengths", default=",".join(map(str, DEFAULT_LENGTHS)), help="Audio lengths in seconds")
+    parser.add_argument("--formats", default="wav,mp3,flac,m4a", help="Audio formats (non-WAV need ffmpeg)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mock API base latency")
+    parser.add_argument("--latency-per-mb-ms", type=float, default=20.0, help="Mock latency per uploaded MB")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of mock requests answered with 429")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="Earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    sys.path.insert(0, str(BENCH_DIR))
+    from mock_openai import MockOpenAIServer, MockSettings
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        latency_per_mb_ms=args.latency_per_mb_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=42,
+    )
+    server = MockOpenAIServer(settings).start()
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="gpt_transcribe_bench_") as tmp:
+        work_dir = Path(tmp)
+        env = dict(
+            os.environ,
+            OPENAI_BASE_URL=server.base_url,
+            OPENAI_API_KEY="mock-key",
+            GPT_TRANSCRIBE_BASE_DIR=str(work_dir / "base"),
+        )
+        try:
+            for name, scenario in build_scenarios(args, work_dir):
+                print(f"{name} ...", end=" ", flush=True)
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--child", json.dumps(scenario)],
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                )
+                if proc.returncode != 0:
+                    print("failed")
+                    results[name] = {"failed": proc.stderr.strip().splitlines()[-1:] or ["no output"]}
+                    continue
+                results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+                r = results[name]
+                print(f"p50 {r['p50_sec']}s p99 {r['p99_sec']}s rss {r['peak_rss_mb']} MB errors {r['errors']}")
+        finally:
+            server.stop()
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mock": vars(settings),
+        "mock_stats": {
+            "requests": server.stats.requests,
+            "statuses": {str(k): v for k, v in server.stats.statuses.items()},
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        out = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"{stamp}-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        print(f"Compared with {args.compare} ({baseline.get('commit', '?')}):")
+        for line in regressions or ["no regressions above threshold"]:
+            print(f"  {line}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
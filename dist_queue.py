@@ -0,0 +1,248 @@
+"""Job queue in a shared directory for running batches on several machines.
+
+The queue is a directory (for example on an NFS or SMB share) with one JSON
+file per job in ``pending/``, ``leased/``, ``done/`` or ``failed/``. Every
+state change is a ``rename``, which is atomic on the same filesystem, so two
+workers can never claim the same job. A claimed job is leased: its worker
+touches the lease file regularly, and a lease that has not been touched for
+``lease_sec`` seconds is returned to ``pending/`` by any other worker. Hosts
+should keep their clocks in sync (NTP) for lease expiry to be reliable.
+
+Pending files are named ``<rank>-<content hash>.json`` with a rank derived
+from the audio duration, so workers pick up the longest recordings first.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+_STATES = (PENDING, LEASED, DONE, FAILED)
+_MAX_RANK = 10**9
+
+
+def _same_claim(job: dict[str, Any], claimed: dict[str, Any]) -> bool:
+    return job.get("worker") == claimed.get("worker") and job.get("claimed_at") == claimed.get(
+        "claimed_at"
+    )
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class Lease:
+    """A job claimed by this worker."""
+
+    name: str
+    path: Path
+    job: dict[str, Any]
+
+
+class DirectoryQueue:
+    """Shared-directory job queue with leases; safe across processes and hosts."""
+
+    def __init__(self, root: Path, lease_sec: float = 300.0, max_attempts: int = 3) -> None:
+        self.root = Path(root)
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        for state in _STATES + ("tmp",):
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _dir(self, state: str) -> Path:
+        return self.root / state
+
+    def _find(self, content_hash: str) -> Optional[tuple[str, Path]]:
+        for state in _STATES:
+            for path in self._dir(state).glob(f"*-{content_hash}.json"):
+                return state, path
+        return None
+
+    def _write(self, target: Path, job: dict[str, Any]) -> None:
+        """Write ``job`` to ``target`` so readers never see a partial file."""
+        tmp = self._dir("tmp") / f"{uuid.uuid4().hex}.json"
+        tmp.write_text(json.dumps(job), encoding="utf-8")
+        os.replace(tmp, target)
+
+    def _move(
+        self,
+        src: Path,
+        state: str,
+        updates: dict[str, Any],
+        owner: Optional[Lease] = None,
+    ) -> Optional[Path]:
+        """Atomically take ``src``, update its contents and publish it in ``state``.
+
+        Returns None if another process moved ``src`` first. With ``owner``,
+        the job is only moved while it is still that lease's: ownership is
+        checked after the file has been taken, so an expired lease cannot be
+        reclaimed between the check and the move.
+        """
+        staged = self._dir("tmp") / f"{src.name}.{uuid.uuid4().hex}"
+        try:
+            os.rename(src, staged)
+            job = json.loads(staged.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if owner is not None and not _same_claim(job, owner.job):
+            # Re-queued and claimed by someone else meanwhile: put it back untouched
+            os.rename(staged, src)
+            return None
+        job.update(updates)
+        target = self._dir(state) / src.name
+        self._write(target, job)
+        staged.unlink()
+        return target
+
+    def enqueue(
+        self, content_hash: str, filename: str, size_bytes: int, duration_sec: float = 0.0
+    ) -> bool:
+        """Add a job unless this content is already queued, running or done.
+
+        Failed jobs are queued again with a fresh attempt count. Returns True if
+        the job was (re)queued.
+        """
+        found = self._find(content_hash)
+        if found is not None:
+            state, path = found
+            if state != FAILED:
+                return False
+            return self._move(path, PENDING, {"attempts": 0, "error": None}) is not None
+        rank = _MAX_RANK - min(int(duration_sec or 0), _MAX_RANK - 1)
+        job = {
+            "content_hash": content_hash,
+            "filename": filename,
+            "size_bytes": size_bytes,
+            "duration_sec": duration_sec,
+            "attempts": 0,
+            "worker": None,
+            "error": None,
+            "enqueued_at": time.time(),
+        }
+        self._write(self._dir(PENDING) / f"{rank:010d}-{content_hash}.json", job)
+        return True
+
+    def claim(self, worker_id: str) -> Optional[Lease]:
+        """Lease the next pending job (longest first), or return None if there is none."""
+        for path in sorted(self._dir(PENDING).glob("*.json")):
+            leased = self._move(path, LEASED, {"worker": worker_id, "claimed_at": time.time()})
+            if leased is not None:
+                job = json.loads(leased.read_text(encoding="utf-8"))
+                return Lease(name=path.name, path=leased, job=job)
+        return None
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Renew ``lease``; False means it expired and was handed to someone else."""
+        try:
+            os.utime(lease.path)
+        except FileNotFoundError:
+            return False
+        return self._owns(lease)
+
+    def _owns(self, lease: Lease) -> bool:
+        try:
+            job = json.loads(lease.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return False
+        return _same_claim(job, lease.job)
+
+    def complete(self, lease: Lease, **result: Any) -> bool:
+        """Mark a leased job done; returns False if the lease was lost meanwhile."""
+        updates = {"finished_at": time.time(), **result}
+        return self._move(lease.path, DONE, updates, owner=lease) is not None
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Give a job back for another attempt, or park it in ``failed/`` after the last one."""
+        attempts = lease.job.get("attempts", 0) + 1
+        state = FAILED if attempts >= self.max_attempts else PENDING
+        updates = {"attempts": attempts, "error": error}
+        return self._move(lease.path, state, updates, owner=lease) is not None
+
+    def requeue_expired(self) -> int:
+        """Return leases not renewed within ``lease_sec`` to ``pending/``.
+
+        Also recovers jobs left in the staging area by a worker that died in
+        the middle of a state change. Returns the number of jobs re-queued.
+        """
+        cutoff = time.time() - self.lease_sec
+        count = 0
+        for path in self._dir(LEASED).glob("*.json"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                worker = json.loads(path.read_text(encoding="utf-8")).get("worker")
+            except (FileNotFoundError, ValueError):
+                continue
+            if self._move(path, PENDING, {"worker": None, "error": f"lease of {worker} expired"}):
+                logger.warning(f"Lease of {worker} on {path.name} expired; job re-queued")
+                count += 1
+        for path in self._dir("tmp").glob("*.json.*"):
+            try:
+                # rename keeps the mtime but updates ctime, i.e. when the move started
+                stale = path.stat().st_ctime < cutoff
+            except FileNotFoundError:
+                continue
+            target = self._dir(PENDING) / path.name.rsplit(".", 1)[0]
+            if stale and not target.exists():
+                try:
+                    os.rename(path, target)
+                    count += 1
+                except FileNotFoundError:
+                    pass
+        return count
+
+    def counts(self) -> dict[str, int]:
+        return {state: len(list(self._dir(state).glob("*.json"))) for state in _STATES}
+
+
+class LeaseKeeper:
+    """Renews the leases a worker holds from a background thread."""
+
+    def __init__(self, dq: DirectoryQueue, interval: Optional[float] = None) -> None:
+        self.dq = dq
+        self.interval = interval or max(1.0, dq.lease_sec / 3)
+        self._leases: dict[str, Lease] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+
+    def add(self, lease: Lease) -> None:
+        with self._lock:
+            self._leases[lease.name] = lease
+
+    def remove(self, lease: Lease) -> None:
+        with self._lock:
+            self._leases.pop(lease.name, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._leases)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                leases = list(self._leases.values())
+            for lease in leases:
+                if not self.dq.heartbeat(lease):
+                    logger.warning(f"Lost lease on {lease.job.get('filename')}")
+                    self.remove(lease)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
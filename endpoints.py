@@ -0,0 +1,175 @@
+"""Spread API requests over several OpenAI-compatible endpoints.
+
+An endpoint is a base URL plus an API key, for example another OpenAI project
+with its own rate limit or a self-hosted Whisper-compatible server. They are
+configured as ``endpoints`` in ``[whisper_api]`` (transcription) and
+``[openai]`` (summaries), one per line or separated by commas::
+
+    endpoints = https://api.openai.com/v1 sk-project-a
+                https://api.openai.com/v1 sk-project-b
+                http://whisper.lan:8000/v1
+
+An entry without a key uses ``[openai] api_key``. ``EndpointPool`` sends each
+request to the healthy endpoint with the fewest requests in flight. An
+endpoint that fails (connection error, timeout, 429, 5xx, rejected key) is
+taken out of rotation for a cool-down that doubles with every further failure
+(or for as long as ``Retry-After`` asks), so the caller's retry goes to
+another endpoint. After the cool-down one request probes it again; an
+optional background check probes resting endpoints earlier.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COOLDOWN_SEC = 30.0
+MAX_COOLDOWN_FACTOR = 8
+# Status codes caused by the request itself; another endpoint would answer the same
+_REQUEST_FAULTS = {400, 404, 413, 415, 422}
+
+
+@dataclass
+class Endpoint:
+    """One base URL and key with its routing state."""
+
+    base_url: str
+    api_key: str
+    outstanding: int = 0
+    served: int = 0
+    failures: int = 0
+    down_until: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.base_url or "default"
+
+
+def parse_endpoints(value: str, default_key: str = "") -> list[Endpoint]:
+    """Parse ``URL [KEY]`` entries separated by newlines or commas.
+
+    ``default`` as URL stands for the SDK's default endpoint (``OPENAI_BASE_URL``
+    or api.openai.com).
+    """
+    endpoints = []
+    for entry in re.split(r"[,\n]", value or ""):
+        parts = entry.split()
+        if not parts:
+            continue
+        if len(parts) > 2:
+            raise ValueError(f"Invalid endpoint entry {entry.strip()!r}; expected 'URL [KEY]'")
+        url = "" if parts[0] == "default" else parts[0].rstrip("/")
+        endpoints.append(Endpoint(base_url=url, api_key=parts[1] if len(parts) == 2 else default_key))
+    return endpoints
+
+
+def is_endpoint_fault(error: BaseException) -> bool:
+    """True unless ``error`` is an HTTP error caused by the request itself."""
+    return getattr(error, "status_code", None) not in _REQUEST_FAULTS
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class EndpointPool:
+    """Least-outstanding-requests routing with passive and active health checks.
+
+    ``probe(endpoint)`` should make a cheap request and raise on failure; with
+    ``health_interval`` > 0 it is called from a background thread for every
+    endpoint that is out of rotation.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        cooldown: float = DEFAULT_COOLDOWN_SEC,
+        probe: Optional[Callable[[Endpoint], None]] = None,
+        health_interval: float = 0.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.cooldown = cooldown
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if probe is not None and health_interval > 0:
+            threading.Thread(
+                target=self._health_loop, args=(health_interval,), name="endpoint-health", daemon=True
+            ).start()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self) -> Endpoint:
+        """Pick the endpoint for the next request; pair every call with ``release``.
+
+        When every endpoint is resting, the one that recovers first is used
+        rather than failing outright.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ready = [e for e in self.endpoints if e.down_until <= now]
+            if not ready:
+                ready = [min(self.endpoints, key=lambda e: e.down_until)]
+            endpoint = min(ready, key=lambda e: (e.outstanding, e.served))
+            endpoint.outstanding += 1
+            endpoint.served += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, error: Optional[BaseException] = None) -> None:
+        """Record the outcome of a request sent to ``endpoint``."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.failures = 0
+                endpoint.down_until = 0.0
+                return
+            if not is_endpoint_fault(error):
+                return
+            endpoint.failures += 1
+            rest = _retry_after(error)
+            if rest is None:
+                rest = self.cooldown * min(2 ** (endpoint.failures - 1), MAX_COOLDOWN_FACTOR)
+            endpoint.down_until = time.monotonic() + rest
+        logger.warning(f"Endpoint {endpoint.name} failed ({error}); resting for {rest:.0f}s")
+
+    def available(self) -> int:
+        """Number of endpoints currently in rotation."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for e in self.endpoints if e.down_until <= now)
+
+    def check_health(self) -> None:
+        """Probe every resting endpoint and return the responsive ones to rotation."""
+        now = time.monotonic()
+        with self._lock:
+            resting = [e for e in self.endpoints if e.down_until > now]
+        for endpoint in resting:
+            try:
+                self.probe(endpoint)
+            except Exception as e:
+                logger.debug(f"Endpoint {endpoint.name} still unavailable: {e}")
+                continue
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.down_until = 0.0
+            logger.info(f"Endpoint {endpoint.name} is back in rotation")
+
+    def _health_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def stop(self) -> None:
+        self._stop.set()
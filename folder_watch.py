@@ -0,0 +1,172 @@
+"""Wait for new audio files in a directory.
+
+On Linux the directory is watched with inotify (through ctypes, no extra
+dependency); elsewhere, or if inotify is unavailable, it is polled. Either
+way a file is only reported once its size and modification time have stopped
+changing for ``settle_sec`` seconds, so recordings that are still being
+copied or written are not picked up half-finished.
+
+inotify drops events when its queue overflows and does not see every change
+on network shares, so the directory is also rescanned after an overflow and
+every ``rescan_sec`` seconds.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal non-blocking inotify watch on a single directory."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # IN_ATTRIB catches a touched file, so it can be retried without copying it again
+        mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> Optional[list[str]]:
+        """Return names of entries that changed, waiting at most ``timeout`` seconds.
+
+        Returns None if events were lost and the directory must be rescanned.
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        overflow = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            overflow = overflow or bool(mask & IN_Q_OVERFLOW)
+            start = offset + _EVENT_HEADER.size
+            name = data[start: start + length].rstrip(b"\0")
+            if name:
+                names.append(os.fsdecode(name))
+            offset = start + length
+        return None if overflow else names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _stat(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def watch(
+    directory: Path,
+    extensions: Iterable[str],
+    settle_sec: float = 2.0,
+    poll_interval: float = 2.0,
+    stop: Optional[threading.Event] = None,
+    use_inotify: bool = True,
+    rescan_sec: float = 60.0,
+) -> Iterator[Path]:
+    """Yield audio files in ``directory`` once they are completely written.
+
+    Files already present are reported too. A file is reported again only if
+    its size or modification time changes afterwards. Stops when ``stop`` is set.
+    With inotify the directory is still rescanned every ``rescan_sec`` seconds.
+    """
+    directory = Path(directory)
+    exts = {e.lower() for e in extensions}
+    stop = stop or threading.Event()
+    notifier: Optional[_Inotify] = None
+    if use_inotify and platform.system() == "Linux":
+        try:
+            notifier = _Inotify(directory)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}); polling {directory} instead")
+
+    # path -> (size, mtime_ns, monotonic time the signature last changed)
+    pending: dict[Path, tuple[int, int, float]] = {}
+    reported: dict[Path, tuple[int, int]] = {}
+
+    def consider(path: Path) -> None:
+        if path.suffix.lower() not in exts:
+            return
+        sig = _stat(path)
+        if sig is None or not path.is_file():
+            pending.pop(path, None)
+            return
+        if reported.get(path) == sig:
+            return
+        previous = pending.get(path)
+        if previous is None or previous[:2] != sig:
+            pending[path] = (sig[0], sig[1], time.monotonic())
+
+    def scan() -> float:
+        entries = set(directory.iterdir())
+        for entry in entries:
+            consider(entry)
+        # Forget files that are gone so a long-running watch does not grow
+        for path in [p for p in reported if p not in entries]:
+            del reported[path]
+        return time.monotonic()
+
+    try:
+        last_scan = scan()
+        while not stop.is_set():
+            now = time.monotonic()
+            for path, (size, mtime, changed) in list(pending.items()):
+                consider(path)
+                if path in pending and pending[path][2] == changed and now - changed >= settle_sec:
+                    del pending[path]
+                    reported[path] = (size, mtime)
+                    yield path
+            if pending:
+                wait = min(poll_interval, settle_sec / 2)
+            else:
+                wait = poll_interval
+            if notifier is not None:
+                names = notifier.read(wait)
+                if names is None:
+                    logger.warning(f"inotify queue overflowed; rescanning {directory}")
+                    last_scan = scan()
+                else:
+                    for name in names:
+                        consider(directory / name)
+                    if time.monotonic() - last_scan >= rescan_sec:
+                        last_scan = scan()
+            else:
+                stop.wait(wait)
+                if time.monotonic() - last_scan >= poll_interval:
+                    last_scan = scan()
+    finally:
+        if notifier is not None:
+            notifier.close()
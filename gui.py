@@ -5,9 +5,14 @@ from tkinter import filedialog, messagebox, scrolledtext
 from tkinter import ttk
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import multiprocessing
 
 import os
+import instrumentation
+import job_server
+import pdf_render
 import transcribe_summary
 
 BASE_DIR = transcribe_summary.BASE_DIR
@@ -35,6 +40,11 @@ SUMMARY_MODELS = [
     "gpt-5-pro",
 ]
 
+# Files of a group transcribed at once; each may upload MAX_API_WORKERS chunks in parallel
+DEFAULT_GROUP_WORKERS = 3
+# Interval at which worker updates are applied to the window (10 frames per second)
+FRAME_MS = 100
+
 
 def load_whisper_models(
     config_path: Path = CONFIG_PATH, template_path: Path = CONFIG_TEMPLATE_PATH
@@ -73,6 +83,267 @@ def load_whisper_models(
             local_models.update(local)
     return sorted(api_models), sorted(local_models)
 
+
+def transcribe_group(audio_files, run_transcribe, workers, file_status=None):
+    """Transcribe ``audio_files`` with up to ``workers`` at once; results keep input order.
+
+    ``run_transcribe(audio, update)`` transcribes one file, ``update`` forwards
+    its progress messages. ``file_status(index, text)`` receives the state of
+    each file. The first failure cancels the files that have not started yet.
+    """
+
+    def status(index, text):
+        if file_status:
+            file_status(index, text)
+
+    def run_one(index, audio):
+        status(index, "Transcribing...")
+        transcript = run_transcribe(audio, lambda msg: status(index, msg))
+        status(index, "✅ Transcribed")
+        return transcript
+
+    for index in range(len(audio_files)):
+        status(index, "Queued")
+    ex = ThreadPoolExecutor(max_workers=max(1, min(workers, len(audio_files))))
+    try:
+        futures = [ex.submit(run_one, i, audio) for i, audio in enumerate(audio_files)]
+        results = []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                status(index, f"❌ {e}")
+                raise
+        return results
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+class ProgressBus:
+    """Thread-safe mailbox between worker threads and the Tk loop.
+
+    Workers post status texts and table rows as often as they like. Only the
+    latest text per target is kept until the Tk loop drains the bus once per
+    frame, so a burst of chunk messages costs one redraw instead of one
+    ``after`` callback each. ``post`` queues calls that must all run, in
+    order, such as dialogs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._status = None
+        self._rows: dict = {}
+        self._calls: list = []
+
+    def status(self, text: str) -> None:
+        with self._lock:
+            self._status = text
+
+    def row(self, iid: str, text: str) -> None:
+        with self._lock:
+            self._rows[iid] = text
+
+    def post(self, fn, *args) -> None:
+        with self._lock:
+            self._calls.append((fn, args))
+
+    def drain(self):
+        """Return ``(status or None, {row: text}, [(fn, args)])`` and start over."""
+        with self._lock:
+            drained = (self._status, self._rows, self._calls)
+            self._status, self._rows, self._calls = None, {}, []
+        return drained
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+
+def describe_progress(meters) -> str:
+    """Summarize uploaded bytes, transcribed audio and time left over ``meters``."""
+    totals: dict = {}
+    etas = []
+    for meter in meters:
+        snapshot = meter.snapshot()
+        for unit, (done, total) in snapshot.items():
+            prev_done, prev_total = totals.get(unit, (0.0, 0.0))
+            totals[unit] = (prev_done + done, prev_total + total)
+        # Time left from audio progress where known, else from the upload
+        unit = instrumentation.AUDIO_SEC if meter.fraction(instrumentation.AUDIO_SEC) else instrumentation.BYTES
+        eta = meter.eta(unit)
+        if eta is not None and snapshot.get(unit, (0, 0))[0] < snapshot.get(unit, (0, 0))[1]:
+            etas.append(eta)
+    parts = []
+    if totals.get(instrumentation.BYTES, (0, 0))[1]:
+        done, total = totals[instrumentation.BYTES]
+        parts.append(f"Uploaded {done / 1e6:.1f} of {total / 1e6:.1f} MB")
+    if totals.get(instrumentation.AUDIO_SEC, (0, 0))[1]:
+        done, total = totals[instrumentation.AUDIO_SEC]
+        parts.append(f"Transcribed {format_duration(done)} of {format_duration(total)}")
+    if etas:
+        # Files run in parallel, so the slowest one decides
+        parts.append(f"about {format_duration(max(etas))} left")
+    return " · ".join(parts)
+
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "✅ Done"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+
+class Job:
+    """One press of Start: the files, output directory and method at that moment."""
+
+    def __init__(self, job_id: int, audio_files: list, output_dir: str, method: str) -> None:
+        self.id = job_id
+        self.iid = f"job{job_id}"
+        self.audio_files = list(audio_files)
+        self.output_dir = output_dir
+        self.method = method
+        self.state = QUEUED
+        self.error = ""
+        self.cancel_event = threading.Event()
+        # One meter per file, so files that have not started do not skew the fractions
+        self.meters = [instrumentation.ProgressMeter() for _ in self.audio_files]
+        # For grouped transcription we have ~1 step per file (transcribe), then summarize, then write
+        self.steps = (len(self.audio_files) + 2) if len(self.audio_files) > 1 else 3
+        self.steps_done = 0
+        self._lock = threading.Lock()
+
+    def step(self) -> None:
+        with self._lock:
+            self.steps_done += 1
+
+    def meter_for(self, audio: str):
+        return self.meters[self.audio_files.index(audio)]
+
+    def progress_units(self) -> float:
+        """Steps done, counting partly transcribed files by their audio (or upload) progress."""
+        if self.state in (DONE, FAILED, CANCELLED):
+            return float(self.steps)
+        transcribed = 0.0
+        for meter in self.meters:
+            fraction = meter.fraction(instrumentation.AUDIO_SEC)
+            if fraction is None:
+                fraction = meter.fraction(instrumentation.BYTES) or 0.0
+            transcribed += fraction
+        return max(float(self.steps_done), transcribed)
+
+    @property
+    def name(self) -> str:
+        first = Path(self.audio_files[0]).name
+        more = len(self.audio_files) - 1
+        return f"{self.id}: {first}" + (f" (+{more} more)" if more else "")
+
+
+class JobQueue:
+    """Run jobs in submission order, at most ``workers`` at a time.
+
+    Queued jobs can be moved or cancelled. Cancelling a running job sets its
+    ``cancel_event``; ``run(job)`` is expected to stop at its next check by
+    raising ``transcribe_summary.Cancelled``. ``on_change(job)`` is called
+    from the queue's threads whenever a job changes state.
+    """
+
+    def __init__(self, run, workers: int = 1, on_change=None) -> None:
+        self._run_job = run
+        self.workers = max(1, workers)
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._queued: list = []
+        self._running: dict = {}
+
+    def queued(self) -> list:
+        with self._lock:
+            return list(self._queued)
+
+    def running(self) -> list:
+        with self._lock:
+            return list(self._running.values())
+
+    def submit(self, job: Job) -> None:
+        with self._lock:
+            self._queued.append(job)
+        self._notify(job)
+        self._dispatch()
+
+    def move(self, job_id: int, offset: int):
+        """Swap a queued job with its neighbour ``offset`` (-1 or 1) places away.
+
+        Returns the neighbour, or None when the job is not queued or already
+        at that end of the queue.
+        """
+        with self._lock:
+            ids = [job.id for job in self._queued]
+            if job_id not in ids:
+                return None
+            index = ids.index(job_id)
+            other = index + offset
+            if not 0 <= other < len(ids):
+                return None
+            queue = self._queued
+            queue[index], queue[other] = queue[other], queue[index]
+            return queue[index]
+
+    def cancel(self, job_id: int) -> bool:
+        """Drop a queued job or ask a running one to stop; False if it already ended."""
+        with self._lock:
+            job = next((j for j in self._queued if j.id == job_id), None)
+            if job is not None:
+                self._queued.remove(job)
+                job.state = CANCELLED
+            else:
+                job = self._running.get(job_id)
+            if job is None:
+                return False
+            job.cancel_event.set()
+        if job.state == CANCELLED:
+            self._notify(job)
+        return True
+
+    def set_workers(self, workers: int) -> None:
+        with self._lock:
+            self.workers = max(1, workers)
+        self._dispatch()
+
+    def _notify(self, job: Job) -> None:
+        if self.on_change:
+            self.on_change(job)
+
+    def _dispatch(self, finished=None) -> None:
+        started = []
+        with self._lock:
+            # Retire a finished job and start its successor in one step
+            if finished is not None:
+                self._running.pop(finished.id, None)
+            while self._queued and len(self._running) < self.workers:
+                job = self._queued.pop(0)
+                job.state = RUNNING
+                self._running[job.id] = job
+                started.append(job)
+        for job in started:
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), name=f"gui-job-{job.id}", daemon=True).start()
+
+    def _run(self, job: Job) -> None:
+        try:
+            self._run_job(job)
+            job.state = DONE
+        except transcribe_summary.Cancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            # An abandoned request may fail in its own way after a cancel
+            job.state = CANCELLED if job.cancel_event.is_set() else FAILED
+            job.error = str(e)
+        finally:
+            self._dispatch(finished=job)
+        self._notify(job)
+
+
 def apply_dark_theme(style: ttk.Style) -> None:
     """Apply a professional dark theme inspired by modern editors (Cursor/VS Code)."""
     # Palette
@@ -123,6 +394,11 @@ def apply_dark_theme(style: ttk.Style) -> None:
     # Progressbar
     style.configure('Modern.Horizontal.TProgressbar', background=ACCENT, troughcolor=BG, bordercolor=BORDER, lightcolor=ACCENT, darkcolor=ACCENT)
 
+    # Job and file progress table
+    style.configure('Treeview', background=ENTRY_BG, fieldbackground=ENTRY_BG, foreground=TEXT, bordercolor=BORDER, font=('Segoe UI', 9))
+    style.configure('Treeview.Heading', background=SURFACE, foreground=TEXT, font=('Segoe UI', 9, 'bold'))
+    style.map('Treeview', background=[('selected', SELECTION)])
+
     # Scrollbar
     style.configure('Vertical.TScrollbar', background=SURFACE, troughcolor=BG, bordercolor=BORDER, arrowcolor=TEXT)
 
@@ -155,9 +431,24 @@ class TranscribeGUI:
         self.audio_files: list[str] = []
         self.output_dir_var = tk.StringVar()
         self.status_var = tk.StringVar(value="Ready to transcribe")
+        self.detail_var = tk.StringVar()
+        self.bus = ProgressBus()
+        # Jobs shown by the progress bar; reset when a job starts on an idle queue
+        self._bar_jobs: list = []
+
+        self._warm_key = None
+        self._jobs: dict[int, Job] = {}
+        self._next_job_id = 1
+        self.jobs = JobQueue(
+            self.transcribe_all,
+            workers=self.config.getint("general", "max_jobs", fallback=1),
+            on_change=self._job_changed,
+        )
 
         self.create_menu()
         self.create_main_widgets()
+        self.warm_local_model()
+        self._pump()
 
     def create_menu(self) -> None:
         menubar = tk.Menu(self.master)
@@ -285,6 +576,24 @@ class TranscribeGUI:
             font=('Segoe UI', 9)
         )
         method_combo.grid(row=1, column=0, sticky="w")
+        method_combo.bind("<<ComboboxSelected>>", lambda _e: self.warm_local_model(), add=True)
+
+        ttk.Label(settings_frame, text="Parallel jobs:", style='Header.TLabel').grid(
+            row=0, column=1, sticky="w", padx=(20, 0), pady=(0, 5)
+        )
+        self.max_jobs_var = tk.IntVar(value=self.jobs.workers)
+        jobs_spin = ttk.Spinbox(
+            settings_frame,
+            from_=1,
+            to=8,
+            width=4,
+            textvariable=self.max_jobs_var,
+            command=self.update_max_jobs,
+            font=('Segoe UI', 9)
+        )
+        jobs_spin.grid(row=1, column=1, sticky="w", padx=(20, 0))
+        jobs_spin.bind("<FocusOut>", lambda _e: self.update_max_jobs(), add=True)
+        jobs_spin.bind("<Return>", lambda _e: self.update_max_jobs(), add=True)
 
         # Progress Section
         progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding=15, style='Card.TLabelframe')
@@ -296,7 +605,38 @@ class TranscribeGUI:
             style='Modern.Horizontal.TProgressbar',
             mode="determinate"
         )
-        self.progress.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        self.progress.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+        ttk.Label(progress_frame, textvariable=self.detail_var, style='Info.TLabel').grid(
+            row=3, column=0, sticky="w", pady=(10, 0)
+        )
+
+        # One row per job; group jobs list their files underneath
+        self.job_rows = ttk.Treeview(
+            progress_frame, columns=("status",), height=5, selectmode="browse"
+        )
+        self.job_rows.heading("#0", text="Job", anchor="w")
+        self.job_rows.heading("status", text="Status", anchor="w")
+        self.job_rows.column("#0", width=280, stretch=False)
+        self.job_rows.column("status", width=320)
+        self.job_rows.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+
+        queue_buttons = ttk.Frame(progress_frame, style='TFrame')
+        queue_buttons.grid(row=2, column=0, sticky="w")
+        for text, command in (
+            ("▲ Up", lambda: self.move_selected_job(-1)),
+            ("▼ Down", lambda: self.move_selected_job(1)),
+            ("Clear Finished", self.clear_finished_jobs),
+        ):
+            ttk.Button(queue_buttons, text=text, command=command, cursor='hand2').pack(
+                side="left", padx=(0, 10)
+            )
+        ttk.Button(
+            queue_buttons,
+            text="✖ Cancel Job",
+            style='Danger.TButton',
+            command=self.cancel_selected_job,
+            cursor='hand2',
+        ).pack(side="left")
 
         # Status and action buttons
         action_frame = ttk.Frame(main_frame, style='TFrame')
@@ -318,6 +658,10 @@ class TranscribeGUI:
             cursor='hand2',
         ).grid(row=0, column=1, sticky="e")
 
+    @property
+    def busy(self) -> bool:
+        return bool(self.jobs.running())
+
     def clear_audio_files(self):
         """Clear all selected audio files"""
         self.audio_files.clear()
@@ -325,16 +669,71 @@ class TranscribeGUI:
         self.set_status("Ready to transcribe")
 
     def set_status(self, text: str) -> None:
-        self.master.after(0, self.status_var.set, text)
+        self.bus.status(text)
+
+    def _pump(self) -> None:
+        """Apply the updates collected since the last frame; runs on the Tk loop."""
+        status, rows, calls = self.bus.drain()
+        if status is not None:
+            self.status_var.set(status)
+        for iid, text in rows.items():
+            self._set_row_status(iid, text)
+        # After the rows, so a job's final state is not overwritten by its last message
+        for fn, args in calls:
+            fn(*args)
+        if self._bar_jobs:
+            self.progress["maximum"] = sum(job.steps for job in self._bar_jobs)
+            self.progress["value"] = sum(job.progress_units() for job in self._bar_jobs)
+        running = self.jobs.running()
+        self.detail_var.set(describe_progress(m for job in running for m in job.meters))
+        self.master.after(FRAME_MS, self._pump)
+
+    def warm_local_model(self) -> None:
+        """Preload the configured local Whisper model in the background."""
+        if self.method_var.get() != "local" or job_server.get_server_settings(self.config)[0]:
+            return
+        try:
+            model = self.config.get("whisper_local", "model", fallback="base")
+        except Exception:
+            model = "base"
+        options = transcribe_summary.get_local_options(self.config)
+        key = (model, tuple(sorted(options.items())))
+        if key == self._warm_key:
+            return
+        self._warm_key = key
+
+        def done(error) -> None:
+            if self.busy or key != self._warm_key:
+                return
+            if error is None:
+                self.set_status(f"Local model '{model}' ready")
+            else:
+                self._warm_key = None
+                self.set_status(f"Could not preload local model '{model}': {error}")
 
-    def step_progress(self) -> None:
-        self.master.after(0, self.progress.step)
+        if not self.busy:
+            self.set_status(f"Loading local model '{model}' in the background...")
+        transcribe_summary.start_local_warmup(model, options, done_cb=done)
+
+    def _set_row_status(self, iid: str, text: str) -> None:
+        # Rows may have been cleared meanwhile
+        if self.job_rows.exists(iid):
+            self.job_rows.set(iid, "status", text)
+
+    def set_job_status(self, job: Job, text: str) -> None:
+        self.bus.row(job.iid, text)
+
+    def set_file_status(self, job: Job, index: int, text: str) -> None:
+        self.bus.row(f"{job.iid}:{index}", text)
+
+    def step_progress(self, job: Job) -> None:
+        job.step()
 
     def show_info(self, title: str, msg: str) -> None:
-        self.master.after(0, lambda: messagebox.showinfo(title, msg))
+        self.bus.post(messagebox.showinfo, title, msg)
 
     def show_error(self, title: str, msg: str) -> None:
-        self.master.after(0, lambda: messagebox.showerror(title, msg))
+        self.bus.post(messagebox.showerror, title, msg)
 
     def select_audio(self) -> None:
         raw_paths = filedialog.askopenfilenames(filetypes=AUDIO_EXTS)
@@ -366,7 +765,12 @@ class TranscribeGUI:
             messagebox.showwarning("No output", "Please select an output directory.")
             return
         # Early validation of API key when method is API to prevent cryptic errors
-        if self.method_var.get() == "api":
+        # (a job server uses its own key, endpoints may bring their own)
+        if (
+            self.method_var.get() == "api"
+            and not job_server.get_server_settings(self.config)[0]
+            and not self.config.get("whisper_api", "endpoints", fallback="").strip()
+        ):
             api_key_check = transcribe_summary.get_api_key(self.config)
             if not api_key_check:
                 messagebox.showerror(
@@ -383,119 +787,274 @@ class TranscribeGUI:
                 "Missing output", f"Output directory not found: {output_dir}"
             )
             return
-        self.progress["value"] = 0
-        # For grouped transcription we have ~1 step per file (transcribe), then summarize, then write
-        self.progress["maximum"] = (len(self.audio_files) + 2) if len(self.audio_files) > 1 else (len(self.audio_files) * 3)
-        threading.Thread(
-            target=self.transcribe_all, args=(output_dir,), daemon=True
-        ).start()
-
-    def transcribe_all(self, output_dir: str) -> None:
-        self.set_status("Working...")
+        job = Job(self._next_job_id, self.audio_files, output_dir, self.method_var.get())
+        self._next_job_id += 1
+        self._jobs[job.id] = job
+        if not self.jobs.running() and not self.jobs.queued():
+            self._bar_jobs = []
+        self._bar_jobs.append(job)
+        self.job_rows.insert("", "end", iid=job.iid, text=job.name, values=(QUEUED,), open=True)
+        if len(job.audio_files) > 1:
+            for idx, audio in enumerate(job.audio_files):
+                self.job_rows.insert(job.iid, "end", iid=f"{job.iid}:{idx}", text=Path(audio).name, values=("",))
+        self.jobs.submit(job)
+
+    def update_max_jobs(self) -> None:
         try:
-            method = self.method_var.get()
-            try:
-                language = self.config.get("general", "language", fallback="en")
-            except Exception:
-                language = "en"
-            # Use helper that reads env fallback
-            api_key = transcribe_summary.get_api_key(self.config)
-            try:
-                summary_model = self.config.get("openai", "summary_model", fallback="gpt-4o-mini")
-            except Exception:
-                summary_model = "gpt-4o-mini"
-            whisper_section = "whisper_api" if method == "api" else "whisper_local"
-            try:
-                whisper_model = self.config.get(whisper_section, "model", fallback=("whisper-1" if method == "api" else "base"))
-            except Exception:
-                whisper_model = "whisper-1" if method == "api" else "base"
-            prompt = transcribe_summary._load_text(PROMPT_PATH)
-
-            if len(self.audio_files) > 1:
-                # Group mode: transcribe all files and summarize once
-                combined_transcript_parts: list[str] = []
-                for idx, audio in enumerate(self.audio_files, 1):
-                    self.set_status(f"Transcribing {idx}/{len(self.audio_files)}")
-
-                    def update(msg: str, i=idx):
-                        self.set_status(f"{msg} ({i}/{len(self.audio_files)})")
-
-                    transcript = transcribe_summary.transcribe(
-                        audio,
-                        model_name=whisper_model,
-                        method=method,
-                        api_key=api_key if method == "api" else None,
-                        progress_cb=update,
-                    )
-                    combined_transcript_parts.append(
-                        f"\n\n=== {Path(audio).name} ===\n\n{transcript}\n"
+            self.jobs.set_workers(int(self.max_jobs_var.get()))
+        except (tk.TclError, ValueError):
+            self.max_jobs_var.set(self.jobs.workers)
+
+    def _selected_job(self):
+        selection = self.job_rows.selection()
+        if not selection:
+            return None
+        # A file row belongs to the job above it
+        iid = self.job_rows.parent(selection[0]) or selection[0]
+        return self._jobs.get(int(iid[len("job"):]))
+
+    def move_selected_job(self, offset: int) -> None:
+        job = self._selected_job()
+        if job is None:
+            return
+        neighbour = self.jobs.move(job.id, offset)
+        if neighbour is not None:
+            self.job_rows.move(job.iid, "", self.job_rows.index(neighbour.iid))
+
+    def cancel_selected_job(self) -> None:
+        job = self._selected_job()
+        if job is not None and self.jobs.cancel(job.id) and job.state == RUNNING:
+            self._set_row_status(job.iid, "Cancelling...")
+
+    def clear_finished_jobs(self) -> None:
+        for job_id, job in list(self._jobs.items()):
+            if job.state in (DONE, FAILED, CANCELLED):
+                self.job_rows.delete(job.iid)
+                del self._jobs[job_id]
+
+    def _job_changed(self, job: Job) -> None:
+        # Called from the queue's threads
+        self.bus.post(self._show_job_state, job)
+
+    def _show_job_state(self, job: Job) -> None:
+        text = f"❌ {job.error}" if job.state == FAILED else job.state
+        self._set_row_status(job.iid, text)
+        if job.state == FAILED:
+            self.status_var.set("❌ Error occurred during transcription")
+            messagebox.showerror("Error", job.error)
+        elif job.state == CANCELLED:
+            self.status_var.set(f"Job {job.id} cancelled")
+
+    def transcribe_all(self, job: Job) -> None:
+        """Run ``job``; called by the job queue on one of its threads."""
+        self.set_status(f"Working on job {job.id}...")
+        cancel_event = job.cancel_event
+        output_dir = job.output_dir
+        method = job.method
+        try:
+            language = self.config.get("general", "language", fallback="en")
+        except Exception:
+            language = "en"
+        # Use helper that reads env fallback
+        api_key = transcribe_summary.get_api_key(self.config)
+        try:
+            summary_model = self.config.get("openai", "summary_model", fallback="gpt-4o-mini")
+        except Exception:
+            summary_model = "gpt-4o-mini"
+        whisper_section = "whisper_api" if method == "api" else "whisper_local"
+        try:
+            whisper_model = self.config.get(whisper_section, "model", fallback=("whisper-1" if method == "api" else "base"))
+        except Exception:
+            whisper_model = "whisper-1" if method == "api" else "base"
+        local_options = transcribe_summary.get_local_options(self.config)
+        api_options = transcribe_summary.get_api_options(self.config)
+        prompt = transcribe_summary._load_text(PROMPT_PATH)
+        server_url, server_token = job_server.get_server_settings(self.config)
+        timeouts = transcribe_summary.get_timeouts(self.config)
+        transcript_pdf = self.config.getboolean("general", "transcript_pdf", fallback=False)
+        transcribe_endpoints = (
+            transcribe_summary.get_endpoint_pool(self.config, "whisper_api") if method == "api" else None
+        )
+        summary_endpoints = transcribe_summary.get_endpoint_pool(self.config, "openai")
+        summary_cache = transcribe_summary.SummaryCache(transcribe_summary.SUMMARY_CACHE_DIR)
+
+        def check_cancelled(what: str) -> None:
+            if cancel_event.is_set():
+                raise transcribe_summary.Cancelled(f"Job cancelled before {what}")
+
+        def run_transcribe(audio: str, update, deadline=None) -> str:
+            if server_url:
+                # Remote jobs cannot be interrupted; stop before sending the next one
+                check_cancelled("upload")
+                return job_server.remote_transcribe(
+                    server_url, audio, whisper_model, method, update, server_token, timeouts, deadline
+                )
+            return transcribe_summary.transcribe(
+                audio,
+                model_name=whisper_model,
+                method=method,
+                api_key=api_key if method == "api" else None,
+                progress_cb=update,
+                local_options=local_options,
+                api_options=api_options,
+                timeouts=timeouts,
+                deadline=deadline,
+                endpoints=transcribe_endpoints,
+                cancel_event=cancel_event,
+                meter=job.meter_for(audio),
+            )
+
+        def run_summarize(text: str, deadline=None) -> str:
+            if server_url:
+                check_cancelled("summary")
+                return job_server.remote_summarize(
+                    server_url, prompt, text, summary_model, language, server_token, timeouts, deadline
+                )
+            summary = transcribe_summary.summarize(
+                prompt,
+                text,
+                summary_model,
+                api_key,
+                language,
+                timeouts,
+                deadline,
+                endpoints=summary_endpoints,
+                cancel_event=cancel_event,
+            )
+            return transcribe_summary.strip_code_fences(summary)
+
+        def run_summarize_group(parts, deadline=None, file_status=None) -> str:
+            def summarize_remote(prompt_text: str, text: str) -> str:
+                return job_server.remote_summarize(
+                    server_url, prompt_text, text, summary_model, language, server_token,
+                    timeouts, deadline,
+                )
+
+            return transcribe_summary.summarize_group(
+                prompt,
+                parts,
+                summary_model,
+                api_key,
+                language,
+                timeouts,
+                deadline,
+                endpoints=summary_endpoints,
+                cache=summary_cache,
+                summarize_fn=summarize_remote if server_url else None,
+                file_status=file_status,
+                cancel_event=cancel_event,
+            )
+
+        # One time budget for the whole job, all files and summaries included
+        deadline = transcribe_summary.Deadline.after(timeouts["job"])
+        if len(job.audio_files) > 1:
+            # Group mode: transcribe the files concurrently and summarize once.
+            # Local decoding runs one file at a time on the shared model.
+            group_workers = self.config.getint("general", "group_workers", fallback=DEFAULT_GROUP_WORKERS)
+            workers = 1 if method == "local" and not server_url else group_workers
+            done = []
+            self.set_job_status(job, f"Transcribing {len(job.audio_files)} files...")
+            # Per-file summaries are API requests; they run on their own pool so
+            # they never hold a transcription slot
+            summary_pool = ThreadPoolExecutor(
+                max_workers=max(1, min(group_workers, len(job.audio_files))),
+                thread_name_prefix="group-summary",
+            )
+            file_summaries = []
+
+            def transcribe_file(audio: str, update) -> str:
+                transcript = run_transcribe(audio, update, deadline)
+                # Summarize each file as soon as it is transcribed; the group
+                # summary below then only merges the cached per-file summaries
+                file_summaries.append(
+                    summary_pool.submit(
+                        run_summarize_group,
+                        [(Path(audio).name, transcript)],
+                        deadline,
+                        lambda _i, text: update(text),
                     )
-                    self.step_progress()
+                )
+                done.append(audio)
+                self.set_job_status(job, f"Transcribed {len(done)}/{len(job.audio_files)}")
+                self.step_progress(job)
+                return transcript
 
-                combined_transcript = "".join(combined_transcript_parts).strip()
-                self.set_status("Summarizing (all files)...")
-                summary = transcribe_summary.summarize(
-                    prompt, combined_transcript, summary_model, api_key, language
+            try:
+                transcripts = transcribe_group(
+                    job.audio_files,
+                    transcribe_file,
+                    workers,
+                    lambda index, text: self.set_file_status(job, index, text),
                 )
-                summary = transcribe_summary.strip_code_fences(summary)
-                self.step_progress()
-
-                # Write single combined output
-                self.set_status("Writing output...")
-                heading = "Summary" if language == "en" else "Zusammenfassung"
-                markdown_content = f"# {heading}\n\n{summary}\n"
-                first_stem = Path(self.audio_files[0]).stem
-                base = f"{datetime.now():%Y%m%d_%H%M%S}_{first_stem}_and_{len(self.audio_files)-1}_more"
-                out_md = Path(output_dir) / f"{base}.md"
-                with open(out_md, "w", encoding="utf-8") as f:
-                    f.write(markdown_content)
-                out_txt = Path(output_dir) / f"{base}.txt"
-                with open(out_txt, "w", encoding="utf-8") as f:
-                    f.write(combined_transcript)
-                pdf_path = out_md.with_suffix(".pdf")
-                transcribe_summary.markdown_to_pdf(markdown_content, str(pdf_path))
-                self.step_progress()
-                self.set_status("✅ Transcription completed successfully!")
-                self.show_info("Finished", f"Summary written to {out_md}")
-            else:
-                # Single-file behavior unchanged
-                audio = self.audio_files[0]
-                self.set_status("Transcribing 1/1")
-
-                def update(msg: str):
-                    self.set_status(f"{msg} (1/1)")
-
-                transcript = transcribe_summary.transcribe(
-                    audio,
-                    model_name=whisper_model,
-                    method=method,
-                    api_key=api_key if method == "api" else None,
-                    progress_cb=update,
+                self.set_job_status(job, "Summarizing (all files)...")
+                for future in file_summaries:
+                    future.result()
+            finally:
+                summary_pool.shutdown(wait=True, cancel_futures=True)
+            combined_transcript = "".join(
+                f"\n\n=== {Path(audio).name} ===\n\n{transcript}\n"
+                for audio, transcript in zip(job.audio_files, transcripts)
+            ).strip()
+            summary = run_summarize_group(
+                [(Path(audio).name, t) for audio, t in zip(job.audio_files, transcripts)],
+                deadline,
+            )
+            self.step_progress(job)
+
+            # Write single combined output
+            check_cancelled("writing output")
+            self.set_job_status(job, "Writing output...")
+            heading = "Summary" if language == "en" else "Zusammenfassung"
+            markdown_content = f"# {heading}\n\n{summary}\n"
+            first_stem = Path(job.audio_files[0]).stem
+            base = f"{datetime.now():%Y%m%d_%H%M%S}_{first_stem}_and_{len(job.audio_files)-1}_more"
+            out_md = Path(output_dir) / f"{base}.md"
+            with open(out_md, "w", encoding="utf-8") as f:
+                f.write(markdown_content)
+            out_txt = Path(output_dir) / f"{base}.txt"
+            with open(out_txt, "w", encoding="utf-8") as f:
+                f.write(combined_transcript)
+            if transcript_pdf:
+                pdf_render.shared_service().render_transcript(
+                    combined_transcript, out_txt.with_name(f"{base}_transcript.pdf")
                 )
-                self.step_progress()
-                self.set_status("Summarizing...")
-                summary = transcribe_summary.summarize(
-                    prompt, transcript, summary_model, api_key, language
+            pdf_path = out_md.with_suffix(".pdf")
+            pdf_render.shared_service().render(markdown_content, pdf_path)
+            self.step_progress(job)
+            self.set_status("✅ Transcription completed successfully!")
+            self.show_info("Finished", f"Summary written to {out_md}")
+        else:
+            # Single-file behavior unchanged
+            audio = job.audio_files[0]
+            self.set_job_status(job, "Transcribing...")
+
+            def update(msg: str):
+                self.set_job_status(job, msg)
+
+            transcript = run_transcribe(audio, update, deadline)
+            self.step_progress(job)
+            self.set_job_status(job, "Summarizing...")
+            summary = run_summarize(transcript, deadline)
+            self.step_progress(job)
+            check_cancelled("writing output")
+            self.set_job_status(job, "Writing output...")
+            heading = "Summary" if language == "en" else "Zusammenfassung"
+            markdown_content = f"# {heading}\n\n{summary}\n"
+            out_md = Path(output_dir) / (Path(audio).stem + ".md")
+            with open(out_md, "w", encoding="utf-8") as f:
+                f.write(markdown_content)
+            out_txt = Path(output_dir) / (Path(audio).stem + ".txt")
+            with open(out_txt, "w", encoding="utf-8") as f:
+                f.write(transcript)
+            if transcript_pdf:
+                pdf_render.shared_service().render_transcript(
+                    transcript, out_txt.with_name(f"{out_txt.stem}_transcript.pdf"), Path(audio).name
                 )
-                summary = transcribe_summary.strip_code_fences(summary)
-                self.step_progress()
-                self.set_status("Writing output...")
-                heading = "Summary" if language == "en" else "Zusammenfassung"
-                markdown_content = f"# {heading}\n\n{summary}\n"
-                out_md = Path(output_dir) / (Path(audio).stem + ".md")
-                with open(out_md, "w", encoding="utf-8") as f:
-                    f.write(markdown_content)
-                out_txt = Path(output_dir) / (Path(audio).stem + ".txt")
-                with open(out_txt, "w", encoding="utf-8") as f:
-                    f.write(transcript)
-                pdf_path = out_md.with_suffix(".pdf")
-                transcribe_summary.markdown_to_pdf(markdown_content, str(pdf_path))
-                self.step_progress()
-                self.set_status("✅ Transcription completed successfully!")
-                self.show_info("Finished", f"Summary written to {out_md}")
-        except Exception as e:
-            self.set_status("❌ Error occurred during transcription")
-            self.show_error("Error", str(e))
+            pdf_path = out_md.with_suffix(".pdf")
+            pdf_render.shared_service().render(markdown_content, pdf_path)
+            self.step_progress(job)
+            self.set_status("✅ Transcription completed successfully!")
+            self.show_info("Finished", f"Summary written to {out_md}")
 
     def open_settings(self) -> None:
         SettingsWindow(self)
@@ -681,6 +1240,8 @@ class SettingsWindow(tk.Toplevel):
         self.app.config = self.config
         messagebox.showinfo("Saved", "Configuration updated successfully!")
         self.destroy()
+        # Preload a newly chosen local model so the next job does not wait for it
+        self.app.warm_local_model()
 
     def _on_model_changed(self, _event=None) -> None:
         # Restore other fields if they got cleared inadvertently by Tk
@@ -710,5 +1271,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # PDF render workers are spawned from the frozen executable
+    multiprocessing.freeze_support()
     main()
 
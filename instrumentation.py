@@ -0,0 +1,228 @@
+"""Per-stage timing of transcription jobs with machine-readable export.
+
+A ``Trace`` collects timed spans for one job::
+
+    trace = Trace("meeting.mp3")
+    with trace.span("upload", chunk=1):
+        ...
+    trace.write_jsonl(Path("meeting.trace.jsonl"))
+
+Library functions take an optional ``trace`` and record their stages through
+``span(trace, ...)``, which does nothing when no trace is given. A ``Metrics``
+registry aggregates finished traces and writes a Prometheus textfile (for the
+node_exporter textfile collector) with duration sums and counts per stage.
+A ``ProgressMeter`` counts work done against work expected (uploaded bytes,
+audio seconds transcribed) so a UI can show fine-grained progress and an ETA.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, Optional
+
+METRIC_PREFIX = "gpt_transcribe"
+
+
+class Trace:
+    """Thread-safe list of timed spans and events for one job."""
+
+    def __init__(self, job: str) -> None:
+        self.job = job
+        self.records: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _add(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    @contextmanager
+    def span(self, stage: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block as ``stage``; yields ``attrs`` so callers can add to them."""
+        started = time.time()
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield attrs
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self._add(
+                {
+                    "job": self.job,
+                    "type": "span",
+                    "stage": stage,
+                    "start": round(started, 6),
+                    "seconds": round(time.perf_counter() - start, 6),
+                    "ok": ok,
+                    "thread": threading.current_thread().name,
+                    **attrs,
+                }
+            )
+
+    def event(self, name: str, **attrs: Any) -> None:
+        """Record a point-in-time event such as a retry."""
+        self._add({"job": self.job, "type": "event", "event": name, "time": time.time(), **attrs})
+
+    def merge(self, records: list[dict[str, Any]]) -> None:
+        """Add records collected elsewhere, e.g. by a ``Trace`` in a worker process."""
+        with self._lock:
+            self.records.extend(records)
+
+    def stage_seconds(self) -> dict[str, float]:
+        """Return the total seconds per stage (parallel spans add up)."""
+        totals: dict[str, float] = {}
+        with self._lock:
+            for r in self.records:
+                if r["type"] == "span":
+                    totals[r["stage"]] = totals.get(r["stage"], 0.0) + r["seconds"]
+        return totals
+
+    def write_jsonl(self, path: Path) -> None:
+        """Append the records as JSON lines to ``path``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            lines = [json.dumps(r, default=str) for r in self.records]
+        with path.open("a", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+
+
+def span(trace: Optional[Trace], stage: str, **attrs: Any) -> ContextManager[Any]:
+    """``trace.span(...)`` or a no-op when ``trace`` is None."""
+    if trace is None:
+        return nullcontext(attrs)
+    return trace.span(stage, **attrs)
+
+
+def event(trace: Optional[Trace], name: str, **attrs: Any) -> None:
+    if trace is not None:
+        trace.event(name, **attrs)
+
+
+BYTES = "bytes"
+AUDIO_SEC = "audio_sec"
+
+
+class ProgressMeter:
+    """Thread-safe counters of work expected and done, per unit (``BYTES``, ``AUDIO_SEC``)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Set by the first ``expect``, so time spent waiting in a queue is not counted
+        self.started: Optional[float] = None
+        self._total: dict[str, float] = {}
+        self._done: dict[str, float] = {}
+
+    def expect(self, unit: str, amount: float) -> None:
+        """Add ``amount`` to the work known to lie ahead."""
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+            self._total[unit] = self._total.get(unit, 0.0) + amount
+
+    def advance(self, unit: str, amount: float) -> None:
+        with self._lock:
+            self._done[unit] = self._done.get(unit, 0.0) + amount
+
+    def snapshot(self) -> dict[str, tuple[float, float]]:
+        """Return ``{unit: (done, total)}``; done is capped at total."""
+        with self._lock:
+            return {
+                unit: (min(self._done.get(unit, 0.0), total), total)
+                for unit, total in self._total.items()
+            }
+
+    def fraction(self, unit: str) -> Optional[float]:
+        done, total = self.snapshot().get(unit, (0.0, 0.0))
+        return done / total if total > 0 else None
+
+    def eta(self, unit: str) -> Optional[float]:
+        """Seconds left at the average rate so far, or None before any progress."""
+        fraction = self.fraction(unit)
+        if not fraction or self.started is None:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed * (1 - fraction) / fraction
+
+
+def expect(meter: Optional[ProgressMeter], unit: str, amount: float) -> None:
+    if meter is not None and amount > 0:
+        meter.expect(unit, amount)
+
+
+def advance(meter: Optional[ProgressMeter], unit: str, amount: float) -> None:
+    if meter is not None and amount > 0:
+        meter.advance(unit, amount)
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """Process-wide aggregate of finished traces in Prometheus textfile format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stage_sum: dict[str, float] = {}
+        self.stage_count: dict[str, int] = {}
+        self.stage_errors: dict[str, int] = {}
+        self.events: dict[str, int] = {}
+        self.jobs: dict[str, int] = {}
+
+    def observe(self, trace: Trace, status: str = "done") -> None:
+        """Add a finished job's spans and events."""
+        with trace._lock:
+            records = list(trace.records)
+        with self._lock:
+            self.jobs[status] = self.jobs.get(status, 0) + 1
+            for r in records:
+                if r["type"] == "span":
+                    stage = r["stage"]
+                    self.stage_sum[stage] = self.stage_sum.get(stage, 0.0) + r["seconds"]
+                    self.stage_count[stage] = self.stage_count.get(stage, 0) + 1
+                    if not r["ok"]:
+                        self.stage_errors[stage] = self.stage_errors.get(stage, 0) + 1
+                else:
+                    self.events[r["event"]] = self.events.get(r["event"], 0) + 1
+
+    def render(self) -> str:
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Wall time spent per stage.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        with self._lock:
+            for stage in sorted(self.stage_sum):
+                lines.append(f"{p}_stage_seconds_sum{_labels(stage=stage)} {self.stage_sum[stage]:.6f}")
+                lines.append(f"{p}_stage_seconds_count{_labels(stage=stage)} {self.stage_count[stage]}")
+            lines += [
+                f"# HELP {p}_stage_errors_total Stage runs that raised.",
+                f"# TYPE {p}_stage_errors_total counter",
+            ]
+            for stage in sorted(self.stage_errors):
+                lines.append(f"{p}_stage_errors_total{_labels(stage=stage)} {self.stage_errors[stage]}")
+            lines += [f"# HELP {p}_events_total Events such as retries.", f"# TYPE {p}_events_total counter"]
+            for name in sorted(self.events):
+                lines.append(f"{p}_events_total{_labels(event=name)} {self.events[name]}")
+            lines += [f"# HELP {p}_jobs_total Finished jobs by status.", f"# TYPE {p}_jobs_total counter"]
+            for status in sorted(self.jobs):
+                lines.append(f"{p}_jobs_total{_labels(status=status)} {self.jobs[status]}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Write the metrics atomically so a scraper never reads a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
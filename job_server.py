@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Local job server that keeps models and API clients warm.
+
+Start it once::
+
+    python job_server.py --port 8765 --warm
+
+and point ``transcribe_summary.py --server``, ``batch_transcribe.py --server``
+or the GUI (``[server] url`` in ``config.cfg``) at it. Every request reuses the
+already imported libraries, loaded Whisper models and pooled API connections,
+so short jobs start immediately instead of paying interpreter start-up,
+imports, config loading and model loading each time.
+
+Protocol: ``POST /jobs`` with a JSON body and receive newline-delimited JSON
+events (``progress``, then ``result`` or ``error``) as the job runs.
+``GET /health`` reports readiness. While a job runs, ``heartbeat`` events
+are sent at least every ``HEARTBEAT_SEC`` so clients can tell a busy server
+from a stuck one.
+
+The server works on paths of the local filesystem and listens on localhost
+by default. Jobs must be posted as ``application/json`` and requests that
+carry a browser ``Origin`` header are refused, so web pages cannot submit
+jobs. Binding any other interface requires a ``[server] token``, which
+clients then send as a bearer token.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import queue
+import socket
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator, Optional
+import logging
+
+import transcribe_summary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+# Longest quiet period while a job runs, well below the client's read timeout
+HEARTBEAT_SEC = 15.0
+_DONE = object()
+
+
+def get_server_settings(config) -> tuple[str, str]:
+    """Return ``(url, token)`` from the optional [server] section; url is empty when unset."""
+    url = config.get("server", "url", fallback="").strip()
+    token = config.get("server", "token", fallback="").strip()
+    return url, token
+
+
+class JobRunner:
+    """Executes jobs on a bounded pool using settings loaded once at start-up."""
+
+    def __init__(self, config, workers: int = 2) -> None:
+        self.config = config
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.api_key = transcribe_summary.get_api_key(config)
+        self.local_options = transcribe_summary.get_local_options(config)
+        self.api_options = transcribe_summary.get_api_options(config)
+        self.timeouts = transcribe_summary.get_timeouts(config)
+        self.transcribe_endpoints = transcribe_summary.get_endpoint_pool(config, "whisper_api")
+        self.summary_endpoints = transcribe_summary.get_endpoint_pool(config, "openai")
+        self.prompt = transcribe_summary._load_text(transcribe_summary.ensure_prompt())
+
+    def run(self, spec: dict[str, Any], emit: Callable[[dict[str, Any]], None]) -> dict[str, Any]:
+        """Transcribe and/or summarize according to ``spec``; returns the result fields."""
+        general = self.config["general"]
+        method = spec.get("method") or general.get("method", "api")
+        language = spec.get("language") or general.get("language", "en")
+        section = "whisper_api" if method == "api" else "whisper_local"
+        whisper_model = spec.get("whisper_model") or self.config[section]["model"]
+        result: dict[str, Any] = {}
+        deadline = transcribe_summary.Deadline.after(self.timeouts["job"])
+
+        transcript = spec.get("transcript")
+        if transcript is None:
+            transcript = transcribe_summary.transcribe(
+                spec["audio"],
+                model_name=whisper_model,
+                method=method,
+                api_key=self.api_key if method == "api" else None,
+                progress_cb=lambda msg: emit({"event": "progress", "message": msg}),
+                local_options=self.local_options,
+                api_options=self.api_options,
+                timeouts=self.timeouts,
+                deadline=deadline,
+                endpoints=self.transcribe_endpoints if method == "api" else None,
+            )
+            result["transcript"] = transcript
+        if spec.get("summarize", True):
+            emit({"event": "progress", "message": "Summarizing..."})
+            summary = transcribe_summary.summarize(
+                spec.get("prompt") or self.prompt,
+                transcript,
+                spec.get("summary_model") or self.config["openai"]["summary_model"],
+                self.api_key,
+                language,
+                self.timeouts,
+                deadline,
+                endpoints=self.summary_endpoints,
+            )
+            result["summary"] = transcribe_summary.strip_code_fences(summary)
+        return result
+
+    def submit(self, spec: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Queue a job and yield its events until it finishes."""
+        events: queue.Queue = queue.Queue()
+
+        def work() -> None:
+            try:
+                result = self.run(spec, events.put)
+                events.put({"event": "result", **result})
+            except Exception as e:
+                logger.exception("Job failed")
+                events.put({"event": "error", "message": str(e)})
+            events.put(_DONE)
+
+        events.put({"event": "queued"})
+        self.pool.submit(work)
+        while True:
+            try:
+                event = events.get(timeout=HEARTBEAT_SEC)
+            except queue.Empty:
+                yield {"event": "heartbeat"}
+                continue
+            if event is _DONE:
+                return
+            yield event
+
+
+def _make_handler(runner: JobRunner, token: str) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.info("%s - %s", self.address_string(), format % args)
+
+        def _authorized(self) -> bool:
+            # Browsers send Origin on cross-site requests; local clients never do
+            if self.headers.get("Origin"):
+                self.send_error(403, "Requests from web pages are not accepted")
+                return False
+            if token and self.headers.get("Authorization", "") != f"Bearer {token}":
+                self.send_error(401, "Missing or wrong token")
+                return False
+            return True
+
+        def _send_json(self, code: int, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if not self._authorized():
+                return
+            if self.path != "/health":
+                self.send_error(404)
+                return
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "local_models": sorted(
+                        {key[1] for key in transcribe_summary._LOCAL_MODEL_CACHE}
+                    ),
+                },
+            )
+
+        def do_POST(self) -> None:
+            if not self._authorized():
+                return
+            if self.path != "/jobs":
+                self.send_error(404)
+                return
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                # Also rules out the form posts a web page can send without a preflight
+                self.send_error(415, "Jobs must be sent as application/json")
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                spec = json.loads(self.rfile.read(length) or b"{}")
+                if "audio" not in spec and "transcript" not in spec:
+                    raise ValueError("Either 'audio' or 'transcript' is required")
+            except ValueError as e:
+                self._send_json(400, {"event": "error", "message": str(e)})
+                return
+            # Stream events as they happen; the connection closes after the last one
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for event in runner.submit(spec):
+                try:
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                except OSError:
+                    # Client went away; the job still finishes and warms caches
+                    pass
+
+    return Handler
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # A host name could resolve to any interface
+        return False
+
+
+def serve(
+    config, host: str = "127.0.0.1", port: int = 8765, workers: int = 2, warm: bool = False
+) -> ThreadingHTTPServer:
+    """Create the server (not yet serving); call ``serve_forever`` on the result.
+
+    Raises ``ValueError`` if ``host`` is not a loopback address and no
+    ``[server] token`` is configured.
+    """
+    _, token = get_server_settings(config)
+    if not token and not _is_loopback(host):
+        raise ValueError(f"Refusing to listen on {host} without a [server] token in config.cfg")
+    runner = JobRunner(config, workers=workers)
+    if warm and config["general"].get("method", "api") == "local":
+        transcribe_summary.start_local_warmup(config["whisper_local"]["model"], runner.local_options)
+    server = ThreadingHTTPServer((host, port), _make_handler(runner, token))
+    server.daemon_threads = True
+    return server
+
+
+def submit_job(
+    url: str,
+    spec: dict[str, Any],
+    progress_cb: Optional[Callable[[str], None]] = None,
+    token: str = "",
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[transcribe_summary.Deadline] = None,
+) -> dict[str, Any]:
+    """Send a job to a running server and return its result fields.
+
+    Progress messages are passed to ``progress_cb`` as they arrive. Raises
+    ``RuntimeError`` with the server's message if the job fails and
+    ``ConnectionError`` if no server is reachable. The connection gives up
+    after ``timeouts["read"]`` without any event (the server sends
+    heartbeats) and ``DeadlineExceeded`` is raised once ``deadline`` passes.
+    """
+    timeouts = timeouts or transcribe_summary.DEFAULT_TIMEOUTS
+    timeout = max(timeouts["connect"], timeouts["read"])
+    if deadline is not None:
+        deadline.check("submitting to the job server")
+        timeout = min(timeout, deadline.remaining())
+    request = urllib.request.Request(
+        url.rstrip("/") + "/jobs",
+        data=json.dumps(spec).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"Job server rejected the job: {e.read().decode('utf-8', 'replace')}") from e
+    except urllib.error.URLError as e:
+        raise ConnectionError(f"Job server not reachable at {url}: {e.reason}") from e
+    with response:
+        try:
+            for line in response:
+                if deadline is not None:
+                    deadline.check("the job server finished")
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                kind = event.pop("event", "")
+                if kind == "progress" and progress_cb:
+                    progress_cb(event.get("message", ""))
+                elif kind == "result":
+                    return event
+                elif kind == "error":
+                    raise RuntimeError(event.get("message", "Job failed"))
+        except socket.timeout as e:
+            if deadline is not None:
+                deadline.check("the job server finished")
+            # Not even a heartbeat within the read timeout
+            raise RuntimeError(f"Job server at {url} stopped responding") from e
+    raise RuntimeError("Job server closed the connection without a result")
+
+
+def remote_transcribe(
+    url: str,
+    audio_path: str,
+    model_name: str,
+    method: str,
+    progress_cb: Optional[Callable[[str], None]] = None,
+    token: str = "",
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[transcribe_summary.Deadline] = None,
+) -> str:
+    """Like ``transcribe_summary.transcribe`` but executed by the job server."""
+    spec = {
+        "audio": str(audio_path),
+        "whisper_model": model_name,
+        "method": method,
+        "summarize": False,
+    }
+    return submit_job(url, spec, progress_cb, token, timeouts, deadline)["transcript"]
+
+
+def remote_summarize(
+    url: str,
+    prompt: str,
+    transcript: str,
+    model_name: str,
+    language: str,
+    token: str = "",
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[transcribe_summary.Deadline] = None,
+) -> str:
+    """Like ``transcribe_summary.summarize`` but executed by the job server.
+
+    The returned summary already has its code fences stripped.
+    """
+    spec = {
+        "transcript": transcript,
+        "prompt": prompt,
+        "summary_model": model_name,
+        "language": language,
+    }
+    return submit_job(url, spec, token=token, timeouts=timeouts, deadline=deadline)["summary"]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Serve transcription and summary jobs with warm models and clients."
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to bind (default: localhost only; other interfaces need a [server] token)",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs executed concurrently")
+    parser.add_argument(
+        "--warm", action="store_true", help="Load and prime the local Whisper model at start-up"
+    )
+    args = parser.parse_args()
+
+    transcribe_summary.setup_logging()
+    config = transcribe_summary.load_config()
+    try:
+        server = serve(config, args.host, args.port, args.workers, args.warm)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info(f"Job server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""SQLite-backed record of batch transcription jobs.
+
+Jobs are keyed by the SHA-256 of the audio content, so a renamed file is
+recognised as already processed while a re-recorded file with an old name is
+processed again. Each job tracks its state (queued, running, done, failed),
+per-stage timings and retry count. Entries from the older ``processed.log``
+CSV are imported automatically the first time a store is opened.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT UNIQUE,
+    filename TEXT NOT NULL,
+    size_bytes INTEGER,
+    duration_sec REAL,
+    method TEXT,
+    model TEXT,
+    state TEXT NOT NULL,
+    retries INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_filename ON jobs (filename);
+CREATE TABLE IF NOT EXISTS stage_timings (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size_bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def hash_file(path: Path, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class JobStore:
+    """Thread-safe job table in a single SQLite file.
+
+    One connection is shared by all threads of a process and guarded by a lock;
+    WAL mode lets other processes read (and take turns writing) concurrently.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        # Fetch while holding the lock so no other thread reuses the connection mid-read
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def file_hash(self, path: Path) -> str:
+        """Return the content hash of ``path``, reusing it while size and mtime are unchanged."""
+        st = os.stat(path)
+        key = str(Path(path).resolve())
+        rows = self._query(
+            "SELECT content_hash FROM file_hashes WHERE path = ? AND size_bytes = ? AND mtime_ns = ?",
+            (key, st.st_size, st.st_mtime_ns),
+        )
+        if rows:
+            return rows[0]["content_hash"]
+        digest = hash_file(path)
+        self._execute(
+            "INSERT OR REPLACE INTO file_hashes (path, size_bytes, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest),
+        )
+        return digest
+
+    def is_done(self, content_hash: str, filename: str, size_bytes: int) -> bool:
+        """Return True if this content was already processed successfully.
+
+        Entries imported from ``processed.log`` carry no hash; they match on
+        filename and size and adopt the hash on first match.
+        """
+        rows = self._query("SELECT state FROM jobs WHERE content_hash = ?", (content_hash,))
+        if rows:
+            return rows[0]["state"] == DONE
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE content_hash IS NULL AND filename = ? AND size_bytes = ? "
+                "AND state = ?",
+                (filename, size_bytes, DONE),
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE jobs SET content_hash = ? WHERE id = ?", (content_hash, row["id"])
+                )
+        return row is not None
+
+    def enqueue(self, content_hash: str, filename: str, size_bytes: int) -> int:
+        """Create (or reset a failed) job for ``content_hash`` and return its id."""
+        now = _now()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, filename = ?, size_bytes = ?, error = NULL, updated_at = ? "
+                    "WHERE id = ?",
+                    (QUEUED, filename, size_bytes, now, row["id"]),
+                )
+                return row["id"]
+            cur = self._conn.execute(
+                "INSERT INTO jobs (content_hash, filename, size_bytes, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, filename, size_bytes, QUEUED, now, now),
+            )
+            return cur.lastrowid
+
+    def start(self, job_id: int) -> None:
+        self._execute(
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ?", (RUNNING, _now(), job_id)
+        )
+
+    def record_stage(self, job_id: int, stage: str, seconds: float) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO stage_timings (job_id, stage, seconds) VALUES (?, ?, ?)",
+            (job_id, stage, seconds),
+        )
+
+    def finish(
+        self, job_id: int, duration_sec: float, method: str, model: Optional[str] = None
+    ) -> None:
+        self._execute(
+            "UPDATE jobs SET state = ?, duration_sec = ?, method = ?, model = ?, error = NULL, "
+            "updated_at = ? WHERE id = ?",
+            (DONE, duration_sec, method, model, _now(), job_id),
+        )
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET state = ?, error = ?, retries = retries + 1, updated_at = ? WHERE id = ?",
+            (FAILED, error, _now(), job_id),
+        )
+
+    def get(self, job_id: int) -> Optional[dict[str, Any]]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(rows[0]) if rows else None
+
+    def stage_timings(self, job_id: int) -> dict[str, float]:
+        rows = self._query("SELECT stage, seconds FROM stage_timings WHERE job_id = ?", (job_id,))
+        return {r["stage"]: r["seconds"] for r in rows}
+
+    def history(self) -> list[dict[str, Any]]:
+        """Return finished jobs with their per-stage timings, oldest first.
+
+        Each row has ``method``, ``model``, ``size_bytes``, ``duration_sec`` and
+        a ``stages`` mapping of stage name to seconds.
+        """
+        rows = self._query(
+            "SELECT j.id, j.method, j.model, j.size_bytes, j.duration_sec, t.stage, t.seconds "
+            "FROM jobs j LEFT JOIN stage_timings t ON t.job_id = j.id "
+            "WHERE j.state = ? ORDER BY j.id",
+            (DONE,),
+        )
+        jobs: dict[int, dict[str, Any]] = {}
+        for r in rows:
+            job = jobs.setdefault(
+                r["id"],
+                {
+                    "method": r["method"],
+                    "model": r["model"],
+                    "size_bytes": r["size_bytes"],
+                    "duration_sec": r["duration_sec"],
+                    "stages": {},
+                },
+            )
+            if r["stage"]:
+                job["stages"][r["stage"]] = r["seconds"]
+        return list(jobs.values())
+
+    def import_legacy_log(self, log_path: Path) -> int:
+        """Import ``processed.log`` once; returns the number of rows imported.
+
+        Each line is ``filename,size,duration,method,elapsed,timestamp``; the
+        elapsed transcription time becomes the job's ``transcribe`` timing.
+        Filenames may contain commas, so fields are split from the right.
+        Malformed lines are logged and skipped.
+        """
+        log_path = Path(log_path)
+        if not log_path.exists():
+            return 0
+        marker = f"imported:{log_path.resolve()}"
+        if self._query("SELECT 1 FROM meta WHERE key = ?", (marker,)):
+            return 0
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                with log_path.open("r", encoding="utf-8") as f:
+                    for number, line in enumerate(f, 1):
+                        line = line.rstrip("\r\n")
+                        if not line.strip():
+                            continue
+                        parts = line.rsplit(",", 5)
+                        try:
+                            if len(parts) != 6 or not parts[0]:
+                                raise ValueError("expected 6 fields")
+                            filename, size, duration, method, elapsed, stamp = parts
+                            size_bytes = int(size) if size else None
+                            duration_sec = float(duration) if duration else None
+                            elapsed_sec = float(elapsed) if elapsed else None
+                        except ValueError as e:
+                            logger.warning(f"Skipping line {number} of {log_path}: {e}")
+                            continue
+                        stamp = stamp or _now()
+                        cur = self._conn.execute(
+                            "INSERT INTO jobs (filename, size_bytes, duration_sec, method, state, "
+                            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (filename, size_bytes, duration_sec, method or None, DONE, stamp, stamp),
+                        )
+                        if elapsed_sec is not None:
+                            self._conn.execute(
+                                "INSERT INTO stage_timings (job_id, stage, seconds) VALUES (?, ?, ?)",
+                                (cur.lastrowid, "transcribe", elapsed_sec),
+                            )
+                        count += 1
+                self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (marker, _now()))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Imported {count} entries from {log_path}")
+        return count
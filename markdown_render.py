@@ -0,0 +1,291 @@
+"""Markdown to reportlab flowables for the summary PDFs.
+
+The renderer works in three steps, each a single pass:
+
+1. ``tokenize`` turns lines into block tokens (heading, list item, fence, ...).
+2. ``parse`` builds a small document tree from the tokens: headings,
+   paragraphs (consecutive text lines), nested bullet and numbered lists,
+   code blocks and horizontal rules.
+3. ``to_flowables`` renders the tree. Inline ``**bold**``, ``*italic*``,
+   ``` `code` ``` and ``[links](https://...)`` are split into formatted runs
+   and turned into paragraph markup; text is never handed to reportlab's
+   markup parser unescaped, so ``<`` and ``&`` in model output can no longer
+   break a PDF.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Optional, Union
+from xml.sax.saxutils import escape
+
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    HRFlowable,
+    ListFlowable,
+    ListItem,
+    Paragraph,
+    Preformatted,
+    Spacer,
+)
+
+_HEADING = re.compile(r"(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"( *)[-*+]\s+(.*)$")
+_ORDERED = re.compile(r"( *)(\d{1,9})[.)]\s+(.*)$")
+_RULE = re.compile(r"\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_FENCE = re.compile(r"\s{0,3}(```|~~~)")
+
+_INLINE = re.compile(
+    r"(?P<tick>`+)(?P<code>.+?)(?P=tick)"
+    r"|\[(?P<label>[^\]]+)\]\((?P<url>[^)\s]+)\)"
+    r"|(?P<strong>\*\*|__)(?P<strong_text>\S(?:.*?\S)?)(?P=strong)"
+    r"|\*(?P<em>[^\s*](?:[^*]*?[^\s*])?)\*"
+    r"|(?<!\w)_(?P<em_u>[^\s_](?:[^_]*?[^\s_])?)_(?!\w)"
+)
+_SAFE_SCHEMES = ("http://", "https://", "mailto:")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Tokens -----------------------------------------------------------------
+
+
+@dataclass
+class Token:
+    kind: str  # heading, bullet, ordered, text, blank, rule, code
+    text: str = ""
+    level: int = 0  # heading level or list indentation
+    number: int = 0
+
+
+def tokenize(lines: Iterable[str]) -> Iterator[Token]:
+    """Classify each line; fenced code blocks become one ``code`` token."""
+    code: Optional[list[str]] = None
+    fence = ""
+    for raw in lines:
+        line = raw.rstrip()
+        if code is not None:
+            if line.strip().startswith(fence):
+                yield Token("code", "\n".join(code))
+                code = None
+            else:
+                code.append(raw.rstrip("\n"))
+            continue
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+            code = []
+            continue
+        if not line.strip():
+            yield Token("blank")
+            continue
+        match = _HEADING.match(line)
+        if match:
+            yield Token("heading", match.group(2), level=len(match.group(1)))
+            continue
+        if _RULE.match(line):
+            yield Token("rule")
+            continue
+        match = _BULLET.match(line)
+        if match:
+            yield Token("bullet", match.group(2), level=len(match.group(1)))
+            continue
+        match = _ORDERED.match(line)
+        if match:
+            yield Token("ordered", match.group(3), level=len(match.group(1)), number=int(match.group(2)))
+            continue
+        yield Token("text", line.strip(), level=len(line) - len(line.lstrip()))
+    if code is not None:
+        # Unclosed fence: keep what was collected
+        yield Token("code", "\n".join(code))
+
+
+# Document tree ----------------------------------------------------------
+
+
+@dataclass
+class Heading:
+    level: int
+    text: str
+
+
+@dataclass
+class Para:
+    text: str
+
+
+@dataclass
+class CodeBlock:
+    text: str
+
+
+@dataclass
+class Rule:
+    pass
+
+
+@dataclass
+class Blank:
+    pass
+
+
+@dataclass
+class Item:
+    text: str
+    children: list[ListBlock] = field(default_factory=list)
+
+
+@dataclass
+class ListBlock:
+    ordered: bool
+    indent: int
+    start: int = 1
+    items: list[Item] = field(default_factory=list)
+
+
+Block = Union[Heading, Para, CodeBlock, Rule, Blank, ListBlock]
+
+
+def parse(tokens: Iterable[Token]) -> list[Block]:
+    """Build the block tree in one pass over ``tokens``."""
+    blocks: list[Block] = []
+    # Open lists from outermost to innermost
+    lists: list[ListBlock] = []
+    paragraph: list[str] = []
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            blocks.append(Para(" ".join(paragraph)))
+            paragraph.clear()
+
+    for token in tokens:
+        if token.kind in ("bullet", "ordered"):
+            flush_paragraph()
+            ordered = token.kind == "ordered"
+            # Close lists nested deeper than this item
+            while lists and lists[-1].indent > token.level:
+                lists.pop()
+            if lists and lists[-1].indent == token.level and lists[-1].ordered != ordered:
+                lists.pop()
+            if not lists or lists[-1].indent < token.level:
+                new = ListBlock(ordered=ordered, indent=token.level, start=token.number or 1)
+                if lists and lists[-1].items:
+                    lists[-1].items[-1].children.append(new)
+                else:
+                    blocks.append(new)
+                lists.append(new)
+            lists[-1].items.append(Item(token.text))
+        elif token.kind == "text" and lists and token.level > lists[0].indent:
+            # Indented continuation of the current list item
+            lists[-1].items[-1].text += " " + token.text
+        elif token.kind == "text":
+            lists.clear()
+            paragraph.append(token.text)
+        else:
+            flush_paragraph()
+            lists.clear()
+            if token.kind == "heading":
+                blocks.append(Heading(token.level, token.text))
+            elif token.kind == "code":
+                blocks.append(CodeBlock(token.text))
+            elif token.kind == "rule":
+                blocks.append(Rule())
+            else:
+                blocks.append(Blank())
+    flush_paragraph()
+    return blocks
+
+
+# Rendering --------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Span:
+    """A run of text with uniform inline formatting."""
+
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+    url: str = ""
+
+
+def inline_spans(text: str, bold: bool = False, italic: bool = False, url: str = "") -> Iterator[Span]:
+    """Split inline Markdown into formatted runs (nested emphasis is flattened)."""
+    pos = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > pos:
+            yield Span(text[pos: match.start()], bold, italic, url=url)
+        pos = match.end()
+        if match.group("tick"):
+            yield Span(match.group("code"), bold, italic, code=True, url=url)
+        elif match.group("url"):
+            target = match.group("url")
+            safe = target.lower().startswith(_SAFE_SCHEMES)
+            yield from inline_spans(match.group("label"), bold, italic, target if safe else url)
+        elif match.group("strong"):
+            yield from inline_spans(match.group("strong_text"), True, italic, url)
+        else:
+            yield from inline_spans(match.group("em") or match.group("em_u"), bold, True, url)
+    if pos < len(text):
+        yield Span(text[pos:], bold, italic, url=url)
+
+
+def _span_markup(span: Span) -> str:
+    markup = escape(span.text)
+    if span.code:
+        markup = f'<font face="Courier">{markup}</font>'
+    if span.italic:
+        markup = f"<i>{markup}</i>"
+    if span.bold:
+        markup = f"<b>{markup}</b>"
+    if span.url:
+        href = escape(span.url, {'"': "&quot;"})
+        markup = f'<link href="{href}" color="blue"><u>{markup}</u></link>'
+    return markup
+
+
+def inline_markup(text: str) -> str:
+    """Convert inline Markdown to reportlab paragraph markup, escaping the rest."""
+    return "".join(_span_markup(span) for span in inline_spans(text))
+
+
+def _paragraph(text: str, style: Any) -> Paragraph:
+    """Build a Paragraph from inline Markdown."""
+    text = _WHITESPACE.sub(" ", text).strip()
+    try:
+        return Paragraph(inline_markup(text), style)
+    except ValueError:
+        # Markup reportlab still rejects: fall back to plain text
+        return Paragraph(escape(text), style)
+
+
+def _list_flowable(block: ListBlock, styles: dict[str, Any]) -> ListFlowable:
+    items = []
+    for item in block.items:
+        content = [_paragraph(item.text, styles["body"])]
+        content += [_list_flowable(child, styles) for child in item.children]
+        items.append(ListItem(content if len(content) > 1 else content[0]))
+    if block.ordered:
+        return ListFlowable(items, bulletType="1", start=block.start)
+    return ListFlowable(items, bulletType="bullet")
+
+
+def to_flowables(markdown_text: str, styles: dict[str, Any]) -> list[Any]:
+    """Render ``markdown_text`` with ``styles`` (keys h1, h2, h3, body, code)."""
+    flowables: list[Any] = []
+    for block in parse(tokenize(markdown_text.splitlines())):
+        if isinstance(block, Heading):
+            style = styles[f"h{min(block.level, 3)}"]
+            flowables.append(_paragraph(block.text, style))
+        elif isinstance(block, Para):
+            flowables.append(_paragraph(block.text, styles["body"]))
+        elif isinstance(block, ListBlock):
+            flowables.append(_list_flowable(block, styles))
+        elif isinstance(block, CodeBlock):
+            flowables.append(Preformatted(block.text, styles["code"]))
+        elif isinstance(block, Rule):
+            flowables.append(HRFlowable(width="100%", thickness=0.5, spaceBefore=4, spaceAfter=4))
+        else:
+            flowables.append(Spacer(1, 0.2 * inch))
+    return flowables
@@ -0,0 +1,147 @@
+"""Build PDFs in worker processes.
+
+``markdown_to_pdf`` is pure Python and holds the GIL for the whole build, so
+in the same process it slows down upload threads, progress updates and the
+GUI. ``PdfRenderService`` runs the builds in a small process pool instead::
+
+    with PdfRenderService(processes=2) as renderer:
+        renderer.render(markdown_text, "summary.pdf", trace=trace)
+
+At most ``max_pending`` builds are queued or running; ``submit`` blocks
+beyond that, so a fast producer cannot pile up documents in memory. Workers
+are started with ``spawn`` (forking a process that runs threads can deadlock)
+and stay alive, so the start-up cost is paid once. Frozen apps must call
+``multiprocessing.freeze_support()`` at start-up.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Optional, Union
+import logging
+
+from instrumentation import Trace
+
+logger = logging.getLogger(__name__)
+
+
+def _render(
+    text: str, pdf_path: str, job: Optional[str], transcript_title: Optional[str] = None
+) -> list[dict[str, Any]]:
+    """Worker entry point; returns the trace records when ``job`` is given.
+
+    With ``transcript_title`` the text is a plain transcript for
+    ``transcript_to_pdf`` rather than Markdown.
+    """
+    import transcribe_summary
+
+    trace = Trace(job) if job is not None else None
+    if transcript_title is not None:
+        transcribe_summary.transcript_to_pdf(text, pdf_path, transcript_title, trace=trace)
+    else:
+        transcribe_summary.markdown_to_pdf(text, pdf_path, trace=trace)
+    return trace.records if trace is not None else []
+
+
+class PdfRenderService:
+    """Bounded queue of PDF builds executed by a process pool."""
+
+    def __init__(self, processes: int = 1, max_pending: Optional[int] = None) -> None:
+        if processes < 1:
+            raise ValueError("PdfRenderService needs at least one process")
+        self.processes = processes
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * processes)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self, restart: bool = False) -> ProcessPoolExecutor:
+        with self._lock:
+            if restart and self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def submit(
+        self,
+        markdown_text: str,
+        pdf_path: Union[str, Path],
+        trace: Optional[Trace] = None,
+        transcript_title: Optional[str] = None,
+    ) -> Future:
+        """Queue a build; the future's result is the list of trace records.
+
+        Pass ``transcript_title`` (may be empty) to render a plain transcript
+        with ``transcript_to_pdf`` instead of Markdown.
+        """
+        self._slots.acquire()
+        args = (
+            _render,
+            markdown_text,
+            str(pdf_path),
+            trace.job if trace is not None else None,
+            transcript_title,
+        )
+        try:
+            try:
+                future = self._executor().submit(*args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool once
+                logger.warning("PDF render workers died; restarting them")
+                future = self._executor(restart=True).submit(*args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(
+        self, markdown_text: str, pdf_path: Union[str, Path], trace: Optional[Trace] = None
+    ) -> None:
+        """Build a PDF in a worker and wait for it, without holding the GIL meanwhile.
+
+        The worker's ``pdf_parse`` and ``pdf_build`` spans are added to ``trace``.
+        """
+        records = self.submit(markdown_text, pdf_path, trace).result()
+        if trace is not None:
+            trace.merge(records)
+
+    def render_transcript(
+        self, transcript: str, pdf_path: Union[str, Path], title: str = "", trace: Optional[Trace] = None
+    ) -> None:
+        """Like ``render`` for ``transcribe_summary.transcript_to_pdf``."""
+        records = self.submit(transcript, pdf_path, trace, transcript_title=title).result()
+        if trace is not None:
+            trace.merge(records)
+
+    def close(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+    def __enter__(self) -> PdfRenderService:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+_SHARED: Optional[PdfRenderService] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_service() -> PdfRenderService:
+    """Process-wide single-worker service for long-running callers such as the GUI."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = PdfRenderService(processes=1)
+        return _SHARED
@@ -0,0 +1,326 @@
+"""Ordering and capacity helpers for batch transcription runs.
+
+Jobs are ordered longest-first (the LPT rule) so a long recording never starts
+last and leaves every other worker idle while it runs alone. The same greedy
+assignment is used to predict the makespan of a batch, and a throughput model
+fitted on past jobs turns audio durations into wall-time and cost estimates.
+A memory budget admits jobs only while their estimated peak memory fits, so
+long recordings decoded in parallel cannot exhaust RAM.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rough bytes per second of compressed speech (128 kbit/s) for files without a duration
+FALLBACK_BYTES_PER_SEC = 16_000
+# Processing seconds per audio second assumed when there is no history yet
+DEFAULT_RTF = {"api": 0.1, "local": 1.0}
+
+MB = 1024 * 1024
+# Whisper parameter counts; the model name's prefix selects the entry
+MODEL_PARAMS = {
+    "tiny": 39e6,
+    "base": 74e6,
+    "small": 244e6,
+    "medium": 769e6,
+    "turbo": 809e6,
+    "large": 1550e6,
+}
+BYTES_PER_PARAM = {"int8": 1, "int8_float16": 1, "int8_float32": 1, "float16": 2, "bfloat16": 2}
+# Local decoding holds 16 kHz audio as int16 and float32 plus the full
+# spectrogram (STFT, magnitudes and mel bins) of the recording at once.
+LOCAL_BYTES_PER_SEC = 16_000 * (2 + 4) + 100 * (201 * 8 + 201 * 4 + 80 * 4)
+# Interpreter-independent working memory of a job (buffers, HTTP client, text)
+JOB_OVERHEAD_BYTES = 64 * MB
+# Upper bound for --max-workers auto when many small jobs would fit the budget
+AUTO_MAX_WORKERS = 16
+
+
+def job_cost(duration_sec: float, size_bytes: int = 0) -> float:
+    """Return the relative cost of a job: its audio duration, or an estimate from its size."""
+    if duration_sec and duration_sec > 0:
+        return float(duration_sec)
+    return size_bytes / FALLBACK_BYTES_PER_SEC
+
+
+def order_jobs(
+    items: Sequence[T], cost: Callable[[T], float], interleave_short: int = 0
+) -> list[T]:
+    """Return ``items`` longest-first.
+
+    With ``interleave_short=k`` one of the shortest remaining jobs is slotted in
+    after every ``k`` long ones, so results start appearing early without
+    letting a long job drift to the end.
+    """
+    ordered = sorted(items, key=cost, reverse=True)
+    if interleave_short <= 0:
+        return ordered
+    result: list[T] = []
+    head, tail = 0, len(ordered) - 1
+    while head <= tail:
+        for _ in range(interleave_short):
+            if head > tail:
+                break
+            result.append(ordered[head])
+            head += 1
+        if head <= tail:
+            result.append(ordered[tail])
+            tail -= 1
+    return result
+
+
+def predict_makespan(costs: Sequence[float], workers: int) -> float:
+    """Return the finish time of the busiest worker when ``costs`` are started in order.
+
+    Each job goes to whichever worker frees up first, which is what a pool
+    pulling from a queue does.
+    """
+    workers = max(1, workers)
+    loads = [0.0] * min(workers, max(1, len(costs)))
+    heapq.heapify(loads)
+    for c in costs:
+        heapq.heappush(loads, heapq.heappop(loads) + c)
+    return max(loads)
+
+
+@dataclass
+class Throughput:
+    """Observed transcription speed for one method/model combination."""
+
+    rtf: float
+    # File bytes per second of audio, to estimate durations that could not be probed
+    audio_bytes_per_sec: float
+    overhead_sec: float
+    samples: int
+
+
+def fit_throughput(history: Iterable[dict[str, Any]]) -> dict[tuple[str, Optional[str]], Throughput]:
+    """Fit real-time factor and audio bytes/sec per ``(method, model)`` from finished jobs.
+
+    ``history`` rows are shaped like ``JobStore.history()``. The real-time factor
+    is total transcription time over total audio duration (so long files weigh
+    more than short ones); ``overhead_sec`` is the mean time spent in all other
+    stages. Every method also gets a ``(method, None)`` entry pooled over models.
+    """
+    totals: dict[tuple[str, Optional[str]], list[float]] = {}
+    for row in history:
+        transcribe_sec = row.get("stages", {}).get("transcribe")
+        duration = row.get("duration_sec") or 0.0
+        if not row.get("method") or not transcribe_sec or duration <= 0:
+            continue
+        other = sum(v for k, v in row["stages"].items() if k != "transcribe")
+        for key in ((row["method"], row.get("model")), (row["method"], None)):
+            t = totals.setdefault(key, [0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+            t[0] += transcribe_sec
+            t[1] += duration
+            if row.get("size_bytes"):
+                t[2] += row["size_bytes"]
+                t[5] += duration
+            t[3] += other
+            t[4] += 1
+    return {
+        key: Throughput(
+            rtf=t[0] / t[1],
+            audio_bytes_per_sec=t[2] / t[5] if t[5] else 0.0,
+            overhead_sec=t[3] / t[4],
+            samples=int(t[4]),
+        )
+        for key, t in totals.items()
+    }
+
+
+def estimate_batch(
+    pending: Sequence[tuple[float, int]],
+    method: str,
+    model: Optional[str],
+    workers: int,
+    model_fit: dict[tuple[str, Optional[str]], Throughput],
+    price_per_minute: float = 0.0,
+) -> dict[str, Any]:
+    """Predict wall time, API minutes and transcription cost for ``pending`` jobs.
+
+    ``pending`` holds ``(duration_sec, size_bytes)`` per file; a missing
+    duration is estimated from the size via the audio bytes/sec seen in past
+    jobs, so wall time, API minutes and cost all use the same duration.
+    """
+    fit = model_fit.get((method, model)) or model_fit.get((method, None))
+    if fit is None:
+        fit = Throughput(
+            rtf=DEFAULT_RTF.get(method, 1.0), audio_bytes_per_sec=0.0, overhead_sec=0.0, samples=0
+        )
+    job_seconds = []
+    audio_seconds = 0.0
+    for duration, size in pending:
+        if not duration or duration <= 0:
+            if fit.audio_bytes_per_sec:
+                duration = size / fit.audio_bytes_per_sec
+            else:
+                duration = job_cost(0.0, size)
+        audio_seconds += duration
+        job_seconds.append(duration * fit.rtf + fit.overhead_sec)
+    job_seconds.sort(reverse=True)
+    api_minutes = audio_seconds / 60 if method == "api" else 0.0
+    return {
+        "files": len(pending),
+        "audio_minutes": audio_seconds / 60,
+        "rtf": fit.rtf,
+        "history_samples": fit.samples,
+        "wall_seconds": predict_makespan(job_seconds, workers) if job_seconds else 0.0,
+        "api_minutes": api_minutes,
+        "cost": api_minutes * price_per_minute,
+    }
+
+
+def model_memory(model_name: str, local_options: Optional[dict[str, Any]] = None) -> int:
+    """Estimate the resident size of a local Whisper model in bytes."""
+    options = local_options or {}
+    name = model_name.split("/")[-1].lower()
+    params = next(
+        (n for prefix, n in MODEL_PARAMS.items() if name.startswith(prefix)), MODEL_PARAMS["large"]
+    )
+    if options.get("backend") == "faster-whisper":
+        per_param = BYTES_PER_PARAM.get(options.get("compute_type", ""), 4)
+    else:
+        per_param = 4
+    # Weights plus the framework's allocator and tokenizer overhead
+    return int(params * per_param * 1.3)
+
+
+def estimate_job_memory(
+    duration_sec: float,
+    size_bytes: int,
+    sample_rate: int = 0,
+    channels: int = 0,
+    method: str = "api",
+    compact: bool = False,
+    vad: bool = False,
+    chunk_bytes: int = 25 * MB,
+    ffmpeg: bool = True,
+) -> int:
+    """Estimate the peak memory of transcribing one file, excluding the model.
+
+    With ffmpeg, API jobs only hold the upload chunks: splitting and
+    compaction stream the file. Without it, pydub decodes the whole recording
+    to 16-bit PCM at its own sample rate and channel count, to compact it or
+    to split a file above ``chunk_bytes``. Local jobs decode to 16 kHz mono
+    and build a spectrogram of the whole recording; the speech-only buffer of
+    the VAD adds another copy.
+    """
+    seconds = job_cost(duration_sec, size_bytes)
+    if method == "local":
+        need = seconds * LOCAL_BYTES_PER_SEC
+        if vad:
+            need += seconds * 16_000 * 4
+    else:
+        need = min(size_bytes, chunk_bytes * 3)
+        pcm = seconds * (sample_rate or 44_100) * (channels or 2) * 2
+        if not ffmpeg and compact:
+            # Decoded source, compacted copy and the export buffer
+            need += pcm * 3
+        elif not ffmpeg and size_bytes > chunk_bytes:
+            # Decoded source plus the slices being exported
+            need += pcm * 2
+    return int(need) + JOB_OVERHEAD_BYTES
+
+
+def workers_for_budget(
+    limit_bytes: int, reserved_bytes: int, needs: Iterable[int], cap: int = AUTO_MAX_WORKERS
+) -> int:
+    """Return how many jobs can run at once within the budget, between 1 and ``cap``.
+
+    Counts how many of the smallest ``needs`` fit side by side; more workers
+    than that could never all be busy. The budget still admits each job, so
+    larger jobs simply run with fewer neighbours.
+    """
+    free = limit_bytes - reserved_bytes
+    count = 0
+    for need in sorted(needs):
+        if need > free or count >= cap:
+            break
+        free -= need
+        count += 1
+    return max(1, count)
+
+
+def physical_memory() -> Optional[int]:
+    """Return the machine's RAM in bytes, or None where it cannot be determined."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def parse_memory_budget(value: str) -> Optional[int]:
+    """Parse a budget in MB, or ``auto`` for 80% of RAM; empty or 0 disables it."""
+    value = (value or "").strip().lower()
+    if value == "auto":
+        total = physical_memory()
+        if total is None:
+            logger.warning("Cannot determine physical memory; memory budget disabled")
+            return None
+        return int(total * 0.8)
+    if not value or float(value) <= 0:
+        return None
+    return int(float(value) * MB)
+
+
+class MemoryBudget:
+    """Admit work only while the estimated memory of running jobs fits a limit.
+
+    Jobs are admitted in arrival order, so a large job is not starved by a
+    stream of small ones. A job larger than the whole budget is admitted once
+    nothing else is running, so it still runs, but alone.
+    """
+
+    def __init__(self, limit_bytes: int, reserved_bytes: int = 0) -> None:
+        self.limit = limit_bytes
+        self.in_use = reserved_bytes
+        self.reserved = reserved_bytes
+        self._cond = threading.Condition()
+        self._tickets = itertools.count()
+        self._serving = 0
+
+    def acquire(self, need: int, label: str = "") -> int:
+        """Block until ``need`` bytes fit; returns the amount to pass to ``release``."""
+        with self._cond:
+            ticket = next(self._tickets)
+            waited = False
+            while ticket != self._serving or (
+                self.in_use + need > self.limit and self.in_use > self.reserved
+            ):
+                if not waited and label:
+                    logger.info(
+                        f"Waiting for memory for {label}: needs {need / MB:.0f} MB, "
+                        f"{(self.limit - self.in_use) / MB:.0f} MB free"
+                    )
+                waited = True
+                self._cond.wait()
+            self._serving += 1
+            self.in_use += need
+            self._cond.notify_all()
+        return need
+
+    def release(self, amount: int) -> None:
+        with self._cond:
+            self.in_use -= amount
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, need: int, label: str = "") -> Iterator[None]:
+        amount = self.acquire(need, label)
+        try:
+            yield
+        finally:
+            self.release(amount)
@@ -0,0 +1,93 @@
+"""On-disk cache of summaries, keyed by everything that shapes them.
+
+Group summaries are built from one summary per file plus a short merge
+request (see ``transcribe_summary.summarize_group``). Caching the per-file
+summaries means that adding a file to a group, or removing one, only pays
+for that file and the merge instead of resending every transcript.
+
+Entries are plain Markdown files named by the SHA-256 of the model, language,
+prompt and input text, so identical requests hit the cache from any process.
+Writes go through a temporary file and ``os.replace``, which keeps readers
+from seeing partial entries. The oldest entries are removed beyond
+``max_entries``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 1000
+
+
+def cache_key(*parts: str) -> str:
+    """Return a hex digest identifying ``parts`` (order matters)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8")
+        # Length prefix so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        # Removed meanwhile by another process
+        return 0.0
+
+
+class SummaryCache:
+    """Directory of cached summaries; safe to share between threads."""
+
+    def __init__(self, directory: Path, max_entries: int = MAX_ENTRIES) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.md"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        # Mark as recently used so pruning keeps it
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            entries = list(self.directory.glob("*.md"))
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort(key=_mtime)
+            for path in entries[: len(entries) - self.max_entries]:
+                path.unlink(missing_ok=True)
+            logger.info(f"Pruned summary cache to {self.max_entries} entries")
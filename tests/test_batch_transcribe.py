@@ -0,0 +1,296 @@
+import threading
+import time
+
+import pytest
+
+import batch_transcribe as bt
+import transcribe_summary as ts
+
+
+def test_staged_pipeline_runs_all_stages_and_records_failures():
+    def double(x):
+        return x * 2
+
+    def reject_six(x):
+        if x == 6:
+            raise ValueError("six")
+        return x + 1
+
+    pipeline = bt.StagedPipeline([("double", double, 2), ("inc", reject_six, 3)], queue_size=1)
+    for i in range(5):
+        pipeline.submit(i)
+    pipeline.close()
+    pipeline.join()
+    assert sorted(pipeline.completed) == [1, 3, 5, 9]
+    assert [(item, stage) for item, stage, _ in pipeline.failed] == [(6, "inc")]
+
+
+def test_staged_pipeline_only_counts_results_when_asked():
+    errors = []
+
+    def reject_odd(x):
+        if x % 2:
+            raise ValueError("odd")
+        return x
+
+    pipeline = bt.StagedPipeline(
+        [("even", reject_odd, 2)],
+        on_error=lambda item, stage, e: errors.append(item),
+        keep_results=False,
+    )
+    for i in range(6):
+        pipeline.submit(i)
+    pipeline.close()
+    pipeline.join()
+    assert (pipeline.completed_count, pipeline.failed_count) == (3, 3)
+    assert pipeline.completed == [] and pipeline.failed == []
+    assert sorted(errors) == [1, 3, 5]
+
+
+def test_staged_pipeline_overlaps_stages():
+    active = set()
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def stage(name):
+        def run(x):
+            with lock:
+                active.add(name)
+                if len(active) > 1:
+                    overlap.set()
+            time.sleep(0.05)
+            with lock:
+                active.discard(name)
+            return x
+
+        return run
+
+    pipeline = bt.StagedPipeline([("a", stage("a"), 1), ("b", stage("b"), 1)])
+    for i in range(4):
+        pipeline.submit(i)
+    pipeline.close()
+    pipeline.join()
+    assert len(pipeline.completed) == 4
+    assert overlap.is_set()
+
+
+def test_main_processes_audio_dir(tmp_path, monkeypatch):
+    import wave
+
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for seconds, name in enumerate(("a.wav", "b.wav"), 1):
+        with wave.open(str(audio_dir / name), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\x00\x00" * 8000 * seconds)
+    monkeypatch.setattr(bt, "AUDIO_DIR", audio_dir)
+    monkeypatch.setattr(bt, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(bt, "LOG_FILE", tmp_path / "processed.log")
+    monkeypatch.setattr(bt, "STORE_FILE", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(ts, "_probe_ffprobe", lambda path, size: None)
+    monkeypatch.setattr(ts, "transcribe", lambda path, **kw: f"transcript of {path}")
+    monkeypatch.setattr(ts, "summarize", lambda prompt, text, *a: f"- {text}")
+    monkeypatch.setattr(ts, "markdown_to_pdf", lambda md, path, **kw: open(path, "w").close())
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "batch_transcribe.py",
+            "--method",
+            "api",
+            "--max-workers",
+            "auto",
+            "--memory-budget",
+            "1000",
+            "--trace-dir",
+            str(tmp_path / "traces"),
+            "--metrics-file",
+            str(tmp_path / "metrics.prom"),
+        ],
+    )
+
+    bt.main()
+
+    outputs = sorted(p.suffix for p in (tmp_path / "output").iterdir())
+    assert outputs == [".md", ".md", ".pdf", ".pdf", ".txt", ".txt"]
+    store = bt.JobStore(tmp_path / "jobs.sqlite3")
+    jobs = [store.get(i) for i in (1, 2)]
+    assert sorted(j["filename"] for j in jobs) == ["a.wav", "b.wav"]
+    assert {j["state"] for j in jobs} == {"done"}
+    assert set(store.stage_timings(1)) == {"probe", "transcribe", "summarize", "render"}
+    assert sorted(p.name for p in (tmp_path / "traces").iterdir()) == [
+        "a.trace.jsonl",
+        "b.trace.jsonl",
+    ]
+    assert 'gpt_transcribe_stage_seconds_count{stage="render"} 2' in (
+        tmp_path / "metrics.prom"
+    ).read_text()
+
+
+def test_main_batch_decodes_only_probed_short_clips(tmp_path, monkeypatch):
+    import wave
+
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for seconds, name in ((2, "memo.wav"), (40, "talk.wav")):
+        with wave.open(str(audio_dir / name), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\x00\x00" * 8000 * seconds)
+    monkeypatch.setattr(bt, "AUDIO_DIR", audio_dir)
+    monkeypatch.setattr(bt, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(bt, "LOG_FILE", tmp_path / "processed.log")
+    monkeypatch.setattr(bt, "STORE_FILE", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(ts, "_probe_ffprobe", lambda path, size: None)
+    batched = []
+
+    def transcribe_batch(paths, model, **kw):
+        batched.extend(paths)
+        return {p: "batched" for p in paths}
+
+    transcribed = []
+
+    def transcribe(path, **kw):
+        transcribed.append(path)
+        return "decoded"
+
+    monkeypatch.setattr(ts, "transcribe_batch", transcribe_batch)
+    monkeypatch.setattr(ts, "transcribe", transcribe)
+    monkeypatch.setattr(ts, "summarize", lambda prompt, text, *a: f"- {text}")
+    monkeypatch.setattr(ts, "markdown_to_pdf", lambda md, path, **kw: open(path, "w").close())
+    monkeypatch.setattr(
+        "sys.argv", ["batch_transcribe.py", "--method", "local", "--local-batch-size", "4"]
+    )
+
+    bt.main()
+
+    assert batched == [str(audio_dir / "memo.wav")]
+    assert transcribed == [str(audio_dir / "talk.wav")]
+
+
+def test_enqueue_then_worker_processes_shared_queue(tmp_path, monkeypatch):
+    import wave
+
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for seconds, name in enumerate(("a.wav", "b.wav", "c.wav"), 1):
+        with wave.open(str(audio_dir / name), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\x00\x00" * 8000 * seconds)
+    monkeypatch.setattr(bt, "AUDIO_DIR", audio_dir)
+    monkeypatch.setattr(bt, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(bt, "LOG_FILE", tmp_path / "processed.log")
+    monkeypatch.setattr(bt, "STORE_FILE", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(ts, "_probe_ffprobe", lambda path, size: None)
+    monkeypatch.setattr(ts, "markdown_to_pdf", lambda md, path, **kw: open(path, "w").close())
+    monkeypatch.setattr(ts, "summarize", lambda prompt, text, *a: f"- {text}")
+
+    def fake_transcribe(path, **kw):
+        if path.endswith("b.wav"):
+            raise RuntimeError("decoder crashed")
+        return f"transcript of {path}"
+
+    monkeypatch.setattr(ts, "transcribe", fake_transcribe)
+    queue_dir = tmp_path / "queue"
+    monkeypatch.setattr("sys.argv", ["batch_transcribe.py", "--enqueue", str(queue_dir)])
+    bt.main()
+    assert len(list((queue_dir / "pending").iterdir())) == 3
+    assert not (tmp_path / "output").exists() or not any((tmp_path / "output").iterdir())
+
+    # Another host: its own project directory, the audio and output on the share
+    monkeypatch.setattr(bt, "AUDIO_DIR", tmp_path / "host2" / "audio")
+    monkeypatch.setattr(bt, "STORE_FILE", tmp_path / "host2" / "jobs.sqlite3")
+    shared_output = tmp_path / "share" / "output"
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "batch_transcribe.py",
+            "--method",
+            "api",
+            "--worker",
+            str(queue_dir),
+            "--audio-dir",
+            str(audio_dir),
+            "--output-dir",
+            str(shared_output),
+        ],
+    )
+    with pytest.raises(SystemExit):
+        bt.main()
+    counts = bt.dist_queue.DirectoryQueue(queue_dir).counts()
+    # b.wav is retried until it runs out of attempts
+    assert counts == {"pending": 0, "leased": 0, "done": 2, "failed": 1}
+    assert len([p for p in shared_output.iterdir() if p.suffix == ".md"]) == 2
+    assert not (tmp_path / "host2" / "jobs.sqlite3").exists()
+
+
+def test_watch_retries_a_failed_file_when_it_is_dropped_again(tmp_path, monkeypatch):
+    import wave
+
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    monkeypatch.setattr(ts, "_probe_ffprobe", lambda path, size: None)
+    attempts = []
+
+    def transcribe(path, **kw):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise RuntimeError("upload failed")
+        return "transcript"
+
+    monkeypatch.setattr(ts, "transcribe", transcribe)
+    monkeypatch.setattr(ts, "summarize", lambda prompt, text, *a: f"- {text}")
+    monkeypatch.setattr(ts, "markdown_to_pdf", lambda md, path, **kw: open(path, "w").close())
+    store = bt.JobStore(tmp_path / "jobs.sqlite3")
+    seen_hashes = set()
+    settings = bt.BatchSettings(
+        method="api",
+        language="en",
+        whisper_model="whisper-1",
+        api_key="k",
+        summary_model="gpt-4o-mini",
+        store=store,
+        output_dir=tmp_path / "output",
+        seen_hashes=seen_hashes,
+    )
+    (tmp_path / "output").mkdir()
+    pipeline = bt.build_pipeline(settings, keep_results=False)
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=bt._watch,
+        args=(pipeline, store, seen_hashes, 0.1, 0.05, stop, audio_dir),
+        daemon=True,
+    )
+    watcher.start()
+
+    def wait_for(condition):
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            time.sleep(0.05)
+        assert condition()
+
+    def drop():
+        with wave.open(str(audio_dir / "memo.wav"), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\x00\x00" * 8000)
+
+    drop()
+    wait_for(lambda: pipeline.failed_count == 1)
+    assert not seen_hashes
+    # Copying the same recording again retries it
+    time.sleep(0.05)
+    drop()
+    wait_for(lambda: pipeline.completed_count == 1)
+    stop.set()
+    watcher.join(timeout=5)
+    pipeline.close()
+    pipeline.join()
+    assert len(attempts) == 2 and not seen_hashes
+    assert store.get(1)["state"] == "done"
+    store.close()
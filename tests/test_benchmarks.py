@@ -0,0 +1,45 @@
+import json
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import mock_openai  # noqa: E402
+import run_benchmarks  # noqa: E402
+
+
+def _post(url, body):
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_mock_server_answers_and_injects_rate_limits():
+    server = mock_openai.MockOpenAIServer(mock_openai.MockSettings(latency_ms=0)).start()
+    try:
+        reply = _post(server.base_url + "/chat/completions", {"model": "gpt-4o-mini", "messages": []})
+        assert reply["choices"][0]["message"]["content"].startswith("# Title")
+
+        server.settings.rate_limit_rate = 1.0
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _post(server.base_url + "/chat/completions", {"messages": []})
+        assert err.value.code == 429
+        assert server.stats.statuses == {200: 1, 429: 1}
+    finally:
+        server.stop()
+
+
+def test_compare_reports_regressions_in_the_right_direction():
+    baseline = {"scenarios": {"pdf": {"p50_sec": 1.0, "throughput_per_sec": 10.0}}}
+    current = {"scenarios": {"pdf": {"p50_sec": 1.05, "throughput_per_sec": 5.0}}}
+
+    regressions = run_benchmarks.compare(current, baseline, threshold_pct=10)
+
+    assert len(regressions) == 1 and "throughput_per_sec" in regressions[0]
+    assert run_benchmarks.percentile([3.0, 1.0, 2.0], 50) == 2.0
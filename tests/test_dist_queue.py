@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import dist_queue
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_WORKER = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+import dist_queue
+dq = dist_queue.DirectoryQueue({queue!r})
+while True:
+    lease = dq.claim(sys.argv[1])
+    if lease is None:
+        break
+    # O_EXCL makes a second run of the same job fail loudly
+    fd = os.open(os.path.join({out!r}, lease.job["filename"]), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    os.write(fd, sys.argv[1].encode())
+    os.close(fd)
+    time.sleep(0.01)
+    assert dq.complete(lease)
+"""
+
+
+def test_workers_in_separate_processes_process_each_job_once(tmp_path):
+    dq = dist_queue.DirectoryQueue(tmp_path / "queue")
+    for i in range(30):
+        assert dq.enqueue(f"hash{i}", f"file{i}.wav", 100, duration_sec=i)
+    assert not dq.enqueue("hash3", "renamed.wav", 100)
+    out = tmp_path / "out"
+    out.mkdir()
+    script = _WORKER.format(root=str(ROOT), queue=str(tmp_path / "queue"), out=str(out))
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, f"w{n}"], stderr=subprocess.PIPE)
+        for n in range(4)
+    ]
+    for p in procs:
+        _, err = p.communicate(timeout=60)
+        assert p.returncode == 0, err.decode()
+    assert len(list(out.iterdir())) == 30
+    assert dq.counts() == {"pending": 0, "leased": 0, "done": 30, "failed": 0}
+
+
+def test_expired_lease_is_requeued_and_stale_worker_cannot_finish(tmp_path):
+    dq = dist_queue.DirectoryQueue(tmp_path, lease_sec=60)
+    dq.enqueue("short", "short.wav", 1, duration_sec=5)
+    dq.enqueue("long", "long.wav", 1, duration_sec=500)
+    dead = dq.claim("dead-worker")
+    assert dead.job["filename"] == "long.wav"
+    assert dq.requeue_expired() == 0
+
+    old = time.time() - 120
+    os.utime(dead.path, (old, old))
+    assert dq.requeue_expired() == 1
+    retry = dq.claim("live-worker")
+    assert retry.job["filename"] == "long.wav"
+    assert not dq.heartbeat(dead)
+    assert not dq.complete(dead)
+    assert not dq.fail(dead, "late")
+    assert dq.heartbeat(retry)
+    assert dq.complete(retry)
+
+
+def test_failed_jobs_are_retried_then_parked(tmp_path):
+    dq = dist_queue.DirectoryQueue(tmp_path, max_attempts=2)
+    dq.enqueue("h", "bad.wav", 1)
+    assert dq.fail(dq.claim("w"), "boom")
+    lease = dq.claim("w")
+    assert lease.job["attempts"] == 1
+    assert dq.fail(lease, "boom again")
+    assert dq.claim("w") is None
+    assert dq.counts()["failed"] == 1
+    # Adding the file again gives it a fresh start
+    assert dq.enqueue("h", "bad.wav", 1)
+    assert dq.claim("w").job["attempts"] == 0
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+import endpoints
+import transcribe_summary as ts
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_parse_endpoints_fills_in_default_key():
+    parsed = endpoints.parse_endpoints("http://a/v1/ key-a,\n  default", default_key="main")
+
+    assert [(e.base_url, e.api_key) for e in parsed] == [("http://a/v1", "key-a"), ("", "main")]
+    assert parsed[1].name == "default"
+    with pytest.raises(ValueError):
+        endpoints.parse_endpoints("http://a k extra")
+
+
+def test_pool_routes_to_least_outstanding_and_rests_failed_endpoints():
+    a, b = endpoints.parse_endpoints("http://a k1, http://b k2")
+    pool = endpoints.EndpointPool([a, b], cooldown=60)
+
+    first, second = pool.acquire(), pool.acquire()
+    assert {first.name, second.name} == {"http://a", "http://b"}
+
+    pool.release(a, _HTTPError(429))
+    assert pool.available() == 1
+    # A bad request is not the endpoint's fault and keeps it in rotation
+    pool.release(b, _HTTPError(400))
+    assert pool.available() == 1
+    assert pool.acquire() is b
+
+    pool.probe = lambda endpoint: None
+    pool.check_health()
+    assert pool.available() == 2 and a.failures == 0
+
+
+def test_summarize_fails_over_to_healthy_endpoint(monkeypatch):
+    mock_openai = pytest.importorskip("mock_openai")
+    pytest.importorskip("openai")
+    broken = mock_openai.MockOpenAIServer(mock_openai.MockSettings(latency_ms=0, error_rate=1.0))
+    healthy = mock_openai.MockOpenAIServer(mock_openai.MockSettings(latency_ms=0))
+    broken.start()
+    healthy.start()
+    backoffs = []
+    monkeypatch.setattr(ts.random, "uniform", lambda a, b: backoffs.append(a) or 0.0)
+    try:
+        pool = endpoints.EndpointPool(
+            endpoints.parse_endpoints(f"{broken.base_url} k, {healthy.base_url} k")
+        )
+        summaries = [
+            ts.summarize("Summarize.", "text", "gpt-4o-mini", "", "en", endpoints=pool)
+            for _ in range(3)
+        ]
+    finally:
+        broken.stop()
+        healthy.stop()
+
+    assert all(s.startswith("# Title") for s in summaries)
+    assert backoffs == []  # failover retries at once
+    assert broken.stats.statuses == {500: 1}
+    assert healthy.stats.statuses == {200: 3}
+
+
+def test_stalled_request_stays_outstanding_until_it_ends(monkeypatch):
+    import threading
+
+    class Client:
+        def __init__(self, url):
+            self.url = url
+
+        def with_options(self, **kwargs):
+            return self
+
+    monkeypatch.setattr(ts, "_get_openai_client", lambda key, url: Client(url))
+    unstick = threading.Event()
+    ended = threading.Event()
+
+    def request(api):
+        if api.url == "http://a":
+            unstick.wait(5)
+            ended.set()
+        return api.url
+
+    a, b = endpoints.parse_endpoints("http://a k, http://b k")
+    pool = endpoints.EndpointPool([a, b])
+    timeouts = {"connect": 1.0, "read": 1.0, "total": 0.2, "job": 0.0}
+    assert ts._api_call(pool, request, "summary", timeouts) == "http://b"
+    # The call gave up on a, but a's request is still in flight
+    assert (a.outstanding, b.outstanding) == (1, 0)
+    unstick.set()
+    assert ended.wait(2)
+    for _ in range(50):
+        if a.outstanding == 0:
+            break
+        ts.time.sleep(0.02)
+    assert a.outstanding == 0
@@ -0,0 +1,98 @@
+import platform
+import threading
+import time
+
+import pytest
+
+import folder_watch
+
+
+def _collect(directory, use_inotify, stop):
+    found = []
+
+    def run():
+        for path in folder_watch.watch(
+            directory, {".mp3"}, settle_sec=0.2, poll_interval=0.05, stop=stop, use_inotify=use_inotify
+        ):
+            found.append(path.name)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return found, t
+
+
+@pytest.mark.parametrize(
+    "use_inotify",
+    [False, pytest.param(True, marks=pytest.mark.skipif(platform.system() != "Linux", reason="inotify"))],
+)
+def test_watch_reports_files_once_written(tmp_path, use_inotify):
+    (tmp_path / "existing.mp3").write_bytes(b"a")
+    (tmp_path / "notes.txt").write_text("ignored")
+    stop = threading.Event()
+    found, thread = _collect(tmp_path, use_inotify, stop)
+
+    # A file that keeps growing must not be reported until it settles
+    growing = tmp_path / "new.mp3"
+    with growing.open("wb") as f:
+        for _ in range(5):
+            f.write(b"x" * 100)
+            f.flush()
+            time.sleep(0.08)
+            assert "new.mp3" not in found
+    deadline = time.time() + 5
+    while len(found) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    stop.set()
+    thread.join(timeout=5)
+    assert sorted(found) == ["existing.mp3", "new.mp3"]
+
+
+@pytest.mark.parametrize("overflow", [True, False])
+def test_inotify_watch_rescans_after_overflow_and_periodically(tmp_path, monkeypatch, overflow):
+    watching = threading.Event()
+    written = threading.Event()
+
+    class MissingNotifier:
+        """Never reports the new file, like a full queue or a network share."""
+
+        def __init__(self, directory):
+            self.overflowed = False
+
+        def read(self, timeout):
+            watching.set()
+            time.sleep(timeout)
+            if overflow and written.is_set() and not self.overflowed:
+                self.overflowed = True
+                return None
+            return []
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(folder_watch.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(folder_watch, "_Inotify", MissingNotifier)
+    stop = threading.Event()
+    found = []
+
+    def run():
+        for path in folder_watch.watch(
+            tmp_path,
+            {".mp3"},
+            settle_sec=0.1,
+            poll_interval=0.05,
+            stop=stop,
+            rescan_sec=60 if overflow else 0.2,
+        ):
+            found.append(path.name)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert watching.wait(5)
+    (tmp_path / "missed.mp3").write_bytes(b"a")
+    written.set()
+    deadline = time.time() + 5
+    while not found and time.time() < deadline:
+        time.sleep(0.05)
+    stop.set()
+    thread.join(timeout=5)
+    assert found == ["missed.mp3"]
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tkinter")
+import gui  # noqa: E402
+
+
+def test_transcribe_group_runs_files_concurrently_in_order():
+    started = threading.Barrier(3, timeout=5)
+    statuses = {}
+
+    def run(audio, update):
+        started.wait()  # all three must be in flight at once
+        update("uploading")
+        time.sleep(0.03 if audio == "a" else 0)
+        return audio.upper()
+
+    result = gui.transcribe_group(
+        ["a", "b", "c"], run, workers=3, file_status=lambda i, text: statuses.__setitem__(i, text)
+    )
+
+    assert result == ["A", "B", "C"]
+    assert statuses == {0: "✅ Transcribed", 1: "✅ Transcribed", 2: "✅ Transcribed"}
+
+
+def test_transcribe_group_reports_failure_and_skips_queued_files():
+    calls = []
+    statuses = {}
+
+    def run(audio, update):
+        calls.append(audio)
+        if audio == "a":
+            raise RuntimeError("upload failed")
+        time.sleep(0.2)  # still busy when the group is cancelled
+        return audio
+
+    with pytest.raises(RuntimeError):
+        gui.transcribe_group(
+            ["a", "b", "c"], run, workers=1, file_status=lambda i, text: statuses.__setitem__(i, text)
+        )
+
+    assert statuses[0] == "❌ upload failed"
+    assert "c" not in calls
+
+
+def test_job_queue_limits_concurrency_reorders_and_cancels():
+    release = threading.Event()
+    order = []
+
+    def run(job):
+        order.append(job.id)
+        if job.id == 1:
+            # Runs until cancelled, like a long upload
+            job.cancel_event.wait(5)
+            raise gui.transcribe_summary.Cancelled("stopped")
+        release.wait(5)
+
+    changes = []
+    queue = gui.JobQueue(run, workers=1, on_change=lambda job: changes.append((job.id, job.state)))
+    jobs = [gui.Job(i, [f"{i}.mp3"], "out", "api") for i in (1, 2, 3, 4)]
+    for job in jobs:
+        queue.submit(job)
+
+    assert [j.id for j in queue.running()] == [1]
+    assert queue.move(4, -1) is jobs[2]
+    assert [j.id for j in queue.queued()] == [2, 4, 3]
+    assert queue.move(2, -1) is None
+    assert queue.cancel(3) and jobs[2].state == gui.CANCELLED
+
+    assert queue.cancel(1)
+    release.set()
+    deadline = time.monotonic() + 5
+    while any(j.state in (gui.QUEUED, gui.RUNNING) for j in jobs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert order == [1, 2, 4]
+    assert [job.state for job in jobs] == [gui.CANCELLED, gui.DONE, gui.CANCELLED, gui.DONE]
+    assert (1, gui.RUNNING) in changes and (3, gui.CANCELLED) in changes
+
+
+def test_progress_bus_keeps_latest_update_per_target():
+    bus = gui.ProgressBus()
+    for i in range(100):
+        bus.status(f"chunk {i}")
+        bus.row("job1:0", f"{i}%")
+    bus.row("job1", "Running")
+    bus.post(print, "done")
+    status, rows, calls = bus.drain()
+    assert status == "chunk 99"
+    assert rows == {"job1:0": "99%", "job1": "Running"}
+    assert calls == [(print, ("done",))]
+    assert bus.drain() == (None, {}, [])
+
+
+def test_describe_progress_sums_files_and_estimates_time_left():
+    import instrumentation
+
+    first, second = instrumentation.ProgressMeter(), instrumentation.ProgressMeter()
+    first.expect(instrumentation.BYTES, 40e6)
+    first.advance(instrumentation.BYTES, 10e6)
+    first.expect(instrumentation.AUDIO_SEC, 1200)
+    second.expect(instrumentation.AUDIO_SEC, 600)
+    first.advance(instrumentation.AUDIO_SEC, 300)
+    first.started -= 60
+    text = gui.describe_progress([first, second])
+    assert text == "Uploaded 10.0 of 40.0 MB · Transcribed 5:00 of 30:00 · about 3:00 left"
+    assert gui.format_duration(3725) == "1:02:05"
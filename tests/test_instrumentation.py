@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import instrumentation
+import transcribe_summary as ts
+
+
+def test_trace_records_spans_events_and_failures(tmp_path):
+    trace = instrumentation.Trace("a.mp3")
+    with trace.span("upload", chunk=1) as attrs:
+        attrs["bytes"] = 10
+    with pytest.raises(RuntimeError):
+        with trace.span("upload", chunk=2):
+            raise RuntimeError("boom")
+    instrumentation.event(trace, "retry", what="chunk 2")
+    with instrumentation.span(None, "ignored"):
+        pass
+
+    path = tmp_path / "trace.jsonl"
+    trace.write_jsonl(path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["type"], r.get("stage"), r.get("ok")) for r in records] == [
+        ("span", "upload", True),
+        ("span", "upload", False),
+        ("event", None, None),
+    ]
+    assert records[0]["bytes"] == 10 and records[0]["job"] == "a.mp3"
+
+    metrics = instrumentation.Metrics()
+    metrics.observe(trace, "failed")
+    metrics_file = tmp_path / "metrics.prom"
+    metrics.write_textfile(metrics_file)
+    text = metrics_file.read_text()
+    assert 'gpt_transcribe_stage_seconds_count{stage="upload"} 2' in text
+    assert 'gpt_transcribe_stage_errors_total{stage="upload"} 1' in text
+    assert 'gpt_transcribe_events_total{event="retry"} 1' in text
+    assert 'gpt_transcribe_jobs_total{status="failed"} 1' in text
+
+
+def test_markdown_to_pdf_records_parse_and_build(tmp_path):
+    trace = instrumentation.Trace("summary")
+    ts.markdown_to_pdf("# Title\n\n- item\n", str(tmp_path / "out.pdf"), trace=trace)
+    assert set(trace.stage_seconds()) == {"pdf_parse", "pdf_build"}
+    assert trace.records[-1]["pages"] == 1
+
+
+def test_progress_meter_reports_fractions_and_eta():
+    meter = instrumentation.ProgressMeter()
+    assert meter.fraction(instrumentation.BYTES) is None and meter.eta(instrumentation.BYTES) is None
+    instrumentation.expect(meter, instrumentation.BYTES, 400)
+    instrumentation.advance(meter, instrumentation.BYTES, 100)
+    instrumentation.advance(meter, instrumentation.BYTES, 0)
+    instrumentation.advance(None, instrumentation.BYTES, 100)
+    assert meter.fraction(instrumentation.BYTES) == 0.25
+    meter.started -= 10
+    assert meter.eta(instrumentation.BYTES) == pytest.approx(30, abs=0.5)
+    # Retried uploads never push the reported progress past the total
+    instrumentation.advance(meter, instrumentation.BYTES, 1000)
+    assert meter.snapshot() == {instrumentation.BYTES: (400, 400)}
+
+
+def test_upload_file_counts_bytes_once_across_retries(tmp_path):
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"x" * 1000)
+    meter = instrumentation.ProgressMeter()
+    meter.expect(instrumentation.BYTES, 2000)
+    sent = [0]
+    for _ in range(2):
+        with ts._open_upload(path, meter, sent) as f:
+            while f.read(300):
+                pass
+    assert meter.snapshot()[instrumentation.BYTES] == (1000, 2000)
@@ -0,0 +1,84 @@
+import configparser
+import threading
+
+import pytest
+
+import job_server
+import transcribe_summary as ts
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    prompt = tmp_path / "prompt.txt"
+    prompt.write_text("Summarize")
+    monkeypatch.setattr(ts, "ensure_prompt", lambda *a, **k: prompt)
+
+    def fake_transcribe(audio_path, model_name, method, api_key=None, progress_cb=None, **kwargs):
+        if "broken" in audio_path:
+            raise RuntimeError("cannot decode")
+        progress_cb("Uploading chunk 1/1")
+        return f"text of {audio_path} via {model_name}"
+
+    monkeypatch.setattr(ts, "transcribe", fake_transcribe)
+    monkeypatch.setattr(
+        ts, "summarize", lambda prompt, transcript, model, key, lang, *a, **k: f"```\n{prompt}: {transcript} ({lang})\n```"
+    )
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "general": {"method": "api", "language": "en"},
+            "openai": {"api_key": "k", "summary_model": "gpt-4o-mini"},
+            "whisper_api": {"model": "whisper-1"},
+            "whisper_local": {"model": "base"},
+            "server": {"token": "secret"},
+        }
+    )
+    srv = job_server.serve(config, port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_submit_job_streams_progress_and_result(server):
+    progress = []
+    result = job_server.submit_job(
+        server, {"audio": "/a.mp3", "language": "de"}, progress.append, token="secret"
+    )
+    assert progress == ["Uploading chunk 1/1", "Summarizing..."]
+    assert result["transcript"] == "text of /a.mp3 via whisper-1"
+    assert result["summary"] == "Summarize: text of /a.mp3 via whisper-1 (de)"
+
+
+def test_remote_helpers_and_errors(server):
+    text = job_server.remote_transcribe(server, "/b.mp3", "whisper-x", "api", token="secret")
+    assert text == "text of /b.mp3 via whisper-x"
+    summary = job_server.remote_summarize(server, "P", "hello", "m", "en", token="secret")
+    assert summary == "P: hello (en)"
+    with pytest.raises(RuntimeError, match="cannot decode"):
+        job_server.remote_transcribe(server, "/broken.mp3", "whisper-1", "api", token="secret")
+    with pytest.raises(RuntimeError, match="rejected"):
+        job_server.submit_job(server, {"audio": "/a.mp3"}, token="wrong")
+
+
+def test_rejects_browser_requests_and_public_host_without_token(server):
+    import urllib.error
+    import urllib.request
+
+    def post(headers):
+        request = urllib.request.Request(
+            server + "/jobs", data=b'{"audio": "/a.mp3"}', method="POST",
+            headers={"Authorization": "Bearer secret", **headers},
+        )
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(request, timeout=5)
+        return info.value.code
+
+    assert post({"Content-Type": "text/plain"}) == 415
+    assert post({"Content-Type": "application/json", "Origin": "https://example.com"}) == 403
+
+    config = configparser.ConfigParser()
+    config.read_dict({"general": {}, "openai": {"api_key": "k"}, "whisper_api": {}, "whisper_local": {}})
+    with pytest.raises(ValueError, match="token"):
+        job_server.serve(config, host="0.0.0.0", port=0)
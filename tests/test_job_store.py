@@ -0,0 +1,69 @@
+import threading
+
+import job_store
+from job_store import JobStore
+
+
+def test_dedupes_by_content_not_name(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"first recording")
+    digest = store.file_hash(audio)
+    job_id = store.enqueue(digest, "a.mp3", audio.stat().st_size)
+    store.finish(job_id, 12.0, "api", "whisper-1")
+
+    renamed = tmp_path / "renamed.mp3"
+    audio.rename(renamed)
+    assert store.is_done(store.file_hash(renamed), "renamed.mp3", renamed.stat().st_size)
+
+    rerecorded = tmp_path / "a.mp3"
+    rerecorded.write_bytes(b"second recording")
+    assert not store.is_done(store.file_hash(rerecorded), "a.mp3", rerecorded.stat().st_size)
+
+
+def test_failed_job_counts_retries(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.enqueue("abc", "a.mp3", 10)
+    store.start(job_id)
+    store.fail(job_id, "transcribe: timeout")
+    assert store.enqueue("abc", "a.mp3", 10) == job_id
+    job = store.get(job_id)
+    assert job["state"] == job_store.QUEUED
+    assert job["retries"] == 1
+
+
+def test_imports_processed_log_once(tmp_path):
+    log = tmp_path / "processed.log"
+    log.write_text(
+        "a.mp3,1000,60.00,api,5.50,2024-01-01T10:00:00\n"
+        "b.wav,2000,120.00,local,30.00,2024-01-02T10:00:00\n"
+        "Meeting, Jan 5.m4a,3000,90.00,api,8.00,2024-01-03T10:00:00\n"
+        "garbage line\n",
+        encoding="utf-8",
+    )
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    assert store.import_legacy_log(log) == 3
+    assert store.import_legacy_log(log) == 0
+    # Legacy rows match by name and size, then adopt the content hash
+    assert store.is_done("hash-a", "a.mp3", 1000)
+    assert store.is_done("hash-a", "other-name.mp3", 1000)
+    assert not store.is_done("hash-b", "b.wav", 2001)
+    assert store.stage_timings(2) == {"transcribe": 30.0}
+    assert store.is_done("hash-c", "Meeting, Jan 5.m4a", 3000)
+
+
+def test_concurrent_writers(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+
+    def work(n):
+        for i in range(25):
+            job_id = store.enqueue(f"{n}-{i}", f"{n}-{i}.mp3", i)
+            store.record_stage(job_id, "transcribe", 0.1)
+            store.finish(job_id, 1.0, "api")
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(store.is_done(f"{n}-{i}", "", 0) for n in range(4) for i in range(25))
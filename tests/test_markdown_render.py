@@ -0,0 +1,38 @@
+import markdown_render as mr
+import transcribe_summary as ts
+from reportlab.platypus import ListFlowable, Paragraph
+
+
+def test_parse_builds_paragraphs_and_nested_lists():
+    text = "# Title\nfirst line\nsecond line\n\n- a\n  - b\n  more of b\n1. one\n2. two\n"
+
+    blocks = mr.parse(mr.tokenize(text.splitlines()))
+
+    assert blocks[0] == mr.Heading(1, "Title")
+    assert blocks[1] == mr.Para("first line second line")
+    bullets, numbers = blocks[3], blocks[4]
+    assert not bullets.ordered and bullets.items[0].children[0].items[0].text == "b more of b"
+    assert numbers.ordered and [i.text for i in numbers.items] == ["one", "two"]
+
+
+def test_inline_markup_formats_and_escapes():
+    markup = mr.inline_markup("**a < b** & *c* `x<y` [site](https://e.com/?a=1&b=2)")
+
+    assert markup.startswith("<b>a &lt; b</b> &amp; <i>c</i> ")
+    assert '<font face="Courier">x&lt;y</font>' in markup
+    assert 'href="https://e.com/?a=1&amp;b=2"' in markup
+    # Unsafe schemes keep only the label
+    assert mr.inline_markup("[x](javascript:alert%281%29)") == "x"
+
+
+def test_to_flowables_keeps_special_characters(tmp_path):
+    flowables = mr.to_flowables("Profit < 5 & **growing**\n\n3. third\n", ts._pdf_styles())
+
+    para = flowables[0]
+    assert isinstance(para, Paragraph)
+    assert para.getPlainText() == "Profit < 5 & growing"
+    assert "".join(f.text for f in para.frags if f.bold) == "growing"
+    assert isinstance(flowables[2], ListFlowable)
+
+    ts.markdown_to_pdf("# A & B <c>\n\n- [link](https://e.com)\n", str(tmp_path / "s.pdf"))
+    assert (tmp_path / "s.pdf").read_bytes().startswith(b"%PDF")
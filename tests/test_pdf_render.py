@@ -0,0 +1,20 @@
+import pdf_render
+import transcribe_summary as ts
+from instrumentation import Trace
+
+
+def test_styles_are_built_once():
+    assert ts._pdf_styles() is ts._pdf_styles()
+
+
+def test_service_renders_in_worker_and_merges_trace(tmp_path):
+    trace = Trace("meeting")
+    with pdf_render.PdfRenderService(processes=1, max_pending=1) as renderer:
+        futures = [renderer.submit(f"# Part {i}\n\n- item\n", tmp_path / f"{i}.pdf") for i in range(3)]
+        renderer.render("# Title\n\nBody\n", tmp_path / "out.pdf", trace=trace)
+        for future in futures:
+            future.result()
+
+    assert all((tmp_path / f"{i}.pdf").stat().st_size > 0 for i in range(3))
+    assert (tmp_path / "out.pdf").read_bytes().startswith(b"%PDF")
+    assert {r["stage"] for r in trace.records} == {"pdf_parse", "pdf_build"}
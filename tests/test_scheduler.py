@@ -0,0 +1,120 @@
+import threading
+import time
+
+import scheduler
+
+
+def test_order_jobs_longest_first():
+    assert scheduler.order_jobs([3, 240, 10, 60], cost=float) == [240, 60, 10, 3]
+
+
+def test_order_jobs_interleaves_short():
+    jobs = [1, 2, 3, 50, 60, 70]
+    assert scheduler.order_jobs(jobs, cost=float, interleave_short=2) == [70, 60, 1, 50, 3, 2]
+
+
+def test_predict_makespan_longest_first_beats_fifo():
+    costs = [10, 10, 10, 10, 10, 10, 240]
+    assert scheduler.predict_makespan(costs, 3) == 260
+    ordered = scheduler.order_jobs(costs, cost=float)
+    assert scheduler.predict_makespan(ordered, 3) == 240
+
+
+def test_job_cost_falls_back_to_size():
+    assert scheduler.job_cost(0.0, 32_000) == 2.0
+    assert scheduler.job_cost(5.0, 32_000) == 5.0
+
+
+def test_fit_throughput_and_estimate():
+    history = [
+        {"method": "api", "model": "whisper-1", "size_bytes": 960_000, "duration_sec": 60.0,
+         "stages": {"transcribe": 6.0, "summarize": 4.0}},
+        {"method": "api", "model": "whisper-1", "size_bytes": 2_880_000, "duration_sec": 180.0,
+         "stages": {"transcribe": 18.0, "summarize": 2.0}},
+        # Legacy rows without timings are ignored
+        {"method": "api", "model": None, "size_bytes": 1000, "duration_sec": 1.0, "stages": {}},
+    ]
+    fit = scheduler.fit_throughput(history)
+    tp = fit[("api", "whisper-1")]
+    assert tp.rtf == 0.1
+    assert tp.overhead_sec == 3.0
+    assert tp.samples == 2
+
+    est = scheduler.estimate_batch(
+        [(600.0, 0), (600.0, 0), (1200.0, 0)], "api", "whisper-1", 2, fit, price_per_minute=0.006
+    )
+    assert est["wall_seconds"] == 126.0
+    assert est["api_minutes"] == 40.0
+    assert round(est["cost"], 3) == 0.24
+
+
+def test_estimate_sizes_unprobed_files_from_history():
+    # CD-quality WAV: 176,400 bytes per second of audio
+    history = [
+        {"method": "api", "model": "whisper-1", "size_bytes": 10_584_000, "duration_sec": 60.0,
+         "stages": {"transcribe": 6.0}},
+    ]
+    fit = scheduler.fit_throughput(history)
+    assert fit[("api", "whisper-1")].audio_bytes_per_sec == 176_400
+
+    est = scheduler.estimate_batch(
+        [(0.0, 105_840_000)], "api", "whisper-1", 1, fit, price_per_minute=0.006
+    )
+    assert est["audio_minutes"] == est["api_minutes"] == 10.0
+    assert est["wall_seconds"] == 60.0
+    assert round(est["cost"], 3) == 0.06
+
+
+def test_estimate_without_history_uses_default():
+    est = scheduler.estimate_batch([(3600.0, 0)], "local", "base", 1, {})
+    assert est["history_samples"] == 0
+    assert est["wall_seconds"] == 3600.0 * scheduler.DEFAULT_RTF["local"]
+    assert est["api_minutes"] == 0.0
+
+
+def test_memory_estimates_grow_with_audio_and_model():
+    short = scheduler.estimate_job_memory(60, 1_000_000, 44_100, 2, method="local")
+    long = scheduler.estimate_job_memory(3600, 60_000_000, 44_100, 2, method="local")
+    assert long > short > scheduler.JOB_OVERHEAD_BYTES
+    plain = scheduler.estimate_job_memory(3600, 60_000_000, 44_100, 2, method="api")
+    compact = scheduler.estimate_job_memory(
+        3600, 60_000_000, 44_100, 2, method="api", compact=True, ffmpeg=False
+    )
+    split = scheduler.estimate_job_memory(3600, 60_000_000, 44_100, 2, method="api", ffmpeg=False)
+    streamed = scheduler.estimate_job_memory(3600, 60_000_000, 44_100, 2, method="api", compact=True)
+    assert compact > split > plain == streamed
+    assert scheduler.workers_for_budget(1000, 100, [300, 200, 500, 100]) == 3
+    assert scheduler.workers_for_budget(1000, 100, [5000]) == 1
+    assert scheduler.workers_for_budget(10**9, 0, [1] * 100, cap=4) == 4
+    assert scheduler.model_memory("large-v3") > scheduler.model_memory("base")
+    int8 = scheduler.model_memory("small", {"backend": "faster-whisper", "compute_type": "int8"})
+    assert int8 < scheduler.model_memory("small")
+    assert scheduler.parse_memory_budget("") is None
+    assert scheduler.parse_memory_budget("512") == 512 * scheduler.MB
+
+
+def test_memory_budget_limits_concurrency_and_admits_oversize_jobs_alone():
+    budget = scheduler.MemoryBudget(100, reserved_bytes=20)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job(need):
+        with budget.reserve(need):
+            with lock:
+                running.append(need)
+                peak.append(sum(running) + budget.reserved)
+            time.sleep(0.02)
+            with lock:
+                running.remove(need)
+
+    threads = [threading.Thread(target=job, args=(n,)) for n in (40, 40, 30, 500, 10, 10)]
+    for t in threads:
+        t.start()
+        time.sleep(0.002)
+    for t in threads:
+        t.join(timeout=5)
+    assert len(peak) == 6
+    # Only the 500-byte job may exceed the limit, and only while it runs alone
+    assert all(p <= 100 for p in peak if p != 520)
+    assert budget.in_use == 20
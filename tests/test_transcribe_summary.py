@@ -2,6 +2,8 @@ from pathlib import Path
 import os
 import builtins
 
+import pytest
+
 import transcribe_summary as ts
 
 
@@ -35,3 +37,425 @@ def test_markdown_to_pdf_smoke(tmp_path):
     assert pdf_file.is_file()
 
 
+
+
+def test_get_local_options_reads_backend(tmp_path):
+    cfg_path = tmp_path / "config.cfg"
+    cfg_path.write_text("""[whisper_local]
+model = small
+backend = faster-whisper
+compute_type = int8
+beam_size = 3
+num_workers = 2
+""", encoding="utf-8")
+    opts = ts.get_local_options(ts.load_config(cfg_path))
+    assert opts["backend"] == "faster-whisper"
+    assert opts["beam_size"] == 3
+    assert opts["num_workers"] == 2
+    assert opts["device"] == "auto"
+
+
+def test_transcribe_local_faster_whisper_backend(monkeypatch):
+    import sys
+    import types
+
+    class Segment:
+        def __init__(self, end, text):
+            self.start = end - 10.0
+            self.end = end
+            self.text = text
+
+    class FakeModel:
+        def __init__(self, name, **kwargs):
+            self.kwargs = kwargs
+
+        def transcribe(self, path, **kwargs):
+            info = types.SimpleNamespace(duration=20.0)
+            return iter([Segment(10.0, " Hello"), Segment(20.0, " world.")]), info
+
+    fake = types.ModuleType("faster_whisper")
+    fake.WhisperModel = FakeModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", fake)
+    monkeypatch.setattr(ts, "_LOCAL_MODEL_CACHE", {})
+
+    messages = []
+    text = ts.transcribe(
+        "memo.wav",
+        model_name="base",
+        method="local",
+        progress_cb=messages.append,
+        local_options={"backend": "faster-whisper", "beam_size": 2},
+    )
+    assert text == "Hello world."
+    assert messages[0] == "Transcribing locally..."
+    assert messages[-1] == "Finished local transcription"
+
+
+def test_frames_to_regions_bridges_short_pauses_and_pads():
+    # 0.1 s frames: speech 1.0-2.0 s, short pause, speech 2.3-3.0 s, long silence, click, speech 6.0-7.0 s
+    flags = [False] * 80
+    for i in list(range(10, 20)) + list(range(23, 30)) + [45] + list(range(60, 70)):
+        flags[i] = True
+    regions = ts._frames_to_regions(flags, 0.1, min_silence_sec=0.5, pad_sec=0.2)
+    assert [(round(s, 2), round(e, 2)) for s, e in regions] == [(0.8, 3.2), (5.8, 7.2)]
+
+
+def test_map_to_original_offsets_compacted_time():
+    offset_map = ts.build_offset_map([(10.0, 20.0), (50.0, 55.0)], gap_sec=0.5)
+    assert ts.map_to_original(0.0, offset_map) == 10.0
+    assert ts.map_to_original(5.0, offset_map) == 15.0
+    # Inside the gap snaps to the end of the first region
+    assert ts.map_to_original(10.2, offset_map) == 20.0
+    assert ts.map_to_original(12.5, offset_map) == 52.0
+
+
+def test_pad_regions_merges_close_speech():
+    regions = ts._pad_regions([(1.0, 2.0), (2.2, 3.0), (10.0, 12.0)], 0.15, total=11.5)
+    assert regions == [(0.85, 3.15), (9.85, 11.5)]
+
+
+def test_map_to_original_accounts_for_tempo():
+    offset_map = ts.build_offset_map([(30.0, 90.0)])
+    # 10 s into audio sped up by 1.5 is 15 s into the compacted audio
+    assert ts.map_to_original(10.0, offset_map, tempo=1.5) == 45.0
+
+
+def test_transcribe_batch_dispatches_short_clips(monkeypatch):
+    import sys
+    import types
+
+    lengths = {"a.wav": 16000, "b.wav": 32000, "long.wav": 16000 * 60, "c.wav": 8000}
+
+    class Stacked(list):
+        def to(self, device):
+            return self
+
+    fake_torch = types.ModuleType("torch")
+    fake_torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    fake_torch.stack = lambda items: Stacked(items)
+
+    fake_whisper = types.ModuleType("whisper")
+    fake_whisper.audio = types.SimpleNamespace(N_SAMPLES=16000 * 30)
+    fake_whisper.load_audio = lambda path: [path] * lengths[path]
+    fake_whisper.pad_or_trim = lambda samples: samples[0]
+    fake_whisper.log_mel_spectrogram = lambda name, n_mels: name
+    fake_whisper.DecodingOptions = lambda **kwargs: kwargs
+    batches = []
+
+    def decode(model, mels, options):
+        batches.append(list(mels))
+        return [types.SimpleNamespace(text=f" text of {name} ") for name in mels]
+
+    fake_whisper.decode = decode
+    model = types.SimpleNamespace(dims=types.SimpleNamespace(n_mels=80), device="cpu")
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    monkeypatch.setitem(sys.modules, "whisper", fake_whisper)
+    monkeypatch.setattr(ts, "_load_local_model", lambda name, options: model)
+
+    texts = ts.transcribe_batch(list(lengths), "base", batch_size=2)
+    assert texts == {p: f"text of {p}" for p in ("a.wav", "b.wav", "c.wav")}
+    assert batches == [["a.wav", "b.wav"], ["c.wav"]]
+
+
+def test_openai_whisper_decodes_in_windows_and_stops_when_cancelled(monkeypatch):
+    import sys
+    import threading
+    import types
+
+    np = pytest.importorskip("numpy")
+    rate = 100
+    samples = np.full(300 * rate, 0.5, dtype=np.float32)
+    samples[110 * rate: 111 * rate] = 0.0  # a pause to cut at
+
+    fake_torch = types.ModuleType("torch")
+    fake_torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    fake_whisper = types.ModuleType("whisper")
+    fake_whisper.audio = types.SimpleNamespace(SAMPLE_RATE=rate)
+    fake_whisper.load_audio = lambda path: samples
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    monkeypatch.setitem(sys.modules, "whisper", fake_whisper)
+    cancel = threading.Event()
+    windows = []
+
+    class Model:
+        def transcribe(self, audio, **kwargs):
+            windows.append(len(audio) / rate)
+            if stop_after and len(windows) == stop_after:
+                cancel.set()
+            return {"segments": [{"start": 0.0, "end": len(audio) / rate, "text": "x"}]}
+
+    monkeypatch.setattr(ts, "_load_local_model", lambda name, options: Model())
+    options = {"backend": "openai-whisper"}
+
+    stop_after = 0
+    segments = ts.transcribe_segments("talk.wav", "base", options)
+    assert len(windows) == 3 and 110 < windows[0] < 111
+    assert [s["start"] for s in segments] == [0.0, windows[0], windows[0] + windows[1]]
+    assert segments[-1]["end"] == pytest.approx(300.0)
+
+    windows.clear()
+    stop_after = 1
+    with pytest.raises(ts.Cancelled):
+        ts.transcribe_segments("talk.wav", "base", options, cancel_event=cancel)
+    assert len(windows) == 1
+
+
+def test_load_local_model_loads_once_under_concurrency(monkeypatch):
+    import threading
+    import time
+
+    calls = []
+
+    def create(name, options):
+        calls.append(name)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(ts, "_LOCAL_MODEL_CACHE", {})
+    monkeypatch.setattr(ts, "_create_local_model", create)
+    options = dict(ts.DEFAULT_LOCAL_OPTIONS)
+    models = []
+    threads = [
+        threading.Thread(target=lambda: models.append(ts._load_local_model("base", options)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["base"]
+    assert len({id(m) for m in models}) == 1
+
+
+def _write_wav(path, seconds, rate=16000):
+    import wave
+
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+
+
+def test_probe_audio_reads_wav_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(ts, "_probe_ffprobe", lambda path, size: None)
+    wav = tmp_path / "memo.wav"
+    _write_wav(wav, 2.5)
+    info = ts.probe_audio(str(wav))
+    assert info.duration_sec == 2.5
+    assert info.sample_rate == 16000
+    assert info.channels == 1
+    assert info.size_bytes == wav.stat().st_size
+
+
+def test_plan_chunks_covers_duration_below_limit():
+    spans = ts._plan_chunks(60 * 1024 * 1024, 3600.0)
+    assert len(spans) == 3
+    assert spans[0] == (0.0, 1200.0)
+    assert spans[-1][1] == 3600.0
+
+
+class _FakeOpenAI:
+    class Timeout:
+        def __init__(self, total, connect, read, write, pool):
+            self.total, self.connect, self.read = total, connect, read
+
+
+class _FakeClient:
+    def __init__(self):
+        self.timeouts = []
+
+    def with_options(self, timeout, max_retries):
+        self.timeouts.append(timeout)
+        return self
+
+
+def test_api_call_retries_with_bounded_timeouts(monkeypatch):
+    import sys
+    import threading
+
+    monkeypatch.setitem(sys.modules, "openai", _FakeOpenAI)
+    monkeypatch.setattr(ts.time, "sleep", lambda s: None)
+    client = _FakeClient()
+    calls = []
+
+    def request(api):
+        calls.append(api)
+        if len(calls) == 1:
+            threading.Event().wait(0.5)  # hangs past the total timeout
+        return "ok"
+
+    timeouts = {"connect": 5.0, "read": 0.1, "total": 0.2, "job": 0.0}
+    assert ts._api_call(client, request, "chunk 1", timeouts) == "ok"
+    assert len(calls) == 2
+    assert client.timeouts[0].read == 0.1 and client.timeouts[0].connect == 0.2
+
+
+def test_api_call_fails_fast_when_deadline_is_spent(monkeypatch):
+    import sys
+
+    monkeypatch.setitem(sys.modules, "openai", _FakeOpenAI)
+
+    def request(api):
+        raise ConnectionError("reset")
+
+    deadline = ts.Deadline.after(0.5)
+    start = ts.time.monotonic()
+    try:
+        ts._api_call(_FakeClient(), request, "summary", ts.DEFAULT_TIMEOUTS, deadline)
+    except ts.DeadlineExceeded as e:
+        assert "summary" in str(e)
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+    # The 1-2 s backoff does not fit the deadline, so it is not even slept
+    assert ts.time.monotonic() - start < 0.5
+    expired = ts.Deadline(ts.time.monotonic() - 1)
+    try:
+        ts.transcribe("x.mp3", "whisper-1", "api", api_key="k", deadline=expired)
+    except ts.DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+
+
+def test_api_call_stops_waiting_when_cancelled(monkeypatch):
+    import sys
+    import threading
+
+    monkeypatch.setitem(sys.modules, "openai", _FakeOpenAI)
+    cancel = threading.Event()
+    calls = []
+
+    def request(api):
+        calls.append(api)
+        cancel.set()
+        threading.Event().wait(2)  # an upload that takes a while
+        return "ok"
+
+    start = ts.time.monotonic()
+    try:
+        ts._api_call(_FakeClient(), request, "chunk 1", ts.DEFAULT_TIMEOUTS, cancel_event=cancel)
+    except ts.Cancelled as e:
+        assert "chunk 1" in str(e)
+    else:
+        raise AssertionError("expected Cancelled")
+    assert ts.time.monotonic() - start < 1 and len(calls) == 1
+    try:
+        ts.transcribe("x.mp3", "whisper-1", "api", api_key="k", cancel_event=cancel)
+    except ts.Cancelled:
+        pass
+    else:
+        raise AssertionError("expected Cancelled")
+
+
+def test_transcript_to_pdf_streams_long_text(tmp_path, monkeypatch):
+    from instrumentation import Trace
+
+    produced = []
+    original = ts._transcript_flowables
+
+    def counting(*args):
+        for flowable in original(*args):
+            produced.append(flowable)
+            yield flowable
+
+    monkeypatch.setattr(ts, "_transcript_flowables", counting)
+    text = "=== a.mp3 ===\n" + "Plain <speech> & more. " * 3000 + "\n=== b.mp3 ===\nEnd."
+    trace = Trace("t")
+    pdf = tmp_path / "t.pdf"
+    ts.transcript_to_pdf(text, str(pdf), "Transcript", trace=trace, max_chars=500)
+
+    assert pdf.read_bytes().startswith(b"%PDF")
+    assert trace.records[0]["pages"] > 10
+    assert len(produced) > 100
+
+
+def test_bounded_lines_cut_at_sentence_ends():
+    lines = list(ts._bounded_lines(["One two. Three four", " five six.\nSeven"], 12))
+    assert lines == ["One two.", "Three four", "five six.", "Seven"]
+    assert all(len(line) <= 12 for line in lines)
+
+
+def test_flowable_stream_buffers_only_lookahead():
+    stream = ts._FlowableStream(iter(range(1000)), lookahead=4)
+    seen = []
+    while len(stream):
+        assert list.__len__(stream) <= 4
+        seen.append(stream[0])
+        del stream[0]
+    assert seen == list(range(1000))
+
+
+def test_summarize_group_reuses_cached_file_summaries(tmp_path):
+    cache = ts.SummaryCache(tmp_path / "cache")
+    calls = []
+
+    def fake_summarize(prompt, text):
+        calls.append("merge" if ts.MERGE_INSTRUCTIONS in prompt else text)
+        return f"summary of {text[:20]}"
+
+    def run(parts):
+        calls.clear()
+        return ts.summarize_group(
+            "Summarize.", parts, "gpt-4o-mini", "", "en", cache=cache, summarize_fn=fake_summarize
+        )
+
+    parts = [("a.mp3", "first file"), ("b.mp3", "second file")]
+    assert run(parts[:1]) == "summary of first file"
+    assert calls == ["first file"]
+
+    run(parts)
+    assert calls == ["second file", "merge"]
+
+    # Adding a file pays for that file and the merge only
+    run(parts + [("c.mp3", "third file")])
+    assert calls == ["third file", "merge"]
+    run(parts)
+    assert calls == []
+
+
+def test_nonsilent_ffmpeg_parses_silencedetect(monkeypatch):
+    stderr = (
+        "[silencedetect @ 0x1] silence_start: 0\n"
+        "[silencedetect @ 0x1] silence_end: 2.5 | silence_duration: 2.5\n"
+        "[silencedetect @ 0x1] silence_start: 10.25\n"
+        "[silencedetect @ 0x1] silence_end: 14 | silence_duration: 3.75\n"
+        "[silencedetect @ 0x1] silence_start: 55.5\n"
+    )
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return ts.subprocess.CompletedProcess(cmd, 0, "", stderr)
+
+    monkeypatch.setattr(ts.subprocess, "run", fake_run)
+    ranges = ts._nonsilent_ffmpeg("a.mp3", 60.0, -40, 1000)
+    assert ranges == [(2.5, 10.25), (14.0, 55.5)]
+    assert "silencedetect=noise=-40dB:d=1.000" in calls[0]
+
+
+def test_abandoned_upload_stops_reading_and_reports_when_done(tmp_path):
+    import threading
+
+    path = tmp_path / "chunk.mp3"
+    path.write_bytes(b"x" * 1000)
+    finished = threading.Event()
+    outcome = []
+
+    def upload():
+        with ts._open_upload(path, None, [0]) as f:
+            while f.read(100):
+                threading.Event().wait(0.1)  # a slow connection
+
+    def on_done(error):
+        outcome.append(error)
+        finished.set()
+
+    try:
+        ts._run_with_timeout(upload, 0.25, "chunk 1", on_done=on_done)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected TimeoutError")
+    assert finished.wait(2)
+    assert isinstance(outcome[0], ts._Abandoned)
@@ -2,34 +2,37 @@ from __future__ import annotations
 
 import argparse
 import configparser
+import io
 import math
 import os
 import platform
 import shutil
+import subprocess
 import sys
 import tempfile
+import threading
 import time
 import random
+import json
+import re
+import wave
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional, TYPE_CHECKING, Any
+from typing import Callable, Iterable, Iterator, Optional, Any, Union
+from xml.sax.saxutils import escape
 from concurrent.futures import ThreadPoolExecutor
-from io import BytesIO
 import logging
 
-if TYPE_CHECKING:
-    import whisper
+import instrumentation
+import markdown_render
+from endpoints import EndpointPool, parse_endpoints
+from instrumentation import AUDIO_SEC, BYTES, ProgressMeter, Trace
+from summary_cache import SummaryCache, cache_key
 
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    ListFlowable,
-    ListItem,
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Preformatted,
-)
+from reportlab.platypus import Paragraph, SimpleDocTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,7 @@ else:
         BASE_DIR = RESOURCE_DIR
 
 TEMP_DIR = BASE_DIR / "temp"
+SUMMARY_CACHE_DIR = BASE_DIR / "summary_cache"
 
 CONFIG_FILE = "config.cfg"
 CONFIG_TEMPLATE = "config.template.cfg"
@@ -103,8 +107,17 @@ DEFAULT_PROMPT = (
     "## sentiment\n\n"
     "positive"
 )
+# Appended to the summary prompt when merging the summaries of a group's files
+MERGE_INSTRUCTIONS = (
+    "The recording was split into several files. Instead of a transcript you get the"
+    " summaries of the individual files below, in recording order, each headed by its"
+    " file name. Combine them into a single summary of the whole recording in the format"
+    " described above, merging duplicate points instead of listing them per file."
+)
 MAX_CHUNK_BYTES = 25 * 1024 * 1024
 MAX_API_WORKERS = 3
+# How often a waiting request checks whether its job was cancelled
+CANCEL_POLL_SEC = 0.2
 
 
 def check_ffmpeg() -> bool:
@@ -112,6 +125,128 @@ def check_ffmpeg() -> bool:
     return shutil.which("ffmpeg") is not None
 
 
+@dataclass(frozen=True)
+class AudioInfo:
+    """Container-level facts about an audio file, obtained without decoding it."""
+
+    duration_sec: float
+    size_bytes: int
+    codec: str = ""
+    sample_rate: int = 0
+    channels: int = 0
+    bit_rate: int = 0
+
+
+def _probe_ffprobe(path: str, size_bytes: int) -> Optional[AudioInfo]:
+    if shutil.which("ffprobe") is None:
+        return None
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "stream=codec_name,sample_rate,channels,duration,bit_rate:format=duration,bit_rate",
+        "-of",
+        "json",
+        path,
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        data = json.loads(proc.stdout or "{}")
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+    streams = data.get("streams") or [{}]
+    stream, fmt = streams[0], data.get("format", {})
+    durations = [d for d in (stream.get("duration"), fmt.get("duration")) if d and d != "N/A"]
+    if proc.returncode != 0 or not durations:
+        return None
+    duration = durations[0]
+    return AudioInfo(
+        duration_sec=float(duration),
+        size_bytes=size_bytes,
+        codec=stream.get("codec_name", ""),
+        sample_rate=int(stream.get("sample_rate") or 0),
+        channels=int(stream.get("channels") or 0),
+        bit_rate=int(next((b for b in (stream.get("bit_rate"), fmt.get("bit_rate")) if b and b != "N/A"), 0)),
+    )
+
+
+def probe_audio(path: str) -> AudioInfo:
+    """Return duration, codec, sample rate and channels of ``path``.
+
+    Uses ffprobe (container headers only) when available and the WAV header for
+    ``.wav`` files otherwise. Only when neither works is the file decoded with
+    pydub, which is what every caller did before.
+    """
+    path = str(path)
+    size_bytes = os.path.getsize(path)
+    info = _probe_ffprobe(path, size_bytes)
+    if info is not None:
+        return info
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as w:
+                rate = w.getframerate()
+                return AudioInfo(
+                    duration_sec=w.getnframes() / rate,
+                    size_bytes=size_bytes,
+                    codec="pcm",
+                    sample_rate=rate,
+                    channels=w.getnchannels(),
+                    bit_rate=rate * w.getnchannels() * w.getsampwidth() * 8,
+                )
+        except (wave.Error, EOFError, ZeroDivisionError):
+            pass
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(path)
+    return AudioInfo(
+        duration_sec=len(audio) / 1000,
+        size_bytes=size_bytes,
+        sample_rate=audio.frame_rate,
+        channels=audio.channels,
+    )
+
+
+def _plan_chunks(
+    size_bytes: int, duration_sec: float, max_bytes: int = MAX_CHUNK_BYTES
+) -> list[tuple[float, float]]:
+    """Split ``duration_sec`` into equal ``(start, end)`` spans that stay below ``max_bytes``."""
+    num_chunks = max(1, math.ceil(size_bytes / max_bytes))
+    length = duration_sec / num_chunks
+    return [
+        (i * length, duration_sec if i == num_chunks - 1 else (i + 1) * length)
+        for i in range(num_chunks)
+    ]
+
+
+def _extract_chunk(audio_path: str, start_sec: float, end_sec: float, out_path: Path) -> None:
+    """Cut ``[start_sec, end_sec)`` out of ``audio_path`` with ffmpeg, without decoding the rest.
+
+    The audio stream is copied, so chunks keep the source bitrate and stay
+    proportional in size; re-encoding is only used if copying fails.
+    """
+    base = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-y",
+        "-ss",
+        f"{start_sec:.3f}",
+        "-t",
+        f"{end_sec - start_sec:.3f}",
+        "-i",
+        audio_path,
+        "-vn",
+    ]
+    proc = subprocess.run(base + ["-c:a", "copy", str(out_path)], capture_output=True)
+    if proc.returncode != 0:
+        subprocess.run(base + [str(out_path)], capture_output=True, check=True)
+
+
 def _load_text(path: Path) -> str:
     with open(path, "r", encoding="utf-8") as f:
         return f.read().strip()
@@ -202,8 +337,23 @@ def setup_logging() -> None:
         # File logging is optional; avoid breaking the app
         pass
 
-def markdown_to_pdf(markdown_text: str, pdf_path: str) -> None:
-    """Convert Markdown text to a PDF file with bookmarks."""
+def markdown_to_pdf(markdown_text: str, pdf_path: str, trace: Optional[Trace] = None) -> None:
+    """Convert Markdown text to a PDF file with bookmarks.
+
+    The build runs on the calling thread; ``pdf_render.PdfRenderService``
+    runs it in a worker process instead.
+    """
+    with instrumentation.span(trace, "pdf_parse", chars=len(markdown_text)):
+        flowables = _markdown_flowables(markdown_text)
+    with instrumentation.span(trace, "pdf_build") as attrs:
+        doc = SimpleDocTemplate(pdf_path, pagesize=LETTER)
+        doc.build(flowables)
+        attrs["pages"] = doc.page
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles() -> dict[str, ParagraphStyle]:
+    """Build the paragraph styles once; they are only read while rendering."""
     styles = getSampleStyleSheet()
     heading1 = ParagraphStyle("Heading1", parent=styles["Heading1"])
     heading1.outlineLevel = 0
@@ -219,79 +369,128 @@ def markdown_to_pdf(markdown_text: str, pdf_path: str) -> None:
         fontSize=9,
         leading=11,
     )
+    return {"h1": heading1, "h2": heading2, "h3": heading3, "body": body, "code": code_style}
 
-    flowables = []
-    list_items = []
-    in_list = False
-    in_code = False
-    code_lines: list[str] = []
-
-    lines = markdown_text.splitlines()
-    for line in lines:
-        line = line.rstrip()
-        if line.startswith("```"):
-            # Toggle code block state
-            if in_code:
-                # Flush collected code block
-                flowables.append(Preformatted("\n".join(code_lines), code_style))
-                code_lines = []
-                in_code = False
-            else:
-                # Starting a new code block
-                if in_list:
-                    flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                    list_items = []
-                    in_list = False
-                in_code = True
-            continue
-        if in_code:
-            code_lines.append(line)
-            continue
-        if not line:
-            if in_list:
-                flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                list_items = []
-                in_list = False
-            flowables.append(Spacer(1, 0.2 * inch))
-            continue
-        if line.startswith("### "):
-            if in_list:
-                flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                list_items = []
-                in_list = False
-            heading = Paragraph(line[4:], heading3)
-            flowables.append(heading)
-        elif line.startswith("## "):
-            if in_list:
-                flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                list_items = []
-                in_list = False
-            heading = Paragraph(line[3:], heading2)
-            flowables.append(heading)
-        elif line.startswith("# "):
-            if in_list:
-                flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                list_items = []
-                in_list = False
-            heading = Paragraph(line[2:], heading1)
-            flowables.append(heading)
-        elif line.startswith("- "):
-            in_list = True
-            list_items.append(ListItem(Paragraph(line[2:], body)))
-        else:
-            if in_list:
-                flowables.append(ListFlowable(list_items, bulletType="bullet"))
-                list_items = []
-                in_list = False
-            flowables.append(Paragraph(line, body))
 
-    if in_list:
-        flowables.append(ListFlowable(list_items, bulletType="bullet"))
-    if in_code:
-        flowables.append(Preformatted("\n".join(code_lines), code_style))
+def _markdown_flowables(markdown_text: str) -> list[Any]:
+    return markdown_render.to_flowables(markdown_text, _pdf_styles())
+
+
+# Target length of one transcript paragraph; long unbroken text is cut at sentence ends
+TRANSCRIPT_PARAGRAPH_CHARS = 1500
+# Flowables generated ahead of the one being laid out (covers keep-with-next runs)
+_FLOWABLE_LOOKAHEAD = 32
+_TRANSCRIPT_BLOCK_CHARS = 64 * 1024
+_FILE_HEADER = re.compile(r"=== (.+) ===")
+
+
+class _FlowableStream(list):
+    """List facade over a flowable generator for ``doc.build``.
+
+    reportlab consumes its flowable list from the front and only looks a few
+    items ahead, so keeping a short buffer filled is enough: memory no longer
+    grows with the length of the document.
+    """
+
+    def __init__(self, flowables: Iterator[Any], lookahead: int = _FLOWABLE_LOOKAHEAD) -> None:
+        super().__init__()
+        self._source: Optional[Iterator[Any]] = flowables
+        self._lookahead = lookahead
+        self._fill()
+
+    def _fill(self) -> None:
+        while self._source is not None and super().__len__() < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self) -> int:
+        self._fill()
+        return super().__len__()
+
+    def __getitem__(self, index: Any) -> Any:
+        self._fill()
+        return super().__getitem__(index)
+
+
+def _cut_text(text: str, max_chars: int) -> tuple[str, str]:
+    """Split ``text`` at the last sentence end (else space) before ``max_chars``."""
+    window = text[:max_chars]
+    cut = max(window.rfind(". "), window.rfind("? "), window.rfind("! "))
+    if cut < max_chars // 2:
+        cut = window.rfind(" ")
+    if cut <= 0:
+        cut = max_chars - 1
+    return text[: cut + 1].strip(), text[cut + 1:].lstrip()
+
+
+def _bounded_lines(blocks: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Yield the lines of the text in ``blocks``, none longer than ``max_chars``."""
+    pending = ""
+    for block in blocks:
+        pending += block
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            while len(line) > max_chars:
+                head, line = _cut_text(line, max_chars)
+                yield head
+            yield line
+        while len(pending) > max_chars:
+            head, pending = _cut_text(pending, max_chars)
+            yield head
+    if pending:
+        yield pending
 
-    doc = SimpleDocTemplate(pdf_path, pagesize=LETTER)
-    doc.build(flowables)
+
+def _transcript_flowables(
+    blocks: Iterable[str], title: Optional[str], max_chars: int
+) -> Iterator[Any]:
+    styles = _pdf_styles()
+    if title:
+        yield Paragraph(escape(title), styles["h1"])
+    paragraph: list[str] = []
+    size = 0
+    for line in _bounded_lines(blocks, max_chars):
+        text = line.strip()
+        # Combined group transcripts separate files with "=== name ===" lines
+        header = _FILE_HEADER.fullmatch(text)
+        if paragraph and (not text or header or size + len(text) > max_chars):
+            yield Paragraph(escape(" ".join(paragraph)), styles["body"])
+            paragraph, size = [], 0
+        if header:
+            yield Paragraph(escape(header.group(1)), styles["h2"])
+        elif text:
+            paragraph.append(text)
+            size += len(text) + 1
+    if paragraph:
+        yield Paragraph(escape(" ".join(paragraph)), styles["body"])
+
+
+def transcript_to_pdf(
+    transcript: Union[str, Iterable[str]],
+    pdf_path: str,
+    title: Optional[str] = None,
+    trace: Optional[Trace] = None,
+    max_chars: int = TRANSCRIPT_PARAGRAPH_CHARS,
+) -> None:
+    """Write a plain-text transcript to a PDF with bounded memory.
+
+    ``transcript`` is the text or any iterable of text pieces, e.g. an open
+    ``.txt`` file. It is split into paragraph-sized flowables that are
+    generated while the document is laid out, so hours of transcript never
+    sit in memory as flowables and render time grows linearly with the text.
+    ``=== name ===`` lines (group transcripts) become bookmarked headings.
+    """
+    if isinstance(transcript, str):
+        text = transcript
+        transcript = (
+            text[i: i + _TRANSCRIPT_BLOCK_CHARS] for i in range(0, len(text), _TRANSCRIPT_BLOCK_CHARS)
+        )
+    with instrumentation.span(trace, "transcript_pdf") as attrs:
+        doc = SimpleDocTemplate(pdf_path, pagesize=LETTER)
+        doc.build(_FlowableStream(_transcript_flowables(transcript, title, max_chars)))
+        attrs["pages"] = doc.page
 
 
 def strip_code_fences(text: str) -> str:
@@ -305,7 +504,915 @@ def strip_code_fences(text: str) -> str:
             lines = lines[:-1]
         return "\n".join(lines).strip()
     return text
-_LOCAL_MODEL_CACHE: dict[str, whisper.Whisper] = {}
+
+
+# Supported engines for method "local"; selected via [whisper_local] backend
+LOCAL_BACKENDS = ("openai-whisper", "faster-whisper")
+DEFAULT_LOCAL_OPTIONS: dict[str, Any] = {
+    "backend": "openai-whisper",
+    "device": "auto",
+    "compute_type": "int8",
+    "beam_size": None,
+    "num_workers": 1,
+    "cpu_threads": 0,
+    "vad": False,
+    "vad_threshold_db": -45.0,
+    "vad_min_silence_ms": 700,
+    "vad_pad_ms": 200,
+    "batch_size": 1,
+}
+_LOCAL_MODEL_CACHE: dict[tuple, Any] = {}
+# Serialises model loading so a background warm-up and a job never load twice
+_LOCAL_MODEL_LOCK = threading.Lock()
+
+
+def get_local_options(config: configparser.ConfigParser) -> dict[str, Any]:
+    """Return local transcription options from the [whisper_local] section.
+
+    Only ``model`` is required in the config; every other key falls back to
+    ``DEFAULT_LOCAL_OPTIONS``. ``beam_size`` stays ``None`` unless configured so
+    each backend keeps its own default decoding strategy.
+    """
+    section = "whisper_local"
+    options = dict(DEFAULT_LOCAL_OPTIONS)
+    if not config.has_section(section):
+        return options
+    options["backend"] = config.get(section, "backend", fallback=options["backend"]).strip().lower()
+    options["device"] = config.get(section, "device", fallback=options["device"]).strip().lower()
+    options["compute_type"] = config.get(section, "compute_type", fallback=options["compute_type"]).strip()
+    beam_size = config.get(section, "beam_size", fallback="").strip()
+    options["beam_size"] = int(beam_size) if beam_size else None
+    options["num_workers"] = config.getint(section, "num_workers", fallback=options["num_workers"])
+    options["cpu_threads"] = config.getint(section, "cpu_threads", fallback=options["cpu_threads"])
+    options["vad"] = config.getboolean(section, "vad", fallback=options["vad"])
+    options["vad_threshold_db"] = config.getfloat(
+        section, "vad_threshold_db", fallback=options["vad_threshold_db"]
+    )
+    options["vad_min_silence_ms"] = config.getint(
+        section, "vad_min_silence_ms", fallback=options["vad_min_silence_ms"]
+    )
+    options["vad_pad_ms"] = config.getint(section, "vad_pad_ms", fallback=options["vad_pad_ms"])
+    options["batch_size"] = config.getint(section, "batch_size", fallback=options["batch_size"])
+    return options
+
+
+def _load_local_model(model_name: str, options: dict[str, Any]) -> Any:
+    """Return a cached local model for the configured backend, loading it once."""
+    backend = options["backend"]
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(
+            f"Unknown local backend '{backend}'. Choose one of: {', '.join(LOCAL_BACKENDS)}."
+        )
+    key = (
+        backend,
+        model_name,
+        options["device"],
+        options["compute_type"],
+        options["num_workers"],
+        options["cpu_threads"],
+    )
+    model = _LOCAL_MODEL_CACHE.get(key)
+    if model is not None:
+        return model
+    with _LOCAL_MODEL_LOCK:
+        model = _LOCAL_MODEL_CACHE.get(key)
+        if model is None:
+            model = _create_local_model(model_name, options)
+            _LOCAL_MODEL_CACHE[key] = model
+    return model
+
+
+def _create_local_model(model_name: str, options: dict[str, Any]) -> Any:
+    backend = options["backend"]
+    if backend == "faster-whisper":
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "The faster-whisper backend requires the 'faster-whisper' package (pip install faster-whisper)."
+            ) from e
+
+        model = WhisperModel(
+            model_name,
+            device=options["device"],
+            compute_type=options["compute_type"],
+            cpu_threads=options["cpu_threads"],
+            num_workers=options["num_workers"],
+        )
+    else:
+        import whisper
+
+        device = None if options["device"] == "auto" else options["device"]
+        model = whisper.load_model(model_name, device=device)
+    return model
+
+
+def warm_local_model(model_name: str, local_options: Optional[dict[str, Any]] = None) -> None:
+    """Load the local model into the cache and run one tiny inference.
+
+    The first inference initialises kernels, thread pools and allocator caches;
+    doing it ahead of time makes the first real job as fast as later ones.
+    """
+    import numpy as np
+
+    options = dict(DEFAULT_LOCAL_OPTIONS)
+    if local_options:
+        options.update(local_options)
+    model = _load_local_model(model_name, options)
+    one_second = np.zeros(16000, dtype=np.float32)
+    if options["backend"] == "faster-whisper":
+        segments, _ = model.transcribe(one_second)
+        list(segments)
+    else:
+        import torch
+
+        model.transcribe(one_second, fp16=torch.cuda.is_available())
+
+
+def start_local_warmup(
+    model_name: str,
+    local_options: Optional[dict[str, Any]] = None,
+    done_cb: Optional[Callable[[Optional[BaseException]], None]] = None,
+) -> threading.Thread:
+    """Run ``warm_local_model`` on a daemon thread.
+
+    ``done_cb`` receives ``None`` on success or the exception that occurred.
+    Failures are only logged; the real job will surface them again.
+    """
+
+    def run() -> None:
+        error: Optional[BaseException] = None
+        start = time.time()
+        try:
+            warm_local_model(model_name, local_options)
+            logger.info(f"Local model {model_name} warmed up in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"Warming up local model {model_name} failed: {e}")
+            error = e
+        if done_cb:
+            done_cb(error)
+
+    thread = threading.Thread(target=run, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _frames_to_regions(
+    flags: list[bool],
+    frame_sec: float,
+    min_silence_sec: float,
+    pad_sec: float,
+    min_speech_sec: float = 0.25,
+) -> list[tuple[float, float]]:
+    """Turn per-frame speech flags into padded ``(start, end)`` regions in seconds.
+
+    Gaps shorter than ``min_silence_sec`` are bridged, bursts shorter than
+    ``min_speech_sec`` (clicks, bumps) are dropped, and overlapping padded
+    regions are merged.
+    """
+    total_sec = len(flags) * frame_sec
+    raw: list[tuple[float, float]] = []
+    start: Optional[float] = None
+    last_end = 0.0
+    for i, speech in enumerate(flags):
+        t = i * frame_sec
+        if speech:
+            if start is None:
+                start = t
+            last_end = t + frame_sec
+        elif start is not None and t - last_end >= min_silence_sec:
+            raw.append((start, last_end))
+            start = None
+    if start is not None:
+        raw.append((start, last_end))
+
+    regions: list[tuple[float, float]] = []
+    for s, e in raw:
+        if e - s < min_speech_sec:
+            continue
+        s = max(0.0, s - pad_sec)
+        e = min(total_sec, e + pad_sec)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(e, regions[-1][1]))
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def detect_speech_regions(
+    samples: Any,
+    sample_rate: int,
+    threshold_db: float = -45.0,
+    min_silence_ms: int = 700,
+    pad_ms: int = 200,
+) -> list[tuple[float, float]]:
+    """Return speech regions of a mono float waveform using a frame energy gate.
+
+    ``samples`` is a NumPy array in [-1, 1] (as returned by ``whisper.load_audio``).
+    Frames of 30 ms louder than ``threshold_db`` dBFS count as speech.
+    """
+    import numpy as np
+
+    frame = int(sample_rate * 0.03)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+    frames = np.asarray(samples[: n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    flags = (db > threshold_db).tolist()
+    return _frames_to_regions(flags, frame / sample_rate, min_silence_ms / 1000, pad_ms / 1000)
+
+
+def build_offset_map(
+    regions: list[tuple[float, float]], gap_sec: float = 0.0
+) -> list[tuple[float, float, float]]:
+    """Describe how ``regions`` are laid out when concatenated with ``gap_sec`` between them.
+
+    Each entry is ``(compact_start, original_start, duration)`` in seconds.
+    """
+    offset_map: list[tuple[float, float, float]] = []
+    cursor = 0.0
+    for start, end in regions:
+        offset_map.append((cursor, start, end - start))
+        cursor += (end - start) + gap_sec
+    return offset_map
+
+
+def map_to_original(
+    t: float, offset_map: list[tuple[float, float, float]], tempo: float = 1.0
+) -> float:
+    """Map a timestamp in compacted audio back to the original timeline.
+
+    ``tempo`` is the speed-up applied after compaction, if any.
+    """
+    t = t * tempo
+    if not offset_map:
+        return t
+    for compact_start, original_start, duration in reversed(offset_map):
+        if t >= compact_start:
+            # Times inside an inserted gap snap to the end of the preceding region
+            return original_start + min(t - compact_start, duration)
+    return offset_map[0][1]
+
+
+# openai-whisper decodes this much audio per call, see _decode_windows()
+DECODE_WINDOW_SEC = 120.0
+
+
+def _decode_windows(
+    samples: Any, sample_rate: int, window_sec: float = DECODE_WINDOW_SEC
+) -> list[tuple[int, int]]:
+    """Split a waveform into ``(first, last)`` sample ranges of about ``window_sec``.
+
+    Each cut is placed at the quietest 100 ms of the last fifth of a window,
+    so words are rarely split between two decoding calls.
+    """
+    import numpy as np
+
+    size = int(window_sec * sample_rate)
+    frame = max(1, sample_rate // 10)
+    windows = []
+    first = 0
+    while len(samples) - first > size:
+        search = first + size - size // 5
+        count = max(1, (first + size - search) // frame)
+        frames = np.asarray(samples[search: search + count * frame], dtype=np.float32)
+        energy = np.mean(frames.reshape(count, frame) ** 2, axis=1)
+        cut = search + int(np.argmin(energy)) * frame + frame // 2
+        windows.append((first, cut))
+        first = cut
+    if len(samples) > first:
+        windows.append((first, len(samples)))
+    return windows
+
+
+def transcribe_segments(
+    audio_path: str,
+    model_name: str,
+    local_options: Optional[dict[str, Any]] = None,
+    progress_cb: Optional[Callable[[str], None]] = None,
+    trace: Optional[Trace] = None,
+    cancel_event: Optional[threading.Event] = None,
+    meter: Optional[ProgressMeter] = None,
+) -> list[dict[str, Any]]:
+    """Transcribe ``audio_path`` locally and return ``{"start", "end", "text"}`` segments.
+
+    Timestamps always refer to the original file, also when the voice-activity
+    pre-pass (``vad`` option) removed silence before decoding. ``cancel_event``
+    is checked between decoded segments with faster-whisper and between
+    windows of ``DECODE_WINDOW_SEC`` with openai-whisper, which ``meter``
+    advances by in transcribed audio seconds.
+    """
+    options = dict(DEFAULT_LOCAL_OPTIONS)
+    if local_options:
+        options.update(local_options)
+
+    if progress_cb:
+        progress_cb("Transcribing locally...")
+    with instrumentation.span(trace, "model_load", model=model_name, backend=options["backend"]):
+        model = _load_local_model(model_name, options)
+    _check_cancelled(cancel_event, "local decoding")
+
+    segments: list[dict[str, Any]] = []
+    if options["backend"] == "faster-whisper":
+        kwargs: dict[str, Any] = {}
+        if options["beam_size"]:
+            kwargs["beam_size"] = options["beam_size"]
+        if options["vad"]:
+            # faster-whisper ships Silero VAD and maps timestamps back itself
+            kwargs["vad_filter"] = True
+            kwargs["vad_parameters"] = {
+                "min_silence_duration_ms": options["vad_min_silence_ms"],
+                "speech_pad_ms": options["vad_pad_ms"],
+            }
+        fw_segments, info = model.transcribe(audio_path, **kwargs)
+        duration = getattr(info, "duration", 0) or 0
+        instrumentation.expect(meter, AUDIO_SEC, duration)
+        next_report = 0.1
+        # Segments are decoded lazily; report progress in 10% steps
+        for segment in fw_segments:
+            # Leaving the generator stops decoding
+            _check_cancelled(cancel_event, "the next segment")
+            prev_end = segments[-1]["end"] if segments else 0.0
+            segments.append({"start": segment.start, "end": segment.end, "text": segment.text})
+            instrumentation.advance(meter, AUDIO_SEC, segment.end - prev_end)
+            if progress_cb and duration and segment.end / duration >= next_report:
+                progress_cb(f"Transcribed {segment.end:.0f}s of {duration:.0f}s locally")
+                next_report = math.floor(segment.end / duration * 10 + 1) / 10
+    else:
+        import torch
+        import whisper
+
+        kwargs = {"fp16": torch.cuda.is_available()}
+        if options["beam_size"]:
+            kwargs["beam_size"] = options["beam_size"]
+        sample_rate = whisper.audio.SAMPLE_RATE
+        samples = whisper.load_audio(audio_path)
+        total_sec = len(samples) / sample_rate
+        offset_map: list[tuple[float, float, float]] = []
+        if options["vad"]:
+            import numpy as np
+
+            regions = detect_speech_regions(
+                samples,
+                sample_rate,
+                threshold_db=options["vad_threshold_db"],
+                min_silence_ms=options["vad_min_silence_ms"],
+                pad_ms=options["vad_pad_ms"],
+            )
+            speech_sec = sum(e - s for s, e in regions)
+            msg = f"Voice activity: {speech_sec:.0f}s of {total_sec:.0f}s contain speech"
+            logger.info(msg)
+            if progress_cb:
+                progress_cb(msg)
+            if not regions:
+                samples = samples[:0]
+            elif speech_sec < 0.95 * total_sec:
+                # Pack speech into one buffer so Whisper's 30 s windows are not
+                # spent on silence; a short gap keeps sentence boundaries apart.
+                gap = np.zeros(int(0.2 * sample_rate), dtype=samples.dtype)
+                pieces = []
+                for s, e in regions:
+                    pieces.append(samples[int(s * sample_rate): int(e * sample_rate)])
+                    pieces.append(gap)
+                samples = np.concatenate(pieces[:-1])
+                offset_map = build_offset_map(regions, gap_sec=len(gap) / sample_rate)
+        instrumentation.expect(meter, AUDIO_SEC, total_sec)
+        done_sec = 0.0
+        windows = _decode_windows(samples, sample_rate)
+        # model.transcribe cannot be interrupted; separate calls let Cancel
+        # take effect between windows
+        for first, last in windows:
+            _check_cancelled(cancel_event, "the next window")
+            result = model.transcribe(samples[first:last], **kwargs)
+            shift = first / sample_rate
+            for seg in result.get("segments", []):
+                segments.append(
+                    {
+                        "start": map_to_original(seg["start"] + shift, offset_map),
+                        "end": map_to_original(seg["end"] + shift, offset_map),
+                        "text": seg["text"],
+                    }
+                )
+            reached = map_to_original(last / sample_rate, offset_map)
+            instrumentation.advance(meter, AUDIO_SEC, reached - done_sec)
+            done_sec = reached
+            if progress_cb and len(windows) > 1:
+                progress_cb(f"Transcribed {reached:.0f}s of {total_sec:.0f}s locally")
+        instrumentation.advance(meter, AUDIO_SEC, total_sec - done_sec)
+
+    if progress_cb:
+        progress_cb("Finished local transcription")
+    return segments
+
+
+# Length of one Whisper window; shorter clips can be decoded in batches
+BATCH_CLIP_SEC = 30.0
+
+
+def transcribe_batch(
+    audio_paths: list[str],
+    model_name: str,
+    local_options: Optional[dict[str, Any]] = None,
+    batch_size: int = 8,
+    progress_cb: Optional[Callable[[str], None]] = None,
+) -> dict[str, str]:
+    """Transcribe many short clips locally, decoding several at once.
+
+    Clips that fit into one 30-second Whisper window are padded, stacked and run
+    through the encoder and decoder as a single batch, which amortises per-call
+    overhead and keeps matrix multiplies busy on CPUs. Returns ``{path: text}``
+    for every clip handled this way; longer files (and every file with the
+    faster-whisper backend, which has no cross-file batching) are left out so
+    callers can fall back to ``transcribe``. Every path is decoded in full, so
+    callers should pass only clips probed to be at most ``BATCH_CLIP_SEC`` long.
+    """
+    options = dict(DEFAULT_LOCAL_OPTIONS)
+    if local_options:
+        options.update(local_options)
+    results: dict[str, str] = {}
+    if options["backend"] != "openai-whisper" or batch_size < 2 or not audio_paths:
+        return results
+
+    import torch
+    import whisper
+
+    model = _load_local_model(model_name, options)
+    n_mels = getattr(model.dims, "n_mels", 80)
+    decode_kwargs: dict[str, Any] = {"fp16": torch.cuda.is_available(), "without_timestamps": True}
+    if options["beam_size"]:
+        decode_kwargs["beam_size"] = options["beam_size"]
+    decode_options = whisper.DecodingOptions(**decode_kwargs)
+
+    pending: list[tuple[str, Any]] = []
+    batches_done = 0
+
+    def flush() -> None:
+        nonlocal batches_done
+        mels = torch.stack(
+            [whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), n_mels) for _, samples in pending]
+        ).to(model.device)
+        decoded = whisper.decode(model, mels, decode_options)
+        for (path, _), result in zip(pending, decoded):
+            results[path] = result.text.strip()
+        batches_done += 1
+        msg = f"Decoded batch {batches_done} ({len(pending)} clips, {len(results)} total)"
+        logger.info(msg)
+        if progress_cb:
+            progress_cb(msg)
+        pending.clear()
+
+    # Load lazily so at most one batch of waveforms is held in memory
+    for path in audio_paths:
+        samples = whisper.load_audio(path)
+        if len(samples) > whisper.audio.N_SAMPLES:
+            continue
+        pending.append((path, samples))
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    return results
+
+
+def _transcribe_local(
+    audio_path: str,
+    model_name: str,
+    local_options: Optional[dict[str, Any]] = None,
+    progress_cb: Optional[Callable[[str], None]] = None,
+    trace: Optional[Trace] = None,
+    cancel_event: Optional[threading.Event] = None,
+    meter: Optional[ProgressMeter] = None,
+) -> str:
+    """Transcribe ``audio_path`` on this machine with the configured backend."""
+    with instrumentation.span(trace, "local_transcribe", model=model_name):
+        segments = transcribe_segments(
+            audio_path, model_name, local_options, progress_cb, trace, cancel_event, meter
+        )
+    return "".join(seg["text"] for seg in segments).strip()
+
+
+DEFAULT_API_OPTIONS: dict[str, Any] = {
+    "compact": False,
+    "silence_thresh_db": -40.0,
+    "min_silence_ms": 1000,
+    "keep_silence_ms": 300,
+    "tempo": 1.0,
+}
+# atempo above this noticeably hurts recognition; keep the speed-up modest
+MAX_UPLOAD_TEMPO = 1.5
+
+
+def get_api_options(config: configparser.ConfigParser) -> dict[str, Any]:
+    """Return pre-upload options from the [whisper_api] section."""
+    section = "whisper_api"
+    options = dict(DEFAULT_API_OPTIONS)
+    if not config.has_section(section):
+        return options
+    options["compact"] = config.getboolean(section, "compact_audio", fallback=options["compact"])
+    options["silence_thresh_db"] = config.getfloat(
+        section, "silence_thresh_db", fallback=options["silence_thresh_db"]
+    )
+    options["min_silence_ms"] = config.getint(section, "min_silence_ms", fallback=options["min_silence_ms"])
+    options["keep_silence_ms"] = config.getint(section, "keep_silence_ms", fallback=options["keep_silence_ms"])
+    options["tempo"] = config.getfloat(section, "tempo", fallback=options["tempo"])
+    return options
+
+
+def _pad_regions(
+    regions: list[tuple[float, float]], pad: float, total: float
+) -> list[tuple[float, float]]:
+    """Extend each region by ``pad`` on both sides, clamped to ``[0, total]``, merging overlaps."""
+    padded: list[tuple[float, float]] = []
+    for start, end in regions:
+        start = max(0.0, start - pad)
+        end = min(total, end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], max(end, padded[-1][1]))
+        else:
+            padded.append((start, end))
+    return padded
+
+
+_SILENCE_EDGE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+
+def _nonsilent_ffmpeg(
+    audio_path: str, total_sec: float, thresh_db: float, min_silence_ms: int
+) -> list[tuple[float, float]]:
+    """Return the non-silent ``(start, end)`` ranges of ``audio_path`` via ffmpeg's silencedetect.
+
+    ffmpeg decodes the file as a stream, so memory stays flat however long
+    the recording is.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-i",
+        audio_path,
+        "-vn",
+        "-af",
+        f"silencedetect=noise={thresh_db}dB:d={min_silence_ms / 1000:.3f}",
+        "-f",
+        "null",
+        "-",
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, errors="replace", check=True)
+    ranges: list[tuple[float, float]] = []
+    cursor = 0.0
+    for kind, value in _SILENCE_EDGE.findall(proc.stderr):
+        t = min(max(float(value), 0.0), total_sec)
+        if kind == "start":
+            if t > cursor:
+                ranges.append((cursor, t))
+            # Silence running to the end of the file has no silence_end
+            cursor = total_sec
+        else:
+            cursor = t
+    if cursor < total_sec:
+        ranges.append((cursor, total_sec))
+    return ranges
+
+
+def _export_regions_ffmpeg(
+    audio_path: str, regions: list[tuple[float, float]], tempo: float, out_path: Path
+) -> None:
+    """Write ``regions`` of ``audio_path`` back to back (sped up by ``tempo``) to ``out_path``."""
+    keep = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in regions)
+    graph = f"aselect='{keep}',asetpts=N/SR/TB"
+    if tempo != 1.0:
+        graph += f",atempo={tempo:.3f}"
+    # Long recordings have many pauses; a script file avoids command line limits
+    script = out_path.with_suffix(".filter")
+    script.write_text(graph, encoding="utf-8")
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        audio_path,
+        "-vn",
+        "-filter_script:a",
+        str(script),
+        str(out_path),
+    ]
+    subprocess.run(cmd, capture_output=True, check=True)
+
+
+def compact_audio_for_upload(
+    audio_path: str,
+    out_dir: Path,
+    api_options: Optional[dict[str, Any]] = None,
+    progress_cb: Optional[Callable[[str], None]] = None,
+) -> tuple[str, list[tuple[float, float, float]], float]:
+    """Trim silence (and optionally speed up) ``audio_path`` before API upload.
+
+    Leading and trailing silence is dropped and internal pauses longer than
+    ``min_silence_ms`` shrink to about ``keep_silence_ms``. Returns the path to
+    upload, the offset map and the tempo factor so timestamps can be mapped back
+    with ``map_to_original``. The original path is returned unchanged when
+    compaction would not save anything worthwhile.
+
+    With ffmpeg the audio is streamed twice (detection, then export) and never
+    held in memory; without it pydub decodes the whole recording.
+    """
+    options = dict(DEFAULT_API_OPTIONS)
+    if api_options:
+        options.update(api_options)
+    tempo = min(max(float(options["tempo"]), 1.0), MAX_UPLOAD_TEMPO)
+
+    audio = None
+    if check_ffmpeg():
+        total_sec = probe_audio(audio_path).duration_sec
+        ranges = _nonsilent_ffmpeg(
+            audio_path, total_sec, options["silence_thresh_db"], options["min_silence_ms"]
+        )
+    else:
+        from pydub import AudioSegment
+        from pydub.silence import detect_nonsilent
+
+        audio = AudioSegment.from_file(audio_path)
+        total_sec = len(audio) / 1000
+        ranges = [
+            (s / 1000, e / 1000)
+            for s, e in detect_nonsilent(
+                audio,
+                min_silence_len=options["min_silence_ms"],
+                silence_thresh=options["silence_thresh_db"],
+                seek_step=10,
+            )
+        ]
+    regions = _pad_regions(ranges, options["keep_silence_ms"] / 2000, total_sec)
+    kept_sec = sum(e - s for s, e in regions)
+    if not regions or (kept_sec > 0.95 * total_sec and tempo == 1.0):
+        return audio_path, [], 1.0
+
+    audio_format = Path(audio_path).suffix.lstrip(".").lower()
+    out_path = out_dir / f"compact.{audio_format}"
+    if audio is None:
+        _export_regions_ffmpeg(audio_path, regions, tempo, out_path)
+    else:
+        from pydub import AudioSegment
+
+        compacted = AudioSegment.empty()
+        for start, end in regions:
+            compacted += audio[int(start * 1000): int(end * 1000)]
+        export_format = {"m4a": "mp4", "aac": "adts"}.get(audio_format, audio_format)
+        parameters = ["-filter:a", f"atempo={tempo:.3f}"] if tempo != 1.0 else None
+        compacted.export(str(out_path), format=export_format, parameters=parameters)
+
+    msg = (
+        f"Compacted audio for upload: {total_sec / 60:.1f} min -> "
+        f"{kept_sec / tempo / 60:.1f} min"
+    )
+    logger.info(msg)
+    if progress_cb:
+        progress_cb(msg)
+    return str(out_path), build_offset_map(regions), tempo
+
+
+DEFAULT_TIMEOUTS: dict[str, float] = {
+    "connect": 10.0,
+    "read": 300.0,
+    "total": 900.0,
+    # Whole job (all chunks, retries and the summary); 0 disables the deadline
+    "job": 0.0,
+}
+API_RETRIES = 3
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a job runs out of its time budget."""
+
+
+class Cancelled(Exception):
+    """Raised when a job is stopped through its ``cancel_event``."""
+
+
+def _check_cancelled(cancel_event: Optional[threading.Event], what: str) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise Cancelled(f"Job cancelled before {what}")
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point in time (``time.monotonic``) by which a job must be finished."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> Optional[Deadline]:
+        """Return a deadline ``seconds`` from now, or None if ``seconds`` is not positive."""
+        return cls(time.monotonic() + seconds) if seconds and seconds > 0 else None
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self, what: str) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(f"Job deadline exceeded before {what}")
+
+
+def get_timeouts(config: configparser.ConfigParser) -> dict[str, float]:
+    """Return request timeouts and the job deadline (seconds) from the [openai] section."""
+    timeouts = dict(DEFAULT_TIMEOUTS)
+    for key in timeouts:
+        timeouts[key] = config.getfloat("openai", f"{key}_timeout", fallback=timeouts[key])
+    return timeouts
+
+
+class _Abandoned(Exception):
+    """Raised inside a request whose caller has stopped waiting for it."""
+
+
+# Per request thread: the event set once ``_run_with_timeout`` gives up on it
+_request_state = threading.local()
+
+
+def _run_with_timeout(
+    fn: Callable[[], Any],
+    seconds: float,
+    what: str,
+    cancel_event: Optional[threading.Event] = None,
+    on_done: Optional[Callable[[Optional[BaseException]], None]] = None,
+) -> Any:
+    """Run ``fn`` but give up waiting after ``seconds`` or once ``cancel_event`` is set.
+
+    The HTTP client has no overall limit per request, only per connect,
+    read and write. An upload that trickles along is therefore given up on
+    here and the caller's worker is freed at once. Uploads opened with
+    ``_open_upload`` then fail at their next read, so the abandoned request
+    stops sending and closes its file; other requests end at their own read
+    timeout. ``on_done(error)`` is called from the request thread when ``fn``
+    has really finished, also after the caller gave up.
+    """
+    outcome: dict[str, Any] = {}
+    done = threading.Event()
+    abandon = threading.Event()
+
+    def run() -> None:
+        _request_state.abandon = abandon
+        try:
+            outcome["value"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+        if on_done is not None:
+            on_done(outcome.get("error"))
+        done.set()
+
+    threading.Thread(target=run, name=f"api-{what}", daemon=True).start()
+    if cancel_event is None:
+        finished = done.wait(seconds)
+    else:
+        give_up = time.monotonic() + seconds
+        while True:
+            finished = done.wait(min(CANCEL_POLL_SEC, max(0.0, give_up - time.monotonic())))
+            if finished or time.monotonic() >= give_up:
+                break
+            if cancel_event.is_set():
+                abandon.set()
+                raise Cancelled(f"Job cancelled during {what}")
+    if not finished:
+        abandon.set()
+        raise TimeoutError(f"{what} did not finish within {seconds:.0f}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def _release_when_done(
+    pool: EndpointPool, endpoint: Any, cancel_event: Optional[threading.Event]
+) -> Callable[[Optional[BaseException]], None]:
+    """Return an ``on_done`` callback that releases ``endpoint`` once its request really ends.
+
+    A request given up on is still in flight, so its endpoint keeps counting
+    it as outstanding until then and least-outstanding routing avoids it.
+    """
+
+    def on_done(error: Optional[BaseException]) -> None:
+        if isinstance(error, _Abandoned) and cancel_event is not None and cancel_event.is_set():
+            # Stopped by the user, not the endpoint's fault
+            error = None
+        pool.release(endpoint, error)
+
+    return on_done
+
+
+def _api_call(
+    client: Any,
+    request: Callable[[Any], Any],
+    what: str,
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[Deadline] = None,
+    retries: int = API_RETRIES,
+    trace: Optional[Trace] = None,
+    stage: str = "upload",
+    cancel_event: Optional[threading.Event] = None,
+) -> Any:
+    """Call ``request(client)`` with per-attempt timeouts and jittered retries.
+
+    Every attempt gets at most ``total`` seconds, or whatever is left of
+    ``deadline``. Once the deadline cannot cover another attempt,
+    ``DeadlineExceeded`` is raised instead of retrying. Each attempt is
+    recorded as a ``stage`` span on ``trace`` and each retry as an event.
+    ``client`` may be an ``EndpointPool``: every attempt then goes to the
+    least busy healthy endpoint, and a retry after a failure is sent straight
+    to another endpoint without backing off. Setting ``cancel_event`` raises
+    ``Cancelled`` at once, abandoning the request in flight.
+    """
+    # Re-exported by the SDK, whichever HTTP library it is built on
+    from openai import Timeout
+
+    timeouts = timeouts or DEFAULT_TIMEOUTS
+    pool = client if isinstance(client, EndpointPool) else None
+    if pool is not None:
+        # Give every endpoint a chance before giving up
+        retries += len(pool) - 1
+    for attempt in range(retries):
+        _check_cancelled(cancel_event, what)
+        budget = timeouts["total"]
+        if deadline is not None:
+            deadline.check(what)
+            budget = min(budget, deadline.remaining())
+        endpoint = pool.acquire() if pool is not None else None
+        on_done = _release_when_done(pool, endpoint, cancel_event) if endpoint else None
+        api = _get_openai_client(endpoint.api_key, endpoint.base_url) if endpoint else client
+        scoped = api.with_options(
+            timeout=Timeout(
+                budget,
+                connect=min(timeouts["connect"], budget),
+                read=min(timeouts["read"], budget),
+                write=min(timeouts["read"], budget),
+                pool=min(timeouts["connect"], budget),
+            ),
+            # Retries are handled here so they share the deadline
+            max_retries=0,
+        )
+        try:
+            with instrumentation.span(trace, stage, what=what, attempt=attempt + 1) as attrs:
+                if endpoint is not None:
+                    attrs["endpoint"] = endpoint.name
+                result = _run_with_timeout(
+                    lambda: request(scoped), budget, what, cancel_event, on_done
+                )
+        except Cancelled:
+            # The endpoint is released by on_done when the request ends
+            raise
+        except Exception as e:
+            if deadline is not None and deadline.remaining() <= 0:
+                raise DeadlineExceeded(f"Job deadline exceeded during {what}") from e
+            if attempt == retries - 1:
+                raise
+            if pool is not None and pool.available():
+                logger.warning(f"{what} failed on {endpoint.name} ({e}); trying another endpoint")
+                instrumentation.event(trace, "failover", what=what, endpoint=endpoint.name)
+                continue
+            # Exponential backoff with jitter
+            sleep_for = random.uniform(1.0 * (2**attempt), 2.0 * (2**attempt))
+            if deadline is not None and deadline.remaining() <= sleep_for:
+                raise DeadlineExceeded(f"Job deadline exceeded while retrying {what}") from e
+            logger.warning(f"{what} failed ({e}); retrying in {sleep_for:.1f}s")
+            instrumentation.event(trace, "retry", what=what, error=type(e).__name__)
+            if cancel_event is None:
+                time.sleep(sleep_for)
+            elif cancel_event.wait(sleep_for):
+                raise Cancelled(f"Job cancelled while retrying {what}") from e
+        else:
+            return result
+
+
+class _UploadFile(io.FileIO):
+    """Audio file opened for upload that reports the bytes the HTTP client reads.
+
+    ``sent`` is shared by all attempts of one upload, so a retry that reads
+    the file again is not counted twice. Reading fails once the caller of
+    ``_run_with_timeout`` has given up, which aborts the upload.
+    """
+
+    def __init__(self, path: Union[str, Path], meter: Optional[ProgressMeter], sent: list[int]) -> None:
+        super().__init__(path, "rb")
+        self._meter = meter
+        self._sent = sent
+        self._abandon = getattr(_request_state, "abandon", None)
+
+    def read(self, size: int = -1) -> bytes:
+        if self._abandon is not None and self._abandon.is_set():
+            raise _Abandoned(f"Upload of {self.name} abandoned")
+        data = super().read(size)
+        position = self.tell()
+        if position > self._sent[0]:
+            instrumentation.advance(self._meter, BYTES, position - self._sent[0])
+            self._sent[0] = position
+        return data
+
+
+def _open_upload(path: Union[str, Path], meter: Optional[ProgressMeter], sent: list[int]) -> Any:
+    """Open ``path`` for upload inside an ``_api_call`` request."""
+    return _UploadFile(path, meter, sent)
 
 
 def transcribe(
@@ -314,113 +1421,245 @@ def transcribe(
     method: str,
     api_key: Optional[str] = None,
     progress_cb: Optional[Callable[[str], None]] = None,
+    local_options: Optional[dict[str, Any]] = None,
+    api_options: Optional[dict[str, Any]] = None,
+    audio_info: Optional[AudioInfo] = None,
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[Deadline] = None,
+    trace: Optional[Trace] = None,
+    endpoints: Optional[EndpointPool] = None,
+    cancel_event: Optional[threading.Event] = None,
+    meter: Optional[ProgressMeter] = None,
 ) -> str:
     """Transcribe an audio file either locally or via the OpenAI API.
 
     If the audio file is larger than 25 MB and the API is used it is split into
-    multiple segments using pydub before transcription. Language is detected
-    automatically by the API.
+    multiple segments before transcription. Segments are cut with ffmpeg based on
+    ``audio_info`` (probed when not supplied), so the file is never decoded as a
+    whole; pydub is only used when ffmpeg is unavailable. Language is detected
+    automatically by the API. ``local_options`` (see ``get_local_options``)
+    selects the engine used when ``method`` is ``"local"``; ``api_options``
+    (see ``get_api_options``) enables silence compaction before upload.
+    ``timeouts`` (see ``get_timeouts``) bounds every API request, and all
+    chunks and retries together must finish before ``deadline``; a deadline
+    is only checked before local decoding starts, which cannot be interrupted.
+    Probing, compaction, chunk export and every upload attempt are recorded on
+    ``trace`` when given. With ``endpoints`` (see ``get_endpoint_pool``) the
+    uploads are spread over several API endpoints instead of ``api_key``'s
+    default one, with proportionally more chunks in flight. Setting
+    ``cancel_event`` raises ``Cancelled``: chunks that have not been sent are
+    skipped, requests in flight are abandoned, local decoding stops at the
+    next segment (faster-whisper) or before it starts (openai-whisper), and
+    scratch files are removed. ``meter`` is told the bytes to upload and the
+    audio seconds to transcribe, and is advanced as they are done.
     """
+    _check_cancelled(cancel_event, "transcription")
+    if deadline is not None:
+        deadline.check("transcription")
 
     if method == "api":
         # Treat empty string as missing to avoid obscure JSON errors from the client
-        if not api_key:
+        if not api_key and endpoints is None:
             raise ValueError("OpenAI API key missing. Set it in Settings or via OPENAI_API_KEY.")
-        from openai import OpenAI
-        from pydub import AudioSegment
-
         TEMP_DIR.mkdir(exist_ok=True)
-        client = OpenAI(api_key=api_key)
-
-        def _retry_call(callable_fn: Callable[[], str], retries: int = 3) -> str:
-            for attempt in range(retries):
-                try:
-                    return callable_fn()
-                except Exception:
-                    if attempt == retries - 1:
-                        raise
-                    # Exponential backoff with jitter
-                    sleep_for = random.uniform(1.0 * (2**attempt), 2.0 * (2**attempt))
-                    time.sleep(sleep_for)
+        # Per-call scratch directory so concurrent jobs never remove each other's files
+        work_dir = Path(tempfile.mkdtemp(dir=TEMP_DIR))
+        client = endpoints if endpoints is not None else _get_openai_client(api_key)
+        original_path = audio_path
+        total_sec = 0.0
+        if meter is not None:
+            try:
+                total_sec = (audio_info or probe_audio(audio_path)).duration_sec
+            except Exception as e:
+                logger.warning(f"Could not read the duration of {audio_path}: {e}")
+            instrumentation.expect(meter, AUDIO_SEC, total_sec)
         try:
+            if api_options and api_options.get("compact"):
+                with instrumentation.span(trace, "compact") as attrs:
+                    audio_path, offset_map, tempo = compact_audio_for_upload(
+                        audio_path, work_dir, api_options, progress_cb
+                    )
+                    # The API returns plain text without timestamps, so the map
+                    # is kept on the trace for whoever aligns the transcript later
+                    attrs.update(offset_map=offset_map, tempo=tempo)
             if os.path.getsize(audio_path) <= MAX_CHUNK_BYTES:
                 msg = "Transcribing whole file via API..."
                 logger.info(msg)
                 if progress_cb:
                     progress_cb(msg)
-                with open(audio_path, "rb") as f:
-                    def _call():
-                        return client.audio.transcriptions.create(model=model_name, file=f)
+                instrumentation.expect(meter, BYTES, os.path.getsize(audio_path))
+                sent = [0]
+
+                def _call(api: Any) -> Any:
+                    # Reopen on every attempt so retries upload the full file again
+                    with _open_upload(audio_path, meter, sent) as f:
+                        return api.audio.transcriptions.create(model=model_name, file=f)
 
-                    result = _retry_call(_call)
+                result = _api_call(
+                    client, _call, "upload", timeouts, deadline, trace=trace, cancel_event=cancel_event
+                )
+                instrumentation.advance(meter, AUDIO_SEC, total_sec)
                 if progress_cb:
                     progress_cb("Finished whole file")
                 return result.text.strip()
 
             audio_format = Path(audio_path).suffix.lstrip(".").lower()
-            export_format = {"m4a": "mp4", "aac": "adts"}.get(audio_format, audio_format)
+            if audio_path != original_path or audio_info is None:
+                with instrumentation.span(trace, "probe"):
+                    audio_info = probe_audio(audio_path)
+            spans = _plan_chunks(audio_info.size_bytes, audio_info.duration_sec)
+            num_chunks = len(spans)
+            # Chunks add up to about the size of the file they are cut from
+            instrumentation.expect(meter, BYTES, audio_info.size_bytes)
+            # Compaction shortens the upload; credit original seconds in proportion
+            sec_scale = total_sec / audio_info.duration_sec if audio_info.duration_sec else 0.0
+            use_ffmpeg = check_ffmpeg()
+            if not use_ffmpeg:
+                from pydub import AudioSegment
 
-            audio = AudioSegment.from_file(audio_path)
-            num_chunks = math.ceil(os.path.getsize(audio_path) / MAX_CHUNK_BYTES)
-            chunk_length_ms = len(audio) // num_chunks
+                export_format = {"m4a": "mp4", "aac": "adts"}.get(audio_format, audio_format)
+                with instrumentation.span(trace, "decode"):
+                    audio = AudioSegment.from_file(audio_path)
             header_msg = f"Transcribing audio in {num_chunks} chunks via API..."
             logger.info(header_msg)
             if progress_cb:
                 progress_cb(header_msg)
 
             def transcribe_chunk(i: int) -> str:
-                start_ms = i * chunk_length_ms
-                end_ms = min((i + 1) * chunk_length_ms, len(audio))
-                chunk = audio[start_ms:end_ms]
-                buf = BytesIO()
-                chunk.export(buf, format=export_format)
-                buf.seek(0)
-                buf.name = f"chunk{i}.{audio_format}"
+                _check_cancelled(cancel_event, f"chunk {i + 1}")
+                start_sec, end_sec = spans[i]
+                chunk_path = work_dir / f"chunk{i}.{audio_format}"
+                with instrumentation.span(trace, "chunk_export", chunk=i + 1) as attrs:
+                    if use_ffmpeg:
+                        _extract_chunk(audio_path, start_sec, end_sec, chunk_path)
+                    else:
+                        audio[int(start_sec * 1000): int(end_sec * 1000)].export(
+                            str(chunk_path), format=export_format
+                        )
+                    attrs["bytes"] = chunk_path.stat().st_size
                 chunk_msg = f"Transcribing chunk {i + 1}/{num_chunks} via API..."
                 logger.info(chunk_msg)
                 if progress_cb:
                     progress_cb(chunk_msg)
-                def _call():
-                    return client.audio.transcriptions.create(model=model_name, file=buf)
 
-                result = _retry_call(_call)
+                sent = [0]
+
+                def _call(api: Any) -> Any:
+                    with _open_upload(chunk_path, meter, sent) as f:
+                        return api.audio.transcriptions.create(model=model_name, file=f)
+
+                try:
+                    result = _api_call(
+                        client,
+                        _call,
+                        f"chunk {i + 1}",
+                        timeouts,
+                        deadline,
+                        trace=trace,
+                        cancel_event=cancel_event,
+                    )
+                finally:
+                    chunk_path.unlink(missing_ok=True)
+                instrumentation.advance(meter, AUDIO_SEC, (end_sec - start_sec) * sec_scale)
                 done_msg = f"Finished chunk {i + 1}/{num_chunks}"
                 logger.info(done_msg)
                 if progress_cb:
                     progress_cb(done_msg)
                 return result.text.strip()
 
-            with ThreadPoolExecutor(max_workers=MAX_API_WORKERS) as ex:
-                texts = list(ex.map(transcribe_chunk, range(num_chunks)))
+            workers = MAX_API_WORKERS * (len(endpoints) if endpoints is not None else 1)
+            ex = ThreadPoolExecutor(max_workers=workers)
+            try:
+                futures = [ex.submit(transcribe_chunk, i) for i in range(num_chunks)]
+                texts = [future.result() for future in futures]
+            finally:
+                # After a failure or cancellation, chunks not yet started are dropped
+                ex.shutdown(wait=True, cancel_futures=True)
 
             if progress_cb:
                 progress_cb("Finished all chunks")
             return " ".join(texts)
         finally:
-            shutil.rmtree(TEMP_DIR, ignore_errors=True)
+            shutil.rmtree(work_dir, ignore_errors=True)
     else:
-        import whisper
-        import torch
+        return _transcribe_local(
+            audio_path, model_name, local_options, progress_cb, trace, cancel_event, meter
+        )
 
-        if progress_cb:
-            progress_cb("Transcribing locally...")
-        model = _LOCAL_MODEL_CACHE.get(model_name)
-        if model is None:
-            model = whisper.load_model(model_name)
-            _LOCAL_MODEL_CACHE[model_name] = model
-        result = model.transcribe(audio_path, fp16=torch.cuda.is_available())
-        if progress_cb:
-            progress_cb("Finished local transcription")
-        return result["text"].strip()
+
+_OPENAI_CLIENTS: dict[tuple[str, str], Any] = {}
+_OPENAI_CLIENTS_LOCK = threading.Lock()
+# Model ids visible to each API key, listed once per process for the preflight check
+_MODEL_IDS_CACHE: dict[str, set[str]] = {}
+_ENDPOINT_POOLS: dict[tuple[tuple[str, str], ...], EndpointPool] = {}
+HEALTH_CHECK_INTERVAL = 15.0
+
+
+def _get_openai_client(api_key: str, base_url: str = "") -> Any:
+    """Return a shared OpenAI client for ``api_key`` at ``base_url``.
+
+    Clients are thread-safe and keep a connection pool, so reusing one across
+    chunks and jobs avoids repeated TLS handshakes in long-running processes.
+    An empty ``base_url`` uses the SDK default (``OPENAI_BASE_URL`` or
+    api.openai.com).
+    """
+    with _OPENAI_CLIENTS_LOCK:
+        client = _OPENAI_CLIENTS.get((api_key, base_url))
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=api_key, base_url=base_url or None)
+            _OPENAI_CLIENTS[(api_key, base_url)] = client
+        return client
+
+
+def get_endpoint_pool(config: configparser.ConfigParser, section: str) -> Optional[EndpointPool]:
+    """Return the pool for ``[section] endpoints``, or None when none are configured.
+
+    Use ``whisper_api`` for transcription and ``openai`` for summaries. The
+    same list always yields the same pool, so load is balanced across every
+    job of a long-running process.
+    """
+    entries = parse_endpoints(
+        config.get(section, "endpoints", fallback=""), default_key=get_api_key(config)
+    )
+    if not entries:
+        return None
+    key = tuple((e.base_url, e.api_key) for e in entries)
+    with _OPENAI_CLIENTS_LOCK:
+        pool = _ENDPOINT_POOLS.get(key)
+        if pool is None:
+            connect = get_timeouts(config)["connect"]
+
+            def probe(endpoint: Any) -> None:
+                client = _get_openai_client(endpoint.api_key, endpoint.base_url)
+                client.with_options(timeout=connect, max_retries=0).models.list()
+
+            pool = EndpointPool(entries, probe=probe, health_interval=HEALTH_CHECK_INTERVAL)
+            _ENDPOINT_POOLS[key] = pool
+        return pool
 
 
 def summarize(
-    prompt: str, transcript: str, model_name: str, api_key: str, language: str
+    prompt: str,
+    transcript: str,
+    model_name: str,
+    api_key: str,
+    language: str,
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[Deadline] = None,
+    trace: Optional[Trace] = None,
+    endpoints: Optional[EndpointPool] = None,
+    cancel_event: Optional[threading.Event] = None,
 ) -> str:
-    """Generate a summary of the transcript using a chat model."""
-    from openai import OpenAI
+    """Generate a summary of the transcript using a chat model.
 
-    client = OpenAI(api_key=api_key)
+    ``timeouts``, ``deadline``, ``trace``, ``endpoints`` and ``cancel_event``
+    work as for ``transcribe``. The model preflight check is skipped with ``endpoints``,
+    as self-hosted servers list their models differently, if at all.
+    """
+    if deadline is not None:
+        deadline.check("summary")
 
     lang_text = "English" if language == "en" else "German"
     messages = [
@@ -433,20 +1672,40 @@ def summarize(
             "content": f"{prompt}\n\nTranscript:\n{transcript}",
         },
     ]
-    def _retry_call(callable_fn: Callable[[], Any], retries: int = 3):
-        for attempt in range(retries):
-            try:
-                return callable_fn()
-            except Exception:
-                if attempt == retries - 1:
-                    raise
-                sleep_for = random.uniform(1.0 * (2**attempt), 2.0 * (2**attempt))
-                time.sleep(sleep_for)
+    if endpoints is not None:
+        client = endpoints
+    else:
+        client = _get_openai_client(api_key)
+        _check_model_access(client, api_key, model_name, timeouts, trace)
+    response = _api_call(
+        client,
+        lambda api: api.chat.completions.create(model=model_name, messages=messages),
+        "summary",
+        timeouts,
+        deadline,
+        trace=trace,
+        stage="summary_api",
+        cancel_event=cancel_event,
+    )
+    return response.choices[0].message.content.strip()
 
+
+def _check_model_access(
+    client: Any,
+    api_key: str,
+    model_name: str,
+    timeouts: Optional[dict[str, float]],
+    trace: Optional[Trace],
+) -> None:
     # Preflight: check access to the requested model; provide a helpful error if missing
     try:
-        models = client.models.list()
-        available_ids = {m.id for m in getattr(models, "data", [])}
+        available_ids = _MODEL_IDS_CACHE.get(api_key)
+        if available_ids is None:
+            listing_timeout = (timeouts or DEFAULT_TIMEOUTS)["connect"]
+            with instrumentation.span(trace, "summary_preflight"):
+                models = client.with_options(timeout=listing_timeout, max_retries=0).models.list()
+            available_ids = {m.id for m in getattr(models, "data", [])}
+            _MODEL_IDS_CACHE[api_key] = available_ids
         if model_name not in available_ids:
             # Suggest commonly used chat-capable models when available
             chat_like = tuple(["gpt-4o", "gpt-4.1", "gpt-5"])  # show modern chat families
@@ -458,8 +1717,86 @@ def summarize(
     except Exception:
         # If listing models fails, continue; the call below will retry and surface the API error
         pass
-    response = _retry_call(lambda: client.chat.completions.create(model=model_name, messages=messages))
-    return response.choices[0].message.content.strip()
+
+
+def summarize_group(
+    prompt: str,
+    parts: list[tuple[str, str]],
+    model_name: str,
+    api_key: str,
+    language: str,
+    timeouts: Optional[dict[str, float]] = None,
+    deadline: Optional[Deadline] = None,
+    trace: Optional[Trace] = None,
+    endpoints: Optional[EndpointPool] = None,
+    cache: Optional[SummaryCache] = None,
+    summarize_fn: Optional[Callable[[str, str], str]] = None,
+    file_status: Optional[Callable[[int, str], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> str:
+    """Summarize several transcripts as one: a summary per part, then a merge.
+
+    ``parts`` are ``(name, transcript)`` pairs in recording order. Each part
+    is summarized on its own (concurrently, after a lookup in ``cache``) and
+    the short part summaries are combined by one more request, so adding or
+    removing a file only costs that file's summary plus the merge, and large
+    groups no longer overflow the model's context. A single part returns its
+    own summary. ``summarize_fn(prompt, text)`` replaces the ``summarize``
+    call (e.g. to use a job server); ``file_status(index, text)`` reports
+    the progress of each part. Setting ``cancel_event`` raises ``Cancelled``
+    before the next request.
+    """
+    if summarize_fn is None:
+
+        def summarize_fn(prompt_text: str, text: str) -> str:
+            summary = summarize(
+                prompt_text,
+                text,
+                model_name,
+                api_key,
+                language,
+                timeouts,
+                deadline,
+                trace,
+                endpoints,
+                cancel_event,
+            )
+            return strip_code_fences(summary)
+
+    def cached(kind: str, prompt_text: str, text: str) -> tuple[str, bool]:
+        key = cache_key(kind, model_name, language, prompt_text, text)
+        if cache is not None:
+            summary = cache.get(key)
+            if summary is not None:
+                return summary, True
+        _check_cancelled(cancel_event, "summary")
+        summary = summarize_fn(prompt_text, text)
+        if cache is not None:
+            cache.put(key, summary)
+        return summary, False
+
+    def summarize_part(index: int) -> str:
+        if file_status:
+            file_status(index, "Summarizing...")
+        summary, hit = cached("part", prompt, parts[index][1])
+        if file_status:
+            file_status(index, "✅ Summary reused" if hit else "✅ Summarized")
+        return summary
+
+    ex = ThreadPoolExecutor(max_workers=MAX_API_WORKERS)
+    try:
+        futures = [ex.submit(summarize_part, i) for i in range(len(parts))]
+        summaries = [future.result() for future in futures]
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+    if len(summaries) == 1:
+        return summaries[0]
+    merge_input = "\n\n".join(
+        f"=== {name} ===\n\n{summary}" for (name, _), summary in zip(parts, summaries)
+    )
+    summary, hit = cached("merge", f"{prompt}\n\n{MERGE_INSTRUCTIONS}", merge_input)
+    logger.info(f"Merged {len(parts)} summaries{' (cached)' if hit else ''}")
+    return summary
 
 
 def main() -> None:
@@ -503,14 +1840,35 @@ def main() -> None:
     parser.add_argument(
         "--formats",
         nargs="+",
-        choices=["md", "txt", "pdf"],
+        choices=["md", "txt", "pdf", "transcript-pdf"],
+        default=None,
+        help="Which output formats to write (default: md txt pdf); transcript-pdf also "
+        "writes the full transcript as <output>_transcript.pdf",
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="URL",
+        help="Submit the job to a running job_server.py (default URL: [server] url or "
+        "http://127.0.0.1:8765)",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help="Append a JSON lines trace with the duration of every stage to FILE",
+    )
+    parser.add_argument(
+        "--metrics-file",
         default=None,
-        help="Which output formats to write (default: md txt pdf)",
+        help="Write per-stage timings of this run as a Prometheus textfile",
     )
 
     args = parser.parse_args()
 
-    if not check_ffmpeg():
+    if args.server is None and not check_ffmpeg():
         logger.warning("ffmpeg is not installed or not found in PATH.")
 
     setup_logging()
@@ -524,16 +1882,50 @@ def main() -> None:
     api_key = get_api_key(config)
     whisper_section = "whisper_api" if method == "api" else "whisper_local"
     whisper_model = config[whisper_section]["model"]
-    logger.info(
-        f"Using model {whisper_model} via {'API' if method == 'api' else 'local'}"
-    )
-    logger.info("Transcribing audio...")
-    transcript = transcribe(
-        args.audio,
-        model_name=whisper_model,
-        method=method,
-        api_key=api_key if method == "api" else None,
-    )
+    local_options = get_local_options(config)
+    timeouts = get_timeouts(config)
+    deadline = Deadline.after(timeouts["job"])
+    trace = Trace(Path(args.audio).name) if args.trace or args.metrics_file else None
+    remote = None
+    if args.server is not None:
+        import job_server
+
+        server_url, token = job_server.get_server_settings(config)
+        server_url = args.server or server_url or job_server.DEFAULT_URL
+        logger.info(f"Submitting job to {server_url}...")
+        remote = job_server.submit_job(
+            server_url,
+            {
+                "audio": str(Path(args.audio).resolve()),
+                "method": method,
+                "whisper_model": whisper_model,
+                "prompt": prompt,
+                "summary_model": summary_model,
+                "language": language,
+            },
+            progress_cb=logger.info,
+            token=token,
+            timeouts=timeouts,
+            deadline=deadline,
+        )
+        transcript = remote["transcript"]
+    else:
+        logger.info(
+            f"Using model {whisper_model} via {'API' if method == 'api' else 'local'}"
+        )
+        logger.info("Transcribing audio...")
+        transcript = transcribe(
+            args.audio,
+            model_name=whisper_model,
+            method=method,
+            api_key=api_key if method == "api" else None,
+            local_options=local_options,
+            api_options=get_api_options(config),
+            timeouts=timeouts,
+            deadline=deadline,
+            trace=trace,
+            endpoints=get_endpoint_pool(config, "whisper_api") if method == "api" else None,
+        )
     logger.info("Transcription complete.")
 
     target_output_dir = (
@@ -552,10 +1944,27 @@ def main() -> None:
         with open(transcript_path, "w", encoding="utf-8") as f:
             f.write(transcript)
         logger.info(f"Transcript written to {transcript_path}")
+    if "transcript-pdf" in formats:
+        transcript_pdf = target_output_dir / f"{Path(args.output).stem}_transcript.pdf"
+        transcript_to_pdf(transcript, str(transcript_pdf), Path(args.audio).name, trace=trace)
+        logger.info(f"Transcript PDF written to {transcript_pdf}")
 
-    logger.info("Summarizing transcript...")
-    summary = summarize(prompt, transcript, summary_model, api_key, language)
-    summary = strip_code_fences(summary)
+    if remote is not None:
+        summary = remote["summary"]
+    else:
+        logger.info("Summarizing transcript...")
+        summary = summarize(
+            prompt,
+            transcript,
+            summary_model,
+            api_key,
+            language,
+            timeouts,
+            deadline,
+            trace,
+            get_endpoint_pool(config, "openai"),
+        )
+        summary = strip_code_fences(summary)
     logger.info("Summary complete.")
 
     heading = "Summary" if language == "en" else "Zusammenfassung"
@@ -566,11 +1975,18 @@ def main() -> None:
 
     if "pdf" in formats:
         pdf_path = target_output_dir / Path(args.output).with_suffix(".pdf").name
-        markdown_to_pdf(markdown_content, str(pdf_path))
+        markdown_to_pdf(markdown_content, str(pdf_path), trace=trace)
         logger.info(f"PDF written to {pdf_path}")
 
     if "md" in formats:
         logger.info(f"Summary written to {md_output}")
 
+    if args.trace:
+        trace.write_jsonl(Path(args.trace))
+    if args.metrics_file:
+        metrics = instrumentation.Metrics()
+        metrics.observe(trace)
+        metrics.write_textfile(Path(args.metrics_file))
+
 if __name__ == "__main__":
     main()